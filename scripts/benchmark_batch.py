@@ -0,0 +1,61 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Compare splitting ids into batches by slicing and deleting from the front of a list with
+osducli.util.batch.batched, showing the former is quadratic and the latter linear in the number of
+ids.
+
+Usage: python scripts/benchmark_batch.py [max ids] [batch size]"""
+
+import sys
+import time
+
+from osducli.util.batch import batched
+
+# deleting from the front of a list gets too slow to measure beyond this
+MAX_SLICED_IDS = 1_000_000
+
+
+def sliced(ids: list, size: int) -> int:
+    """Batch ids the way dataload verify used to, returning the number of batches"""
+    count = 0
+    while ids:
+        current = ids[:size]
+        del ids[:size]
+        count += len(current) > 0
+    return count
+
+
+def measure(function, ids: list, size: int) -> float:
+    """Wall clock time in seconds to batch a copy of ids"""
+    ids = list(ids)
+    start = time.perf_counter()
+    function(ids, size)
+    return time.perf_counter() - start
+
+
+def main():
+    """Main function"""
+    max_ids = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"batch size {size}")
+    print(f"{'ids':>12}{'sliced (s)':>14}{'ns/id':>9}{'batched (s)':>14}{'ns/id':>9}")
+    count = 125_000
+    while count <= max_ids:
+        ids = [f"opendes:master-data--Wellbore:{index}" for index in range(count)]
+        batched_time = measure(lambda items, n: sum(1 for _ in batched(items, n)), ids, size)
+        if count <= MAX_SLICED_IDS:
+            sliced_time = measure(sliced, ids, size)
+            sliced_text = f"{sliced_time:>14.3f}{sliced_time / count * 1e9:>9.0f}"
+        else:
+            sliced_text = f"{'-':>14}{'-':>9}"
+        print(f"{count:>12}{sliced_text}{batched_time:>14.3f}{batched_time / count * 1e9:>9.0f}")
+        count = count * 2 if count * 2 <= max_ids or count == max_ids else max_ids
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Compare the standard library json module with osducli.util.json_backend on manifests shaped
+like those loaded by dataload ingest.
+
+Usage: python scripts/benchmark_json.py [records]"""
+
+import json
+import sys
+import timeit
+
+from osducli.util import json_backend
+
+
+def make_manifest(records: int) -> dict:
+    """Create a MasterData manifest of Wellbore records with typical nesting and references"""
+    return {
+        "kind": "osdu:wks:Manifest:1.0.0",
+        "MasterData": [
+            {
+                "id": f"opendes:master-data--Wellbore:{index}",
+                "kind": "osdu:wks:master-data--Wellbore:1.0.0",
+                "acl": {
+                    "owners": ["data.default.owners@opendes"],
+                    "viewers": ["data.default.viewers@opendes"],
+                },
+                "legal": {
+                    "legaltags": ["opendes-public-usa-dataset-1"],
+                    "otherRelevantDataCountries": ["US"],
+                },
+                "meta": [
+                    {
+                        "kind": "Unit",
+                        "name": "m",
+                        "persistableReference": '{"abcd":{"a":0.0,"b":1.0,"c":1.0,"d":0.0},"symbol":"m"}',
+                        "propertyNames": ["VerticalMeasurements[].VerticalMeasurement"],
+                    }
+                ],
+                "data": {
+                    "FacilityName": f"Wellbore {index}",
+                    "WellID": f"opendes:master-data--Well:{index // 4}:",
+                    "FacilityTypeID": "opendes:reference-data--FacilityType:Wellbore:",
+                    "SpatialLocation": {
+                        "Wgs84Coordinates": {
+                            "type": "FeatureCollection",
+                            "features": [
+                                {
+                                    "type": "Feature",
+                                    "geometry": {
+                                        "type": "Point",
+                                        "coordinates": [2.1 + index * 1e-6, 58.4 - index * 1e-6],
+                                    },
+                                    "properties": {},
+                                }
+                            ],
+                        }
+                    },
+                    "VerticalMeasurements": [
+                        {
+                            "VerticalMeasurementID": name,
+                            "VerticalMeasurement": 100.0 + step * 12.5,
+                            "VerticalMeasurementPathID": "opendes:reference-data--VerticalMeasurementPath:MD:",
+                        }
+                        for step, name in enumerate(["RT", "KB", "TD", "PBTD"])
+                    ],
+                    "NameAliases": [
+                        {
+                            "AliasName": f"WB-{index}",
+                            "AliasNameTypeID": "opendes:reference-data--AliasNameType:Borehole%20Code:",
+                        }
+                    ],
+                },
+            }
+            for index in range(records)
+        ],
+    }
+
+
+def measure(function, repeat: int = 5) -> float:
+    """Best wall clock time in seconds of a number of runs"""
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    """Main function"""
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    manifest = make_manifest(records)
+    text = json.dumps(manifest)
+    data = text.encode("utf-8")
+    batch = manifest["MasterData"][:200]
+    print(
+        f"{records} records, {len(data) / 1024 / 1024:.1f} MiB, json backend: {json_backend.BACKEND}"
+    )
+
+    cases = [
+        ("decode manifest", lambda: json.loads(text), lambda: json_backend.loads(data)),
+        (
+            "encode manifest",
+            lambda: json.dumps(manifest).encode("utf-8"),
+            lambda: json_backend.dumps_bytes(manifest),
+        ),
+        (
+            "encode 200 record batch",
+            lambda: json.dumps(batch).encode("utf-8"),
+            lambda: json_backend.dumps_bytes(batch),
+        ),
+        (
+            "output (indent=2)",
+            lambda: json.dumps(batch, indent=2),
+            lambda: json_backend.dumps(batch, indent=2),
+        ),
+    ]
+    print(f"{'':<26}{'json (ms)':>12}{'backend (ms)':>15}{'speedup':>10}")
+    for name, standard, backend in cases:
+        standard_time = measure(standard)
+        backend_time = measure(backend)
+        print(
+            f"{name:<26}{standard_time * 1000:>12.1f}{backend_time * 1000:>15.1f}"
+            f"{standard_time / backend_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
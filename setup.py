@@ -55,6 +55,7 @@ setup(
     py_modules=[splitext(basename(path))[0] for path in glob("src/*.py")],
     include_package_data=True,
     install_requires=["click", "jmespath", "osdu-sdk==0.0.6", "requests", "tabulate", "msal"],
+    extras_require={"orjson": ["orjson"]},
     project_urls={
         "Issue Tracker": "https://github.com/equinor/osdu-cli/issues",
     },
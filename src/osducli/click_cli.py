@@ -10,7 +10,6 @@ Handles creating and launching a CLI to handle a user command."""
 
 import collections
 import functools
-import json
 import logging
 from os import path
 
@@ -19,6 +18,7 @@ import click
 from osducli.config import CLI_ENV_VAR_PREFIX, CLIConfig
 from osducli.log import get_logger
 from osducli.state import get_default_config
+from osducli.util import json_backend
 
 # from osducli.util import is_help_command
 
@@ -149,7 +149,7 @@ def command_with_output(table_transformer=None):
                             raise ValueError from ex
 
                     if state.output == "json":
-                        print(json.dumps(result, indent=2))
+                        print(json_backend.dumps(result, indent=2, ensure_ascii=True))
                     else:
                         result_list = result if isinstance(result, list) else [result]
                         # should_sort_keys = not state.jmes
@@ -5,16 +5,20 @@
 # -----------------------------------------------------------------------------
 """Useful functions."""
 
+import gzip
 import os
 import sys
+import threading
+import zlib
 from configparser import NoOptionError, NoSectionError
 from functools import wraps
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
 from urllib.parse import urljoin
 
 import requests
 from osdu.client import OsduClient
 from osdu.identity import OsduMsalInteractiveCredential, OsduTokenCredential
+from requests.adapters import HTTPAdapter
 from requests.models import HTTPError
 
 from osducli.config import (
@@ -24,13 +28,15 @@ from osducli.config import (
     CONFIG_AUTHENTICATION_SCOPES,
     CONFIG_CLIENT_ID,
     CONFIG_CLIENT_SECRET,
+    CONFIG_COMPRESSION_SUFFIX,
     CONFIG_DATA_PARTITION_ID,
     CONFIG_REFRESH_TOKEN,
     CONFIG_SERVER,
     CONFIG_TOKEN_ENDPOINT,
     CLIConfig,
 )
-from osducli.log import get_logger
+from osducli.log import LazyPayload, get_logger
+from osducli.util import json_backend
 from osducli.util.exceptions import CliError
 
 MSG_JSON_DECODE_ERROR = (
@@ -42,8 +48,15 @@ MSG_HTTP_ERROR = (
     " more information"
 )
 
+DEFAULT_POOL_SIZE = 10
+REQUEST_ENCODINGS = {"gzip": gzip.compress, "deflate": zlib.compress}
+UNSUPPORTED_MEDIA_TYPE = 415
+
 logger = get_logger(__name__)
 
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
 
 def handle_cli_exceptions(function):
     """Decorator to provide common cli error handling"""
@@ -77,14 +90,21 @@ class CliOsduClient(OsduClient):
         OsduClient ([type]): [description]
     """
 
-    def __init__(self, config: CLIConfig):
+    def __init__(self, config: CLIConfig, pool_size: int = DEFAULT_POOL_SIZE):
         """Setup the new client
 
         Args:
             config (CLIConfig): cli configuration
+            pool_size (int, optional): number of keep-alive connections to keep per host.
+                Defaults to DEFAULT_POOL_SIZE.
         """
 
         self.config = config
+        self._token_lock = threading.Lock()
+        self._pool_size = 0
+        self._session = requests.Session()
+        self._request_encodings = {}
+        self.ensure_pool_size(pool_size)
 
         try:
             # required
@@ -124,6 +144,171 @@ class CliOsduClient(OsduClient):
             )
             sys.exit(1)
 
+    @property
+    def session(self) -> requests.Session:
+        """Session holding the keep-alive connection pool used for all requests
+
+        Returns:
+            requests.Session: session
+        """
+        return self._session
+
+    def ensure_pool_size(self, pool_size: int):
+        """Grow the connection pool so that it can serve pool_size concurrent requests
+
+        Args:
+            pool_size (int): minimum number of connections to keep per host
+        """
+        if pool_size > self._pool_size:
+            self._pool_size = pool_size
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+    def get_headers(self):
+        """Get needed http headers, serializing token acquisition across threads"""
+        with self._token_lock:
+            return super().get_headers()
+
+    # region HTTP methods
+    def get(self, url: str) -> requests.Response:
+        """GET from the specified url using the pooled session
+
+        Args:
+            url (str): url to GET from to
+
+        Returns:
+            requests.Response: response object
+        """
+        return self._session.get(url, headers=self.get_headers())
+
+    def post(self, url: str, data: Union[str, dict]) -> requests.Response:
+        """POST data to the specified url using the pooled session
+
+        Args:
+            url (str): url to POST to
+            data (Union[str, dict]): json data as string or dict to send as the body
+
+        Returns:
+            [requests.Response]: response object
+        """
+        headers = self.get_headers()
+        if isinstance(data, dict):
+            data = json_backend.dumps_bytes(data)
+            headers["Content-Type"] = "application/json"
+        return self._session.post(url, data=data, headers=headers)
+
+    def put(self, url: str, filepath: str) -> requests.Response:
+        """PUT from the file at the given path to a url using the pooled session
+
+        Args:
+            url (str): url to PUT to
+            filepath (str): path to a file to PUT
+
+        Returns:
+            requests.Response: response object
+        """
+        headers = self.get_headers()
+        headers.update({"Content-Type": "application/octet-stream", "x-ms-blob-type": "BlockBlob"})
+        with open(filepath, "rb") as file_handle:
+            return self._session.put(url, data=file_handle, headers=headers)
+
+    def delete(self, url: str, ok_status_codes: list = None) -> requests.Response:
+        """DELETE a url using the pooled session
+
+        Args:
+            url (str): url to DELETE
+            ok_status_codes (list, optional): Status codes indicating successful call. Defaults to [200].
+
+        Returns:
+            requests.Response: response object
+        """
+        if ok_status_codes is None:
+            ok_status_codes = [200]
+
+        response = self._session.delete(url, headers=self.get_headers())
+        if response.status_code not in ok_status_codes:
+            raise HTTPError(response=response)
+        return response
+
+    def post_encoded(self, url: str, data: Union[str, dict], encoding: str) -> requests.Response:
+        """POST json data compressed with the given content encoding using the pooled session
+
+        Args:
+            url (str): url to POST to
+            data (Union[str, dict]): json data as string or dict to send as the body
+            encoding (str): content encoding, one of REQUEST_ENCODINGS
+
+        Returns:
+            requests.Response: response object
+        """
+        body = json_backend.dumps_bytes(data) if isinstance(data, dict) else data
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        compressed = REQUEST_ENCODINGS[encoding](body)
+        logger.debug("Compressed request body from %i to %i bytes", len(body), len(compressed))
+        headers = self.get_headers()
+        headers.update({"Content-Type": "application/json", "Content-Encoding": encoding})
+        return self._session.post(url, data=compressed, headers=headers)
+
+    # endregion HTTP methods
+
+    def request_encoding(self, config_url_key: str) -> Optional[str]:
+        """Get the content encoding to compress request bodies sent to a service with.
+
+        Configured per service, e.g. 'workflow_compression = gzip' for the workflow_url service.
+
+        Args:
+            config_url_key (str): key in configuration for the base path of the service
+
+        Returns:
+            Optional[str]: content encoding, or None to send uncompressed request bodies
+        """
+        if config_url_key not in self._request_encodings:
+            option = config_url_key
+            if option.endswith("_url"):
+                option = option[: -len("_url")]
+            encoding = self.config.get("core", option + CONFIG_COMPRESSION_SUFFIX, None)
+            if encoding:
+                encoding = encoding.strip().lower()
+                if encoding not in REQUEST_ENCODINGS:
+                    logger.warning(
+                        "Unsupported request compression '%s' for %s - use one of %s",
+                        encoding,
+                        config_url_key,
+                        ", ".join(REQUEST_ENCODINGS),
+                    )
+                    encoding = None
+            self._request_encodings[config_url_key] = encoding or None
+        return self._request_encodings[config_url_key]
+
+    def _post_to_service(
+        self, config_url_key: str, url: str, data: Union[str, dict]
+    ) -> requests.Response:
+        """POST to a service, compressing the body if configured for the service.
+
+        If the service rejects a compressed body - with 415 Unsupported Media Type, or a 400 Bad
+        Request whose body names the encoding - and accepts it uncompressed then compression is
+        turned off for the service for the rest of the session. Other errors are returned as is,
+        without sending the request again."""
+        encoding = self.request_encoding(config_url_key)
+        if encoding is None:
+            return self.post(url, data)
+
+        response = self.post_encoded(url, data, encoding)
+        if not _rejects_encoding(response, encoding):
+            return response
+
+        fallback = self.post(url, data)
+        if fallback.status_code < 400:
+            logger.warning(
+                "%s rejected %s compressed requests - sending uncompressed requests instead",
+                config_url_key,
+                encoding,
+            )
+            self._request_encodings[config_url_key] = None
+        return fallback
+
     def _url_from_config(self, config_url_key: str, url_extra_path: str) -> str:
         """Construct a url using values from configuration"""
         unit_url = self.config.get("core", config_url_key)
@@ -148,6 +333,29 @@ class CliOsduClient(OsduClient):
             raise HTTPError(response=response)
         return response
 
+    def cli_post(
+        self,
+        config_url_key: str,
+        url_extra_path: str,
+        data: Union[str, dict],
+        ok_status_codes: list = None,
+    ) -> requests.Response:
+        """POST data to a url constructed from configuration, raising HTTPError on failure
+
+        Args:
+            config_url_key (str): key in configuration for the base path
+            url_extra_path (str): extra path to add to the base path
+            data (Union[str, dict]): json data as string or dict to send as the body
+            ok_status_codes (list, optional): Status codes for successful call. Defaults to [200].
+        """
+        url = self._url_from_config(config_url_key, url_extra_path)
+        if ok_status_codes is None:
+            ok_status_codes = [200]
+        response = self._post_to_service(config_url_key, url, data)
+        if response.status_code not in ok_status_codes:
+            raise HTTPError(response=response)
+        return response
+
     def cli_get_returning_json(self, config_url_key: str, url_extra_path: str) -> dict:
         """[summary]
 
@@ -190,11 +398,10 @@ class CliOsduClient(OsduClient):
             [type]: [description]
         """
         try:
-            url = self._url_from_config(config_url_key, url_extra_path)
-            return self.post_returning_json(url, data, ok_status_codes)
+            return self.cli_post(config_url_key, url_extra_path, data, ok_status_codes).json()
         except HTTPError as ex:
             logger.error(MSG_HTTP_ERROR)
-            logger.debug(ex.response.text)
+            logger.debug("%s", LazyPayload(ex.response.text))
             logger.error("Error (%s) - %s", ex.response.status_code, ex.response.reason)
         except ValueError as ex:
             logger.error(MSG_JSON_DECODE_ERROR)
@@ -304,3 +511,38 @@ class CliOsduClient(OsduClient):
             )
 
         sys.exit(1)
+
+
+def get_client(config: CLIConfig, pool_size: int = DEFAULT_POOL_SIZE) -> CliOsduClient:
+    """Get the process wide client for the given configuration, creating it on first use.
+
+    The client (and so its credentials, cached token and keep-alive connections) is shared by all
+    commands and threads in the process using the same configuration.
+
+    Args:
+        config (CLIConfig): cli configuration
+        pool_size (int, optional): number of concurrent requests the client must be able to serve.
+            Defaults to DEFAULT_POOL_SIZE.
+
+    Returns:
+        CliOsduClient: shared client
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(config)
+        if client is None:
+            client = CliOsduClient(config, pool_size)
+            _CLIENTS[config] = client
+        else:
+            client.ensure_pool_size(pool_size)
+        return client
+
+
+def _rejects_encoding(response: requests.Response, encoding: str) -> bool:
+    """Check whether a response rejects the content encoding of the request - a 415, or a 400
+    whose body names the content encoding"""
+    if response.status_code == UNSUPPORTED_MEDIA_TYPE:
+        return True
+    if response.status_code != 400:
+        return False
+    text = (response.text or "").lower()
+    return "content-encoding" in text or encoding in text
@@ -0,0 +1,122 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Ordering of manifest files by the records they reference"""
+
+import re
+from typing import Dict, Iterator, List, Set, Tuple
+
+from osducli.log import get_logger
+from osducli.util.archive import open_file
+from osducli.util.manifest import is_manifest_file, manifest_reader
+
+logger = get_logger(__name__)
+
+# e.g. opendes:reference-data--UnitOfMeasure:m: or opendes:master-data--Well:1234:1590000000
+_RECORD_ID = re.compile(r"^[\w\-.]+:[\w\-.]+--[\w\-.]+:")
+_WORK_PRODUCT_PARTS = ("WorkProduct", "WorkProductComponents", "Datasets")
+
+
+def manifest_references(filepath: str) -> Tuple[Set[str], Set[str]]:
+    """Get the ids of the records a manifest file defines and the values in it that look like
+    references to other records
+
+    Args:
+        filepath (str): path of the manifest file
+
+    Returns:
+        Tuple[Set[str], Set[str]]: defined record ids and referenced ids (possibly versioned)
+    """
+    defined = set()
+    referenced = set()
+    if not is_manifest_file(filepath):
+        return defined, referenced
+
+    with open_file(filepath) as file:
+        for key, value in manifest_reader(file, filepath):
+            if key == "Data" and isinstance(value, dict):
+                records = []
+                for part in _WORK_PRODUCT_PARTS:
+                    part_value = value.get(part)
+                    records.extend(part_value if isinstance(part_value, list) else [part_value])
+            elif isinstance(value, dict):
+                records = [value]
+            else:
+                continue
+            for record in records:
+                if isinstance(record, dict):
+                    if isinstance(record.get("id"), str):
+                        defined.add(record["id"])
+                    referenced.update(_references({k: v for k, v in record.items() if k != "id"}))
+    return defined, referenced
+
+
+def dependency_levels(manifest_files: List[str]) -> List[List[str]]:
+    """Group manifest files into levels such that the records each file references are defined by
+    files in earlier levels.
+
+    Files keep their relative order within a level. Files in a reference cycle are placed together
+    in a final level.
+
+    Args:
+        manifest_files (List[str]): paths of the manifest files
+
+    Returns:
+        List[List[str]]: files to load in each level, in order
+    """
+    defined_by = {}
+    references = {}
+    for filepath in manifest_files:
+        defined, referenced = manifest_references(filepath)
+        for record_id in defined:
+            defined_by.setdefault(record_id, filepath)
+        references[filepath] = referenced
+
+    depends_on: Dict[str, Set[str]] = {}
+    for filepath in manifest_files:
+        dependencies = set()
+        for reference in references[filepath]:
+            source = _resolve(reference, defined_by)
+            if source is not None and source != filepath:
+                dependencies.add(source)
+        depends_on[filepath] = dependencies
+
+    levels = []
+    placed = set()
+    remaining = list(manifest_files)
+    while remaining:
+        level = [filepath for filepath in remaining if depends_on[filepath] <= placed]
+        if not level:
+            logger.warning(
+                "%i files can't be ordered as their references form a cycle - loading them together",
+                len(remaining),
+            )
+            level = remaining
+        levels.append(level)
+        placed.update(level)
+        remaining = [filepath for filepath in remaining if filepath not in placed]
+    return levels
+
+
+def _references(value) -> Iterator[str]:
+    """Yield the strings nested in value that look like record ids"""
+    if isinstance(value, str):
+        if _RECORD_ID.match(value):
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _references(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _references(item)
+
+
+def _resolve(reference: str, defined_by: dict):
+    """Get the file defining the record a (possibly versioned) reference points at"""
+    for candidate in (reference, reference.rstrip(":"), reference.rsplit(":", 1)[0]):
+        if candidate in defined_by:
+            return defined_by[candidate]
+    return None
@@ -0,0 +1,91 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Grouping of failed workflow runs by the types of records they carried and their error, for
+dataload status --failed-by-type"""
+
+from typing import Dict, List
+
+UNKNOWN_TYPE = "unknown"
+NO_ERROR = "no error reported"
+# fields of the workflow run details an error message may be reported in, by preference
+ERROR_FIELDS = ("errorMessage", "error", "message", "reason")
+
+
+def entity_type(record_id: str) -> str:
+    """Get the entity type of a record from its id
+
+    Args:
+        record_id (str): record id, e.g. opendes:reference-data--UnitOfMeasure:m
+
+    Returns:
+        str: entity type, e.g. reference-data--UnitOfMeasure, or UNKNOWN_TYPE
+    """
+    parts = record_id.split(":") if isinstance(record_id, str) else []
+    return parts[1] if len(parts) > 2 and parts[1] else UNKNOWN_TYPE
+
+
+def run_error(run: dict) -> str:
+    """Get the error message of a failed workflow run
+
+    Args:
+        run (dict): workflow run details
+
+    Returns:
+        str: error message, or NO_ERROR if the run details don't report one
+    """
+    for field in ERROR_FIELDS:
+        error = run.get(field)
+        if error:
+            return error if isinstance(error, str) else str(error)
+    return NO_ERROR
+
+
+def group_failed_runs(failed_runs: List[dict], sources: Dict[str, dict] = None) -> List[dict]:
+    """Group failed runs that carried the same types of records and failed with the same error.
+
+    Identical errors are collapsed into a single group counting their runs and records, so a
+    failure common to many runs shows once with the types of records (and source files) it
+    concerns. Runs that aren't in the run index are grouped with no entity types.
+
+    Args:
+        failed_runs (List[dict]): workflow run details of the failed runs
+        sources (Dict[str, dict], optional): source of each run as returned by RunIndex.sources.
+            Defaults to None.
+
+    Returns:
+        List[dict]: one entry per group with the entity types, error, number of runs and records,
+            source files and run ids, largest group first
+    """
+    sources = sources or {}
+    groups = {}
+    for run in failed_runs:
+        runid = run.get("runId")
+        source = sources.get(runid)
+        types = ()
+        if source is not None:
+            types = tuple(sorted({entity_type(record_id) for record_id in source["ids"]}))
+            if not types:
+                types = (source["type"],)
+        error = run_error(run)
+        group = groups.setdefault(
+            (types, error),
+            {
+                "entityTypes": list(types),
+                "error": error,
+                "runs": 0,
+                "records": 0,
+                "files": [],
+                "runIds": [],
+            },
+        )
+        group["runs"] += 1
+        group["runIds"].append(runid)
+        if source is not None:
+            group["records"] += len(source["records"] or [])
+            if source["file"] not in group["files"]:
+                group["files"].append(source["file"])
+    return sorted(groups.values(), key=lambda group: -group["runs"])
@@ -0,0 +1,195 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Dataload generate command"""
+
+import csv
+import json
+import os
+import sys
+from typing import IO, Iterable, Iterator, List
+
+import click
+
+from osducli.click_cli import State, command_with_output
+from osducli.cliclient import handle_cli_exceptions
+from osducli.commands.dataload.shards import DEFAULT_SHARD_SIZE, ShardWriter
+from osducli.commands.dataload.template import compile_template
+from osducli.config import CONFIG_DATA_PARTITION_ID
+from osducli.log import get_logger
+from osducli.util import json_backend
+from osducli.util.exceptions import CliError
+from osducli.util.manifest import is_stdin, record_data_type
+
+PARTITION_PLACEHOLDER = "data-partition-id"
+
+logger = get_logger(__name__)
+
+
+# click entry point
+@click.command()
+@click.option(
+    "-p",
+    "--path",
+    help="Path to the CSV file to generate records from, or - to read it from stdin. The first"
+    " row must hold the column names.",
+    type=click.Path(
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        allow_dash=True,
+    ),
+    required=True,
+)
+@click.option(
+    "-t",
+    "--template",
+    help="Path to a JSON record template. String values can hold {Column} placeholders, typed"
+    " as {Column:number}, {Column:integer} or {Column:boolean}, and {data-partition-id}.",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
+    required=True,
+)
+@click.option(
+    "--output-dir",
+    help="Directory to write sharded manifest files to. If not specified records are written to"
+    " stdout as JSON Lines, e.g. to pipe into dataload ingest.",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
+)
+@click.option(
+    "--shard-size",
+    help="Maximum number of records in each manifest file written to the output directory.",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SHARD_SIZE,
+    show_default=True,
+)
+@click.option("--delimiter", help="CSV field delimiter.", default=",", show_default=True)
+@handle_cli_exceptions
+@command_with_output(None)
+def _click_command(
+    state: State,
+    path: str,
+    template: str,
+    output_dir: str = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    delimiter: str = ",",
+):
+    """Generate ReferenceData / MasterData records from a CSV file.
+
+    Each row is mapped to a record by the template as it is read, so files of any size are
+    converted in constant memory. Legal and acl tags are applied from configuration by dataload
+    ingest."""
+    return generate(state, path, template, output_dir, shard_size, delimiter)
+
+
+def generate(
+    state: State,
+    path: str,
+    template: str,
+    output_dir: str = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    delimiter: str = ",",
+) -> list:
+    """Generate ReferenceData / MasterData records from a CSV file
+
+    Args:
+        state (State): Global state
+        path (str): Path to the CSV file, or - for stdin
+        template (str): Path to the JSON record template
+        output_dir (str): Directory to write manifest files to, or None to write JSON Lines
+            records to stdout
+        shard_size (int): Maximum number of records in each manifest file
+        delimiter (str): CSV field delimiter
+
+    Returns:
+        list: paths of the manifest files written, or None when writing to stdout
+    """
+    with open(template, "rb") as file:
+        try:
+            record_template = json_backend.load(file)
+        except json.JSONDecodeError as ex:
+            raise CliError(f"Invalid record template {template}: {ex}") from ex
+
+    constants = {}
+    partition = state.config.get("core", CONFIG_DATA_PARTITION_ID, fallback=None)
+    if partition is not None:
+        constants[PARTITION_PLACEHOLDER] = partition
+
+    with _open_csv(path) as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        columns = next(reader, None)
+        if not columns:
+            raise CliError(f"{path} has no header row of column names")
+        records = _with_tags(compile_template(record_template, columns, constants)(reader))
+
+        if output_dir is None:
+            count = write_records(records, sys.stdout.buffer)
+            logger.info("Generated %i records", count)
+            return None
+
+        name = "records" if is_stdin(path) else os.path.splitext(os.path.basename(path))[0]
+        files = write_manifests(
+            records, record_data_type(record_template), output_dir, name, shard_size
+        )
+    logger.info("Generated %i manifest files", len(files))
+    return files
+
+
+def write_records(records: Iterable[dict], handle: IO[bytes]) -> int:
+    """Write records as JSON Lines
+
+    Args:
+        records (Iterable[dict]): records to write
+        handle (IO[bytes]): binary file to write to
+
+    Returns:
+        int: number of records written
+    """
+    count = 0
+    for record in records:
+        handle.write(json_backend.dumps_bytes(record) + b"\n")
+        count += 1
+    handle.flush()
+    return count
+
+
+def write_manifests(
+    records: Iterable[dict], data_type: str, directory: str, name: str, shard_size: int
+) -> List[str]:
+    """Write records to manifest files of at most shard_size records, one record at a time
+
+    Args:
+        records (Iterable[dict]): records to write
+        data_type (str): ReferenceData or MasterData
+        directory (str): directory to write the files to
+        name (str): name of the files, which are numbered from name-00001.json
+        shard_size (int): maximum number of records in a file
+
+    Returns:
+        List[str]: paths of the files written
+    """
+    with ShardWriter(directory, name, shard_size) as writer:
+        for record in records:
+            writer.write(data_type, record)
+    return writer.files
+
+
+def _with_tags(records: Iterable[dict]) -> Iterator[dict]:
+    """Make sure records have the legal and acl tags dataload ingest fills in"""
+    for record in records:
+        record.setdefault("legal", {})
+        record.setdefault("acl", {})
+        yield record
+
+
+def _open_csv(path: str):
+    """Open a CSV file, or stdin (left open once read), as text"""
+    if is_stdin(path):
+        return open(  # pylint: disable=R1732
+            sys.stdin.fileno(), encoding="utf-8-sig", newline="", closefd=False
+        )
+    return open(path, encoding="utf-8-sig", newline="")  # pylint: disable=R1732
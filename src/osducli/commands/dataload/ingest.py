@@ -6,28 +6,63 @@
 
 """Dataload ingest command"""
 
-import json
+import itertools
 import os
+from contextlib import ExitStack, closing
+from typing import Callable, Dict, Iterator, List, Tuple
 
 import click
-import requests
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
-from osducli.commands.dataload.status import check_status
-from osducli.commands.dataload.verify import batch_verify
+from osducli.cliclient import handle_cli_exceptions
+from osducli.commands.dataload.dependencies import dependency_levels
+from osducli.commands.dataload.journal import IngestJournal
+from osducli.commands.dataload.ledger import IngestLedger
+from osducli.commands.dataload.options import DEFAULT_BATCH_SIZE, IngestOptions
+from osducli.commands.dataload.prepare import legal_and_acl_tags, prepare_manifests
+from osducli.commands.dataload.record_ids import load_id_generator
+from osducli.commands.dataload.run_index import open_run_index
+from osducli.commands.dataload.scan_index import DEFAULT_SCAN_INDEX_PATH, ScanIndex
+from osducli.commands.dataload.scheduler import RunScheduler, wait_for_runs
+from osducli.commands.dataload.status import (
+    FAILED,
+    FINISHED,
+    RUN_ID,
+    STATUS,
+    SUCCESS,
+    check_status,
+)
+from osducli.commands.dataload.streaming import ingest_streamed_file, process_batch
+from osducli.commands.dataload.submission import (
+    create_and_submit,
+    create_and_submit_work_products,
+)
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.commands.dataload.upload import (
+    DEFAULT_FILE_PARALLEL,
+    DEFAULT_UPLOAD_PARALLEL,
+    MEBIBYTE,
+    DatasetUploader,
+)
 from osducli.config import (
-    CONFIG_ACL_OWNER,
-    CONFIG_ACL_VIEWER,
+    CLI_CONFIG_DIR,
     CONFIG_DATA_PARTITION_ID,
-    CONFIG_FILE_URL,
-    CONFIG_LEGAL_TAG,
-    CONFIG_WORKFLOW_URL,
+    CONFIG_SERVER,
     CLIConfig,
 )
 from osducli.log import get_logger
+from osducli.util.archive import close_archives
 from osducli.util.exceptions import CliError
-from osducli.util.file import get_files_from_path
+from osducli.util.file import iter_files_from_path
+from osducli.util.manifest import (
+    MANIFEST_EXTENSIONS,
+    STDIN_PATH,
+    STREAMED_DATA_TYPES,
+    is_ndjson,
+    is_stdin,
+)
+
+DEFAULT_LEDGER_PATH = os.path.join(CLI_CONFIG_DIR, "ingest_ledger.db")
 
 logger = get_logger(__name__)
 
@@ -37,21 +72,58 @@ logger = get_logger(__name__)
 @click.option(
     "-p",
     "--path",
-    help="Path to a file or files to ingest.",
-    type=click.Path(exists=True, file_okay=True, dir_okay=True, readable=True, resolve_path=True),
+    help="Path to a file or directory of files to ingest, or a tar / zip archive of them. Use -"
+    " to read JSON Lines records or concatenated manifests from stdin, submitting batches as"
+    " records arrive.",
+    type=click.Path(
+        exists=True,
+        file_okay=True,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=True,
+    ),
     required=True,
 )
 @click.option("-f", "--files", help="Associated files to upload for Work-Products.")
+@click.option(
+    "--block-size",
+    help="Upload associated files larger than this size in MiB as concurrently staged blocks."
+    " If not specified each file is uploaded with a single request.",
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--file-jobs",
+    help="Maximum number of associated files to upload concurrently.",
+    type=click.IntRange(min=1),
+    default=DEFAULT_FILE_PARALLEL,
+    show_default=True,
+)
+@click.option(
+    "--upload-jobs",
+    help="Maximum number of blocks of a file to upload concurrently (used with --block-size).",
+    type=click.IntRange(min=1),
+    default=DEFAULT_UPLOAD_PARALLEL,
+    show_default=True,
+)
 @click.option(
     "-b",
     "--batch",
-    help="Batch size (per file). If not specified no batching is performed.",
+    help="Batch size (per file). If not specified no batching is performed, except for JSON Lines"
+    f" files which are always loaded in batches ({DEFAULT_BATCH_SIZE} records by default).",
     is_flag=False,
-    flag_value=200,
+    flag_value=DEFAULT_BATCH_SIZE,
     type=int,
     default=None,
     show_default=True,
 )
+@click.option(
+    "--batch-bytes",
+    help="Maximum size in bytes of the records in a batch (used together with --batch).",
+    type=click.IntRange(min=1),
+    default=None,
+)
 @click.option(
     "-rl",
     "--runid-log",
@@ -69,9 +141,100 @@ logger = get_logger(__name__)
     show_default=True,
 )
 @click.option("--simulate", help="Simulate ingestion only.", is_flag=True, show_default=True)
+@click.option(
+    "--parallel",
+    help="Maximum number of workflow runs to submit concurrently.",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "--record-type",
+    help="Data type (ReferenceData or MasterData) of the records in JSON Lines (.jsonl / .ndjson)"
+    " files. If not specified it is inferred from the kind of each record.",
+    type=click.Choice(STREAMED_DATA_TYPES),
+    metavar="TYPE",
+    default=None,
+)
+@click.option(
+    "--ordered",
+    help="Load files in levels so that records are loaded after the records they reference,"
+    " waiting for the runs of each level to finish before starting the next. Loading stops if"
+    " any run of a level fails.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--max-active",
+    help="Maximum number of workflow runs from this ingest to have queued or running at once."
+    " Further batches are submitted as earlier runs finish.",
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--workers",
+    help="Number of processes used to parse and prepare manifest files of 1 MiB or more.",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "--stream",
+    help="Read ReferenceData / MasterData records incrementally instead of loading whole files."
+    " Requires --batch.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "-j",
+    "--journal",
+    help="Path to a checkpoint journal recording the files, offsets and batches submitted.",
+)
+@click.option(
+    "--resume",
+    help="Continue from where the run recorded in the journal stopped.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--ledger",
+    help="Path to the local ledger of ingested records used by --skip-existing. Records are only"
+    " taken from the ledger once --wait has seen the run carrying them succeed.",
+    default=DEFAULT_LEDGER_PATH,
+    show_default=True,
+)
+@click.option(
+    "--run-index",
+    help="Path to a local index of the records carried by each workflow run, for dataload"
+    " retry. If not specified runs are not indexed.",
+)
+@click.option(
+    "--changed-only",
+    help="Only ingest files that are new or modified since they were last ingested into this"
+    " partition. Files are recorded in the scan index once their records are submitted.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--scan-index",
+    help="Path to the local index of ingested files used by --changed-only.",
+    default=DEFAULT_SCAN_INDEX_PATH,
+    show_default=True,
+)
+@click.option(
+    "--id-rules",
+    help="Path to a JSON file of rules by kind for generating stable ids for records without one:"
+    ' a list of natural key fields such as ["data.Code"], or "hash" for a hash of the record\'s'
+    " kind and data.",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
+)
 @handle_cli_exceptions
 @command_with_output(None)
-def _click_command(
+def _click_command(  # pylint: disable=too-many-locals
     state: State,
     path: str,
     files: str,
@@ -80,255 +243,350 @@ def _click_command(
     wait: bool = False,
     skip_existing: str = False,
     simulate: bool = False,
+    parallel: int = 1,
+    stream: bool = False,
+    journal: str = None,
+    resume: bool = False,
+    ledger: str = DEFAULT_LEDGER_PATH,
+    batch_bytes: int = None,
+    block_size: int = None,
+    upload_jobs: int = DEFAULT_UPLOAD_PARALLEL,
+    file_jobs: int = DEFAULT_FILE_PARALLEL,
+    workers: int = 1,
+    max_active: int = None,
+    ordered: bool = False,
+    record_type: str = None,
+    changed_only: bool = False,
+    scan_index: str = DEFAULT_SCAN_INDEX_PATH,
+    run_index: str = None,
+    id_rules: str = None,
 ):
-    """Ingest files into OSDU."""
-    return ingest(state, path, files, batch, runid_log, wait, skip_existing, simulate)
+    """Ingest files into OSDU.
+
+    Batches rejected by the server as too large are automatically split and resubmitted."""
+    options = IngestOptions(
+        files=files,
+        runid_log=runid_log,
+        batch_size=batch,
+        wait=wait,
+        skip_existing=skip_existing,
+        simulate=simulate,
+        parallel=parallel,
+        stream=stream,
+        journal=journal,
+        resume=resume,
+        ledger=ledger,
+        batch_bytes=batch_bytes,
+        workers=workers,
+        max_active=max_active,
+        ordered=ordered,
+        record_type=record_type,
+        run_index=run_index,
+        id_rules=id_rules,
+    )
+    return ingest(
+        state, path, options, block_size, upload_jobs, file_jobs, changed_only, scan_index
+    )
 
 
 def ingest(
     state: State,
     path: str,
-    files: str,
-    batch_size: int = 1,
-    runid_log: str = None,
-    wait: bool = False,
-    skip_existing: bool = False,
-    simulate: bool = False,
+    options: IngestOptions,
+    block_size: int = None,
+    upload_jobs: int = DEFAULT_UPLOAD_PARALLEL,
+    file_jobs: int = DEFAULT_FILE_PARALLEL,
+    changed_only: bool = False,
+    scan_index: str = DEFAULT_SCAN_INDEX_PATH,
 ) -> dict:
     """Ingest files into OSDU
 
     Args:
         state (State): Global state
+        path (str): Path to a file, directory of files or archive to ingest, or - for stdin
+        options (IngestOptions): How the files are ingested
+        block_size (int): Size in MiB of the blocks large associated files are uploaded in
+        upload_jobs (int): Maximum number of blocks of a file to upload concurrently
+        file_jobs (int): Maximum number of associated files to upload concurrently
+        changed_only (bool): Only ingest files that are new or modified since last ingested
+        scan_index (str): Path to the local index of ingested files
 
     Returns:
         dict: Response from service
     """
-    manifest_files = get_files_from_path(path)
-    logger.debug("Files list: %s", files)
+    if options.stream and not options.batch_size:
+        raise CliError("--stream requires a batch size to be specified with --batch")
+    if options.batch_bytes and not options.batch_size:
+        raise CliError("--batch-bytes requires a batch size to be specified with --batch")
+    if options.resume and options.journal is None:
+        raise CliError("--resume requires the --journal of the run to resume")
+
+    if is_stdin(path):
+        if options.resume or changed_only or options.ordered:
+            raise CliError(
+                "--resume, --changed-only and --ordered can't be used when reading from stdin"
+            )
+        manifest_files = [STDIN_PATH]
+    else:
+        manifest_files = iter_files_from_path(path, MANIFEST_EXTENSIONS)
+    logger.debug("Files list: %s", options.files)
+
+    index = None
+    try:
+        if changed_only:
+            index = ScanIndex(scan_index, _scan_scope(state.config))
+            manifest_files = index.changed(manifest_files)
 
-    runids = _ingest_files(
-        state.config, manifest_files, files, runid_log, batch_size, wait, skip_existing, simulate
-    )
+        with DatasetUploader(
+            state.config, block_size * MEBIBYTE if block_size else None, upload_jobs, file_jobs
+        ) as uploader:
+            runids = _ingest_files(state.config, manifest_files, options, uploader)
+
+        if index is not None and not options.simulate:
+            index.record()
+    finally:
+        if index is not None:
+            index.close()
+        close_archives()
     print(runids)
     return runids
 
 
-def _ingest_files(  # noqa:C901 pylint: disable=R0912
-    config: CLIConfig, manifest_files, files, runid_log, batch_size, wait, skip_existing, simulate
-):
-    logger.info("Files list: %s", manifest_files)
+def _ingest_files(
+    config: CLIConfig, manifest_files, options: IngestOptions, uploader: DatasetUploader = None
+) -> list:
     runids = []
-    runid_log_handle = None
-    try:
-        if runid_log is not None and not simulate:
-            # clear existing logs
-            runid_log_handle = open(runid_log, "w")  # pylint: disable=R1732
-
-        data_objects = []
-        for filepath in manifest_files:
-            if filepath.endswith(".json"):
-                with open(filepath) as file:
-                    manifest = json.load(file)
-            # Note this code currently assumes only one of MasterData, ReferenceData or Data exists!
-            if not manifest:
-                logger.error("Error with file %s. File is empty.", filepath)
-            elif "ReferenceData" in manifest and len(manifest["ReferenceData"]) > 0:
-                _update_legal_and_acl_tags_all(config, manifest["ReferenceData"])
-                if batch_size is None and not skip_existing:
-                    _create_and_submit(config, manifest, runids, runid_log_handle, simulate)
-                else:
-                    data_objects += manifest["ReferenceData"]
-                    if skip_existing and not batch_size:
-                        batch_size = len(data_objects)
-                    data_objects = _process_batch(
-                        config,
-                        batch_size,
-                        "ReferenceData",
-                        data_objects,
-                        runids,
-                        runid_log_handle,
-                        skip_existing,
-                        simulate,
-                    )
-            elif "MasterData" in manifest and len(manifest["MasterData"]) > 0:
-                _update_legal_and_acl_tags_all(config, manifest["MasterData"])
-                if batch_size is None and not skip_existing:
-                    _create_and_submit(config, manifest, runids, runid_log_handle, simulate)
-                else:
-                    data_objects += manifest["MasterData"]
-                    if skip_existing and not batch_size:
-                        batch_size = len(data_objects)
-                    data_objects = _process_batch(
-                        config,
-                        batch_size,
-                        "MasterData",
-                        data_objects,
-                        runids,
-                        runid_log_handle,
-                        skip_existing,
-                        simulate,
-                    )
-            elif "Data" in manifest:
-                _update_work_products_metadata(config, manifest["Data"], files, simulate)
-                _create_and_submit(config, manifest, runids, runid_log_handle, simulate)
-    finally:
-        if runid_log_handle is not None:
-            runid_log_handle.close()
+    with ExitStack() as stack:
+        submitter = _open_submitter(config, options, runids, stack)
+        positions = _file_positions(manifest_files, submitter.journal)
+        levels = {}
+        if options.ordered:
+            positions = list(positions)
+            levels = _order_by_level(positions)
+        # otherwise files are listed as they are submitted, so an archive is only read once
+        positions, to_prepare = itertools.tee(positions)
+
+        # parse and tag the files that aren't streamed ahead of submission, on all cores if asked
+        prepared = prepare_manifests(
+            (
+                (position["file"], position["records"])
+                for position in to_prepare
+                if not _is_streamed(position["file"], options.stream)
+            ),
+            legal_and_acl_tags(config),
+            options.workers,
+        )
+        stack.enter_context(closing(prepared))
+
+        _submit_files(config, positions, levels, prepared, options, submitter, uploader)
 
-    if wait and not simulate:
-        logger.debug("%d batches submitted. Waiting for run status", len(runids))
-        check_status(config, runids, True)
+    if options.wait and not options.simulate:
+        _wait_for_runs_to_complete(config, runids, options)
     return runids
 
 
-def _process_batch(
-    config, batch_size, data_type, data_objects, runids, runid_log_handle, skip_existing, simulate
-):
-    if skip_existing:
-        ids_to_verify = []
-        found = []
-        not_found = []
-        original_length = len(data_objects)
-        for data in data_objects:
-            if "id" in data:
-                ids_to_verify.append(data.get("id"))
-        batch_verify(config, batch_size, ids_to_verify, found, not_found, True)
-        data_objects = [
-            data for data in data_objects if "id" in data and data.get("id") in not_found
-        ]
-        logger.info(
-            "%i of %i records already exist. Submitting %i records",
-            len(found),
-            original_length,
-            len(data_objects),
+def _open_submitter(
+    config: CLIConfig, options: IngestOptions, runids: list, stack: ExitStack
+) -> WorkflowSubmitter:
+    """Open the journal, ledger, run index and run id log asked for by options and a submitter
+    recording to them, all closed by stack. The run ids the journal recorded as already submitted
+    are added to runids."""
+    journal = None
+    ledger = None
+    run_index = None
+    runid_log_handle = None
+    if not options.simulate:
+        if options.journal is not None:
+            journal = stack.enter_context(IngestJournal(options.journal, options.resume))
+            runids.extend(journal.previous_runids)
+        if options.skip_existing and options.ledger:
+            ledger = stack.enter_context(_open_ledger(config, options.ledger))
+        if options.run_index:
+            run_index = stack.enter_context(open_run_index(config, options.run_index))
+        if options.runid_log is not None:
+            # clear existing logs unless resuming
+            mode = "a" if options.resume else "w"
+            runid_log_handle = stack.enter_context(
+                open(options.runid_log, mode)  # pylint: disable=R1732
+            )
+
+    scheduler = RunScheduler(config, options.max_active) if options.max_active else None
+    return stack.enter_context(
+        WorkflowSubmitter(
+            config,
+            runids,
+            runid_log_handle,
+            options.parallel,
+            journal,
+            ledger,
+            scheduler,
+            run_index,
         )
+    )
 
-    while len(data_objects) > 0:
-        total_size = len(data_objects)
-        batch_size = min(batch_size, total_size)
-        current_batch = data_objects[:batch_size]
-        del data_objects[:batch_size]
-        print(
-            f"Processing batch - total {total_size}, batch size {len(current_batch)}, remaining {len(data_objects)}"
-        )
 
-        manifest = {"kind": "osdu:wks:Manifest:1.0.0", data_type: current_batch}
-        _create_and_submit(config, manifest, runids, runid_log_handle, simulate)
+def _file_positions(manifest_files, journal: IngestJournal = None) -> Iterator[dict]:
+    """Yield the journal checkpoint to start ingesting each file from, leaving out the files the
+    journal records as complete"""
+    for filepath in manifest_files:
+        position = {"file": filepath, "type": None, "records": 0, "offset": None}
+        if journal is not None:
+            if journal.is_complete(filepath):
+                logger.info("Skipping %s - already submitted.", filepath)
+                continue
+            position["type"], position["records"], position["offset"] = journal.position(filepath)
+        yield position
+
+
+def _order_by_level(positions: List[dict]) -> Dict[str, int]:
+    """Sort positions by the dependency level of their file, returning the level of each file"""
+    levels = {}
+    for level, level_files in enumerate(
+        dependency_levels([position["file"] for position in positions])
+    ):
+        levels.update((filepath, level) for filepath in level_files)
+    positions.sort(key=lambda position: levels[position["file"]])
+    logger.info("Loading files in %i levels", len(set(levels.values())))
+    return levels
+
+
+def _submit_files(
+    config: CLIConfig,
+    positions: Iterator[dict],
+    levels: Dict[str, int],
+    prepared: Iterator[Tuple[str, dict]],
+    options: IngestOptions,
+    submitter: WorkflowSubmitter,
+    uploader: DatasetUploader = None,
+):
+    """Submit the files at positions in turn, taking the manifests of those that aren't streamed
+    from prepared. Files are submitted a dependency level at a time if levels gives their level,
+    waiting for the runs of each level to finish before starting the next."""
+    id_generator = None
+    if options.id_rules:
+        id_generator = load_id_generator(
+            options.id_rules, config.get("core", CONFIG_DATA_PARTITION_ID)
+        )
 
-    return data_objects
+    level = 0
+    level_start = len(submitter.runids)
+    for position in positions:
+        filepath = position["file"]
+        if levels.get(filepath, 0) != level:
+            # records referenced by this level must be loaded before it is submitted
+            if not options.simulate:
+                submitter.drain()
+                _check_level_loaded(wait_for_runs(config, submitter.runids[level_start:]), level)
+                level_start = len(submitter.runids)
+            level = levels[filepath]
+        if _is_streamed(filepath, options.stream):
+            ingest_streamed_file(config, position, options, submitter, uploader, id_generator)
+        else:
+            _, manifest = next(prepared)
+            _ingest_manifest(config, position, manifest, options, submitter, uploader, id_generator)
+        _complete_file(filepath, submitter)
+
+
+def _ingest_manifest(
+    config: CLIConfig,
+    position: dict,
+    manifest: dict,
+    options: IngestOptions,
+    submitter: WorkflowSubmitter,
+    uploader: DatasetUploader = None,
+    id_generator: Callable[[dict], bool] = None,
+):
+    """Submit a prepared manifest file whole, or in batches with a batch size or skip_existing"""
+    filepath = position["file"]
+    if not manifest:
+        logger.error("Error with file %s. File is empty.", filepath)
+        return
+    if id_generator is not None and isinstance(manifest, dict):
+        for data_type in STREAMED_DATA_TYPES:
+            for datu in manifest.get(data_type) or []:
+                id_generator(datu)
+
+    # Note this code currently assumes only one of MasterData, ReferenceData or Data exists!
+    data_type = next(
+        (key for key in STREAMED_DATA_TYPES if key in manifest and len(manifest[key]) > 0), None
+    )
+    if data_type is not None:
+        if options.batch_size is None and not options.skip_existing:
+            create_and_submit(
+                config,
+                manifest,
+                submitter,
+                options.simulate,
+                source=_whole_file_source(position, data_type, manifest),
+            )
+        else:
+            process_batch(
+                config,
+                options,
+                options.batch_size or len(manifest[data_type]),
+                data_type,
+                manifest[data_type],
+                submitter,
+                dict(position, type=data_type, offset=None),
+            )
+    elif "Data" in manifest:
+        create_and_submit_work_products(
+            config, manifest, options.files, submitter, options.simulate, uploader, filepath
+        )
 
 
-def _create_and_submit(config, manifest, runids, runid_log_handle, simulate):
-    request_data = _populate_request_body(config, manifest)
-    if not simulate:
-        connection = CliOsduClient(config)
-        response_json = connection.cli_post_returning_json(
-            CONFIG_WORKFLOW_URL, "workflow/Osdu_ingest/workflowRun", request_data
+def _wait_for_runs_to_complete(config: CLIConfig, runids: list, options: IngestOptions):
+    """Wait for the runs to complete, confirming the records of those that succeeded in the
+    ledger and forgetting those of the runs that failed"""
+    logger.debug("%d batches submitted. Waiting for run status", len(runids))
+    results = check_status(config, runids, True)
+    if options.skip_existing and options.ledger:
+        with _open_ledger(config, options.ledger) as ledger:
+            ledger.confirm_runs(
+                [r[RUN_ID] for r in results if r.get(STATUS) in (FINISHED, SUCCESS)]
+            )
+            ledger.forget_runs([r[RUN_ID] for r in results if r.get(STATUS) == FAILED])
+
+
+def _check_level_loaded(statuses: dict, level: int):
+    """Stop loading files in dependency order if any run of a level failed, as the records of
+    the next levels may reference records that weren't loaded"""
+    failed = [runid for runid, run_status in statuses.items() if run_status == FAILED]
+    if failed:
+        raise CliError(
+            f"{len(failed)} workflow runs of dependency level {level} failed - not loading the"
+            f" files that depend on them. Failed runs: {', '.join(failed)}"
         )
-        logger.debug("Response %s", response_json)
-
-        runid = response_json.get("runId")
-        logger.info("Returned runID: %s", runid)
-        if runid_log_handle:
-            runid_log_handle.write(f"{runid}\n")
-        runids.append(runid)
-
-
-def _populate_request_body(config: CLIConfig, manifest):
-    request = {
-        "executionContext": {
-            "Payload": {
-                "AppKey": "osdu-cli",
-                "data-partition-id": config.get("core", CONFIG_DATA_PARTITION_ID),
-            },
-            "manifest": manifest,
-        }
-    }
-    logger.debug("Request to be sent %s", json.dumps(request, indent=2))
-    return request
 
 
-def _upload_file(config: CLIConfig, filepath):
-    connection = CliOsduClient(config)
+def _open_ledger(config: CLIConfig, ledger_path: str) -> IngestLedger:
+    return IngestLedger(
+        ledger_path, config.get("core", CONFIG_SERVER), config.get("core", CONFIG_DATA_PARTITION_ID)
+    )
+
 
-    initiate_upload_response_json = connection.cli_get_returning_json(
-        CONFIG_FILE_URL, "files/uploadURL"
+def _scan_scope(config: CLIConfig) -> str:
+    """Scope of the scan index entries for files ingested into the configured partition"""
+    return (
+        f"ingest:{config.get('core', CONFIG_SERVER)}:{config.get('core', CONFIG_DATA_PARTITION_ID)}"
     )
-    location = initiate_upload_response_json.get("Location")
-
-    if location:
-        signed_url_for_upload = location.get("SignedURL")
-        file_source = location.get("FileSource")
-
-        headers = {"Content-Type": "application/octet-stream", "x-ms-blob-type": "BlockBlob"}
-        with open(filepath, "rb") as file_handle:
-            response = requests.put(signed_url_for_upload, data=file_handle, headers=headers)
-            if response.status_code not in [200, 201]:
-                raise CliError(f"({response.status_code}) {response.text[:250]}")
-
-        # generated_file_id = upload_metadata_response_json.get("id")
-        # logger.info("%s is uploaded with file id %s with file source %s", filepath, generated_file_id, file_source)
-        # return generated_file_id, file_source
-        return file_source
-
-    raise CliError(f"No upload location returned: {initiate_upload_response_json}")
-
-
-def _update_work_products_metadata(config: CLIConfig, data, files, simulate):
-    if "WorkProduct" in data:
-        _update_legal_and_acl_tags(config, data["WorkProduct"])
-    if "WorkProductComponents" in data:
-        _update_legal_and_acl_tags_all(config, data["WorkProductComponents"])
-    if "Datasets" in data:
-        _update_legal_and_acl_tags_all(config, data["Datasets"])
-
-        # if files is specified then upload any needed data.
-        if files:
-            for dataset in data.get("Datasets"):
-                file_source_info = (
-                    dataset.get("data", {}).get("DatasetProperties", {}).get("FileSourceInfo")
-                )
-                # only process if FileSource isn't already specified
-                if file_source_info and not file_source_info.get("FileSource"):
-                    if not simulate:
-                        file_source_info["FileSource"] = _upload_file(
-                            config, os.path.join(files, file_source_info["Name"])
-                        )
-                else:
-                    logger.info(
-                        "FileSource already especified for '%s' - skipping.",
-                        file_source_info["Name"],
-                    )
-
-    # TO DO: Here we scan by name from filemap
-    # with open(file_location_map) as file:
-    #     location_map = json.load(file)
-
-    # file_name = data["WorkProduct"]["data"]["Name"]
-    # if file_name in location_map:
-    #     file_source = location_map[file_name]["file_source"]
-    #     file_id = location_map[file_name]["file_id"]
-
-    #     # Update Dataset with Generated File Id and File Source.
-    #     data["Datasets"][0]["id"] = file_id
-    #     data["Datasets"][0]["data"]["DatasetProperties"]["FileSourceInfo"]["FileSource"] = file_source
-    #     del data["Datasets"][0]["data"]["DatasetProperties"]["FileSourceInfo"]["PreloadFilePath"]
-
-    #     # Update FileId in WorkProductComponent
-    #     data["WorkProductComponents"][0]["data"]["Datasets"][0] = file_id
-    # else:
-    #     logger.warn(f"Filemap {file_name} does not exist")
-
-    # logger.debug(f"data to upload workproduct \n {data}")
-
-
-def _update_legal_and_acl_tags_all(config: CLIConfig, data):
-    for _datu in data:
-        _update_legal_and_acl_tags(config, _datu)
-
-
-def _update_legal_and_acl_tags(config: CLIConfig, datu):
-    datu["legal"]["legaltags"] = [config.get("core", CONFIG_LEGAL_TAG)]
-    datu["legal"]["otherRelevantDataCountries"] = ["US"]
-    datu["acl"]["viewers"] = [config.get("core", CONFIG_ACL_VIEWER)]
-    datu["acl"]["owners"] = [config.get("core", CONFIG_ACL_OWNER)]
+
+
+def _is_streamed(filepath: str, stream: bool) -> bool:
+    """JSON Lines files and stdin are always read incrementally, manifests only with --stream"""
+    return is_ndjson(filepath) or is_stdin(filepath) or (stream and filepath.endswith(".json"))
+
+
+def _whole_file_source(position: dict, data_type: str, manifest: dict) -> dict:
+    """Source of a submission of all the (remaining) records of a manifest file"""
+    first = position["records"]
+    return {
+        "file": position["file"],
+        "type": data_type,
+        "records": list(range(first, first + len(manifest[data_type]))),
+    }
+
+
+def _complete_file(filepath, submitter: WorkflowSubmitter):
+    if submitter.journal is not None:
+        submitter.checkpoint({"file": filepath, "complete": True})
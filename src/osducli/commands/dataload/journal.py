@@ -0,0 +1,117 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Checkpoint journal used to resume an interrupted ingest"""
+
+import json
+import os
+from typing import Optional, Tuple
+
+from osducli.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class IngestJournal:
+    """Append only journal of the work submitted by an ingest.
+
+    Each line is a json object describing a checkpoint within a manifest file:
+
+    - {"file": path, "type": data type, "records": n, "offset": byte offset, "runid": id} once a
+      batch has been submitted. records is the number of source records consumed from the file so
+      far and offset (when known) the byte offset in the file just after the last of them.
+    - {"file": path, "complete": true} once everything in a file has been submitted.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        """Open the journal
+
+        Args:
+            path (str): path of the journal file
+            resume (bool, optional): load and append to an existing journal instead of starting a
+                new one. Defaults to False.
+        """
+        self.path = path
+        self.previous_runids = []
+        self._files = {}
+        if resume and os.path.exists(path):
+            self._load()
+        self._handle = open(path, "a" if resume else "w")  # pylint: disable=R1732
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _load(self):
+        with open(self.path) as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may have been partially written if the process was killed
+                    logger.warning("Ignoring incomplete journal entry '%s'", line)
+                    continue
+                self._apply(entry)
+        logger.info(
+            "Resuming from journal %s - %i files complete, %i runs already submitted",
+            self.path,
+            sum(1 for state in self._files.values() if state["complete"]),
+            len(self.previous_runids),
+        )
+
+    def _apply(self, entry: dict):
+        state = self._files.setdefault(
+            entry["file"], {"type": None, "records": 0, "offset": None, "complete": False}
+        )
+        if entry.get("complete"):
+            state["complete"] = True
+        if "records" in entry:
+            state["type"] = entry.get("type")
+            state["records"] = entry["records"]
+            state["offset"] = entry.get("offset")
+        if entry.get("runid"):
+            self.previous_runids.append(entry["runid"])
+
+    def is_complete(self, filepath: str) -> bool:
+        """Whether everything in the given file was already submitted"""
+        return filepath in self._files and self._files[filepath]["complete"]
+
+    def position(self, filepath: str) -> Tuple[Optional[str], int, Optional[int]]:
+        """Get the point to resume a file from
+
+        Args:
+            filepath (str): path of the manifest file
+
+        Returns:
+            Tuple[Optional[str], int, Optional[int]]: data type, number of source records already
+                submitted and byte offset just after them (None if unknown)
+        """
+        state = self._files.get(filepath)
+        if state is None:
+            return None, 0, None
+        return state["type"], state["records"], state["offset"]
+
+    def record(self, entry: dict, runid: str = None):
+        """Append a checkpoint to the journal
+
+        Args:
+            entry (dict): checkpoint details
+            runid (str, optional): run id of the submitted batch. Defaults to None.
+        """
+        if runid is not None:
+            entry = dict(entry, runid=runid)
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+
+    def close(self):
+        """Close the journal file"""
+        if not self._handle.closed:
+            self._handle.close()
@@ -0,0 +1,154 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Local ledger of records ingested by the CLI"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, List
+
+from osducli.log import get_logger
+from osducli.util.batch import batched
+from osducli.util.file import ensure_directory_exists
+
+logger = get_logger(__name__)
+
+# sqlite limits the number of variables in a single statement
+_QUERY_CHUNK_SIZE = 500
+
+
+def record_hash(record: dict) -> str:
+    """Stable hash of the contents of a record
+
+    Args:
+        record (dict): record as submitted
+
+    Returns:
+        str: hex digest
+    """
+    text = json.dumps(record, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IngestLedger:
+    """Indexed local store of the record ids (and content hashes) ingested into a partition.
+
+    Records are added as pending once the workflow run carrying them has been submitted, and only
+    confirmed once that run is seen to succeed (or removed again if it failed). Only confirmed
+    records are returned by lookup, so records whose run was never seen to succeed are searched
+    for again. Records found by searching OSDU are added confirmed, without a run id.
+    """
+
+    def __init__(self, path: str, server: str, partition: str):
+        """Open (creating if needed) the ledger
+
+        Args:
+            path (str): path of the ledger database
+            server (str): OSDU server the records were ingested into
+            partition (str): data partition the records were ingested into
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            ensure_directory_exists(directory)
+        self.server = server
+        self.partition = partition
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " server TEXT NOT NULL, partition TEXT NOT NULL, id TEXT NOT NULL,"
+            " hash TEXT, runid TEXT, confirmed INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (server, partition, id))"
+        )
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(records)")]
+        if "confirmed" not in columns:
+            # ledgers written before records were confirmed - treat their records as pending
+            self._connection.execute(
+                "ALTER TABLE records ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 0"
+            )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS records_runid ON records (server, partition, runid)"
+        )
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def lookup(self, ids: List[str]) -> Dict[str, str]:
+        """Get the content hash of each of the given ids confirmed as ingested
+
+        Args:
+            ids (List[str]): record ids
+
+        Returns:
+            Dict[str, str]: id to hash for the confirmed ids in the ledger
+        """
+        known = {}
+        for chunk in batched(ids, _QUERY_CHUNK_SIZE):
+            rows = self._connection.execute(
+                "SELECT id, hash FROM records WHERE server = ? AND partition = ? AND confirmed"
+                f" AND id IN ({','.join('?' * len(chunk))})",
+                [self.server, self.partition, *chunk],
+            )
+            known.update(rows)
+        return known
+
+    def add(self, records: Iterable[dict], runid: str = None):
+        """Add (or update) records in the ledger
+
+        Args:
+            records (Iterable[dict]): records that were submitted, or found in OSDU
+            runid (str, optional): run id of the workflow run that carried them, in which case they
+                are pending until the run is confirmed. Defaults to None for records that are
+                known to exist.
+        """
+        confirmed = runid is None
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO records (server, partition, id, hash, runid, confirmed)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (self.server, self.partition, record["id"], record_hash(record), runid, confirmed)
+                for record in records
+                if "id" in record
+            ),
+        )
+        self._connection.commit()
+
+    def confirm_runs(self, runids: List[str]):
+        """Confirm the records carried by the given (successful) workflow runs as ingested
+
+        Args:
+            runids (List[str]): run ids
+        """
+        for chunk in batched(runids, _QUERY_CHUNK_SIZE):
+            self._connection.execute(
+                "UPDATE records SET confirmed = 1 WHERE server = ? AND partition = ?"
+                f" AND runid IN ({','.join('?' * len(chunk))})",
+                [self.server, self.partition, *chunk],
+            )
+        self._connection.commit()
+
+    def forget_runs(self, runids: List[str]):
+        """Remove records carried by the given (failed) workflow runs
+
+        Args:
+            runids (List[str]): run ids
+        """
+        for chunk in batched(runids, _QUERY_CHUNK_SIZE):
+            self._connection.execute(
+                "DELETE FROM records WHERE server = ? AND partition = ?"
+                f" AND runid IN ({','.join('?' * len(chunk))})",
+                [self.server, self.partition, *chunk],
+            )
+        self._connection.commit()
+
+    def close(self):
+        """Close the ledger"""
+        self._connection.close()
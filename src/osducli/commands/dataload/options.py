@@ -0,0 +1,57 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Options of a dataload ingest"""
+
+from dataclasses import dataclass
+
+DEFAULT_BATCH_SIZE = 200
+
+
+@dataclass
+class IngestOptions:  # pylint: disable=too-many-instance-attributes
+    """How files are ingested - see dataload ingest -h for a description of each option.
+
+    Args:
+        files (str): Associated files to upload for Work-Products
+        runid_log (str): Path to a file to write the run ids to
+        batch_size (int): Number of records per batch, or None to not batch manifest files
+        wait (bool): Whether to wait for runs to complete
+        skip_existing (bool): Skip reloading records that already exist
+        simulate (bool): Simulate ingestion only
+        parallel (int): Maximum number of workflow runs to submit concurrently
+        stream (bool): Read records incrementally so memory is bounded by the batch size
+        journal (str): Path to a checkpoint journal of submitted work
+        resume (bool): Skip work already recorded in the journal
+        ledger (str): Path to the local ledger of ingested records, used with skip_existing
+        batch_bytes (int): Maximum size in bytes of the records in a batch
+        workers (int): Number of processes used to parse and prepare manifest files
+        max_active (int): Maximum number of workflow runs to have queued or running at once
+        ordered (bool): Load files in levels ordered by the records they reference
+        record_type (str): Data type of the records in JSON Lines files, inferred if None
+        run_index (str): Path to the local index of the records carried by each run, or None
+            to not index runs
+        id_rules (str): Path to the rules for generating ids for records without one
+    """
+
+    files: str = None
+    runid_log: str = None
+    batch_size: int = None
+    wait: bool = False
+    skip_existing: bool = False
+    simulate: bool = False
+    parallel: int = 1
+    stream: bool = False
+    journal: str = None
+    resume: bool = False
+    ledger: str = None
+    batch_bytes: int = None
+    workers: int = 1
+    max_active: int = None
+    ordered: bool = False
+    record_type: str = None
+    run_index: str = None
+    id_rules: str = None
@@ -0,0 +1,124 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Parsing and transformation of manifest files ahead of submission"""
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator, Tuple
+
+from osducli.config import CONFIG_ACL_OWNER, CONFIG_ACL_VIEWER, CONFIG_LEGAL_TAG, CLIConfig
+from osducli.util import json_backend
+from osducli.util.archive import file_stat, open_file
+from osducli.util.manifest import STREAMED_DATA_TYPES
+
+# files smaller than this are prepared in the consuming process, as sending a parsed manifest back
+# from a worker costs about as much as parsing it
+MIN_WORKER_FILE_SIZE = 1024 * 1024
+
+
+def legal_and_acl_tags(config: CLIConfig) -> dict:
+    """Get the legal and acl tags to apply to ingested records from configuration
+
+    Args:
+        config (CLIConfig): cli configuration
+
+    Returns:
+        dict: legal tag, acl viewer and acl owner
+    """
+    return {
+        "legaltag": config.get("core", CONFIG_LEGAL_TAG),
+        "viewer": config.get("core", CONFIG_ACL_VIEWER),
+        "owner": config.get("core", CONFIG_ACL_OWNER),
+    }
+
+
+def apply_legal_and_acl_tags(datu: dict, tags: dict):
+    """Overwrite the legal and acl tags of a record
+
+    Args:
+        datu (dict): record to update
+        tags (dict): tags as returned by legal_and_acl_tags
+    """
+    datu["legal"]["legaltags"] = [tags["legaltag"]]
+    datu["legal"]["otherRelevantDataCountries"] = ["US"]
+    datu["acl"]["viewers"] = [tags["viewer"]]
+    datu["acl"]["owners"] = [tags["owner"]]
+
+
+def prepare_manifest(filepath: str, tags: dict, skip_records: int = 0) -> dict:
+    """Load a manifest file and apply the legal and acl tags to its ReferenceData / MasterData
+
+    Args:
+        filepath (str): path of the manifest file
+        tags (dict): tags as returned by legal_and_acl_tags
+        skip_records (int, optional): number of leading ReferenceData / MasterData records to drop,
+            e.g. as they were already submitted. Defaults to 0.
+
+    Returns:
+        dict: the prepared manifest, or None if the file is not a json manifest
+    """
+    if not filepath.endswith(".json"):
+        return None
+    with open_file(filepath) as file:
+        manifest = json_backend.load(file)
+    if not isinstance(manifest, dict):
+        return manifest
+
+    # Note this code currently assumes only one of MasterData, ReferenceData or Data exists!
+    for data_type in STREAMED_DATA_TYPES:
+        if manifest.get(data_type):
+            if skip_records:
+                manifest[data_type] = manifest[data_type][skip_records:]
+            for datu in manifest[data_type]:
+                apply_legal_and_acl_tags(datu, tags)
+            break
+    return manifest
+
+
+def prepare_manifests(
+    files: Iterable[Tuple[str, int]], tags: dict, workers: int = 1
+) -> Iterator[Tuple[str, dict]]:
+    """Prepare manifest files, in a pool of worker processes if workers > 1
+
+    A limited number of files are prepared ahead of the one being consumed, so memory use is
+    bounded while all cores are kept busy. Only json files of at least MIN_WORKER_FILE_SIZE bytes
+    are sent to the workers, the rest are prepared in this process when they are consumed.
+
+    Args:
+        files (Iterable[Tuple[str, int]]): path and number of records to skip of each file
+        tags (dict): tags as returned by legal_and_acl_tags
+        workers (int, optional): number of worker processes. Defaults to 1 which prepares each
+            file in this process when it is consumed.
+
+    Yields:
+        Iterator[Tuple[str, dict]]: path and prepared manifest of each file, in order
+    """
+    if workers <= 1:
+        for filepath, skip_records in files:
+            yield filepath, prepare_manifest(filepath, tags, skip_records)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for filepath, skip_records in files:
+            future = None
+            if filepath.endswith(".json") and file_stat(filepath)[0] >= MIN_WORKER_FILE_SIZE:
+                future = executor.submit(prepare_manifest, filepath, tags, skip_records)
+            pending.append((filepath, skip_records, future))
+            if len(pending) >= 2 * workers:
+                yield _prepared(pending.popleft(), tags)
+        while pending:
+            yield _prepared(pending.popleft(), tags)
+
+
+def _prepared(entry: Tuple[str, int, Future], tags: dict) -> Tuple[str, dict]:
+    """Path and prepared manifest of a pending file, preparing it now if it wasn't sent to a
+    worker"""
+    filepath, skip_records, future = entry
+    if future is None:
+        return filepath, prepare_manifest(filepath, tags, skip_records)
+    return filepath, future.result()
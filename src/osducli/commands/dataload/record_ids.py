@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Deterministic ids for records that don't have one"""
+
+import functools
+import json
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import quote
+
+from osducli.commands.dataload.ledger import record_hash
+from osducli.log import get_logger
+from osducli.util import json_backend
+from osducli.util.exceptions import CliError
+
+logger = get_logger(__name__)
+
+HASH_RULE = "hash"
+ANY_KIND = "*"
+
+
+def id_generator(rules: Dict[str, Union[str, List[str]]], partition: str) -> Callable[[dict], bool]:
+    """Get a function deriving a stable id for records without one from rules per kind, so that
+    loading the same records again updates them rather than creating duplicates and they can be
+    checked for.
+
+    Rules map a kind - in full, without its version (e.g. osdu:wks:master-data--Well) or * for any
+    kind - to either a list of natural key fields given as dotted paths into the record (e.g.
+    ["data.NameAlias", "data.Code"]) or "hash" for a hash of the record's kind and data. The id is
+    <partition>:<entity type>:<suffix>, the suffix being the percent encoded values of the key
+    fields joined by ':', or the hash in hex.
+
+    Args:
+        rules (Dict[str, Union[str, List[str]]]): natural key fields or "hash" by kind
+        partition (str): data partition the records are loaded into
+
+    Raises:
+        CliError: if a rule is neither a list of fields nor "hash"
+
+    Returns:
+        Callable[[dict], bool]: function giving a record without an id one derived from the rule
+            for its kind, returning True if an id was generated
+    """
+    for kind, rule in rules.items():
+        if rule != HASH_RULE and (
+            not isinstance(rule, list)
+            or not rule
+            or not all(isinstance(field, str) and field for field in rule)
+        ):
+            raise CliError(
+                f"The id rule for {kind} must be a list of fields or '{HASH_RULE}', not {rule}"
+            )
+    return functools.partial(_assign_id, rules, {}, partition)
+
+
+def load_id_generator(path: str, partition: str) -> Callable[[dict], bool]:
+    """Load the id rules in a JSON file
+
+    Args:
+        path (str): path of the file holding an object of rules by kind
+        partition (str): data partition the records are loaded into
+
+    Raises:
+        CliError: if the file doesn't hold valid rules
+
+    Returns:
+        Callable[[dict], bool]: id generator using the rules, see id_generator
+    """
+    with open(path, "rb") as file:
+        try:
+            rules = json_backend.load(file)
+        except json.JSONDecodeError as ex:
+            raise CliError(f"Invalid id rules {path}: {ex}") from ex
+    if not isinstance(rules, dict):
+        raise CliError(f"The id rules in {path} must be a JSON object of rules by kind")
+    return id_generator(rules, partition)
+
+
+def _assign_id(rules: dict, rules_by_kind: dict, partition: str, record: dict) -> bool:
+    if "id" in record:
+        return False
+    kind = record.get("kind")
+    rule = _rule(rules, rules_by_kind, kind)
+    if rule is None:
+        return False
+
+    if rule == HASH_RULE:
+        suffix = record_hash({"kind": kind, "data": record.get("data")})
+    else:
+        values = [_field(record, path) for path in rule]
+        if None in values:
+            missing = [path for path, value in zip(rule, values) if value is None]
+            logger.warning("No id generated for a %s record without %s", kind, missing)
+            return False
+        suffix = ":".join(_encode(value) for value in values)
+    record["id"] = f"{partition}:{kind.split(':')[2]}:{suffix}"
+    return True
+
+
+def _rule(rules: dict, rules_by_kind: dict, kind) -> Optional[Union[str, List[str]]]:
+    """Rule for a kind, cached in rules_by_kind"""
+    if kind not in rules_by_kind:
+        rule = None
+        parts = kind.split(":") if isinstance(kind, str) else []
+        if len(parts) >= 3 and parts[2]:
+            for key in (kind, ":".join(parts[:3]), ANY_KIND):
+                if key in rules:
+                    rule = rules[key]
+                    break
+        rules_by_kind[kind] = rule
+    return rules_by_kind[kind]
+
+
+def _field(record: dict, path: str):
+    value = record
+    for name in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(name)
+    return None if value == "" else value
+
+
+def _encode(value) -> str:
+    """Encode a key value using only characters allowed in record ids"""
+    text = value if isinstance(value, str) else json_backend.dumps(value)
+    return quote(text, safe="").replace("~", "%7E")
@@ -0,0 +1,247 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Dataload retry command"""
+
+from typing import Dict, List, Set
+
+import click
+
+from osducli.click_cli import State, command_with_output
+from osducli.cliclient import handle_cli_exceptions
+from osducli.commands.dataload.prepare import apply_legal_and_acl_tags, legal_and_acl_tags
+from osducli.commands.dataload.run_index import open_run_index
+from osducli.commands.dataload.status import FAILED, RUN_ID, STATUS, check_status
+from osducli.commands.dataload.submission import (
+    create_and_submit,
+    create_and_submit_work_products,
+)
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.commands.dataload.upload import DatasetUploader
+from osducli.config import CLIConfig
+from osducli.log import get_logger
+from osducli.util import json_backend
+from osducli.util.archive import close_archives, open_file
+from osducli.util.exceptions import CliError
+from osducli.util.manifest import STREAMED_DATA_TYPES, is_stdin, manifest_reader
+
+logger = get_logger(__name__)
+
+
+# click entry point
+@click.command()
+@click.option("-r", "--runid", help="Runid to retry if it failed.")
+@click.option(
+    "-rl",
+    "--runid-log",
+    help="Path to a file containing run ids to retry if they failed (see dataload ingest -h)."
+    " The run ids of the new runs are appended to it.",
+    type=click.Path(exists=True, file_okay=True, readable=True, resolve_path=True),
+)
+@click.option("-f", "--files", help="Associated files to upload for Work-Products.")
+@click.option(
+    "--parallel",
+    help="Maximum number of workflow runs to submit concurrently.",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "-w", "--wait", help="Whether to wait for runs to complete.", is_flag=True, show_default=True
+)
+@click.option("--simulate", help="Simulate resubmission only.", is_flag=True, show_default=True)
+@click.option(
+    "--run-index",
+    help="Path to the local index of the records carried by each workflow run, as written by"
+    " dataload ingest.",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
+    required=True,
+)
+@handle_cli_exceptions
+@command_with_output(None)
+def _click_command(
+    state: State,
+    runid: str = None,
+    runid_log: str = None,
+    files: str = None,
+    parallel: int = 1,
+    wait: bool = False,
+    simulate: bool = False,
+    run_index: str = None,
+):
+    """Resubmit the records of failed workflow runs.
+
+    The records carried by each run are looked up in the run index written by dataload ingest and
+    read again from their source files, so only the records of failed runs are resubmitted."""
+    return retry(state, runid, runid_log, files, parallel, wait, simulate, run_index)
+
+
+def retry(
+    state: State,
+    runid: str = None,
+    runid_log: str = None,
+    files: str = None,
+    parallel: int = 1,
+    wait: bool = False,
+    simulate: bool = False,
+    run_index: str = None,
+) -> list:
+    """Resubmit the records of failed workflow runs
+
+    Args:
+        state (State): Global state
+        runid (str): Run id to retry if it failed
+        runid_log (str): Path to a file containing run ids to retry if they failed
+        files (str): Associated files to upload for Work-Products
+        parallel (int): Maximum number of workflow runs to submit concurrently
+        wait (bool): Whether to wait for the new runs to complete
+        simulate (bool): Only report what would be resubmitted
+        run_index (str): Path to the local index of the records carried by each run
+
+    Returns:
+        list: run ids of the new runs
+    """
+    if runid is not None:
+        runids = [runid]
+    elif runid_log is not None:
+        with open(runid_log) as handle:
+            runids = [run_id.strip() for run_id in handle if run_id.strip()]
+    else:
+        raise CliError("Specify either runid or runid_log")
+
+    results = check_status(state.config, runids, False)
+    failed = [result[RUN_ID] for result in results if result.get(STATUS) == FAILED]
+    if not failed:
+        print("No failed runs to retry.")
+        return []
+
+    with open_run_index(state.config, run_index) as index:
+        sources = index.sources(failed)
+        unknown = [run_id for run_id in failed if run_id not in sources]
+        if unknown:
+            logger.warning(
+                "%i failed runs are not in the run index and can't be retried: %s",
+                len(unknown),
+                unknown,
+            )
+        print(f"Retrying {len(sources)} of {len(failed)} failed runs.")
+
+        new_runids = _resubmit(state.config, sources, files, parallel, simulate, runid_log, index)
+
+        if not simulate:
+            index.mark_retried(list(sources))
+
+    if wait and not simulate:
+        check_status(state.config, new_runids, True)
+    print(new_runids)
+    return new_runids
+
+
+def _resubmit(
+    config: CLIConfig, sources: Dict[str, dict], files, parallel, simulate, runid_log, index
+) -> List[str]:
+    """Resubmit the records of each run from its source file, returning the new run ids"""
+    tags = legal_and_acl_tags(config)
+    by_file = {}
+    for run_source in sources.values():
+        by_file.setdefault(run_source["file"], []).append(run_source)
+
+    new_runids = []
+    runid_log_handle = None
+    if runid_log is not None and not simulate:
+        runid_log_handle = open(runid_log, "a")  # pylint: disable=R1732
+    try:
+        with DatasetUploader(config) as uploader, WorkflowSubmitter(
+            config, new_runids, runid_log_handle, parallel, run_index=None if simulate else index
+        ) as submitter:
+            for filepath, run_sources in by_file.items():
+                if is_stdin(filepath):
+                    logger.warning(
+                        "%i runs read their records from stdin, which can't be read again",
+                        len(run_sources),
+                    )
+                    continue
+                if run_sources[0]["type"] not in STREAMED_DATA_TYPES:
+                    # the whole manifest is resubmitted once, however many of its runs failed
+                    with open_file(filepath) as file:
+                        manifest = json_backend.load(file)
+                    print(f"Resubmitting the Work-Product manifest {filepath}")
+                    create_and_submit_work_products(
+                        config, manifest, files, submitter, simulate, uploader, filepath
+                    )
+                    continue
+
+                _resubmit_records(config, filepath, run_sources, tags, submitter, simulate)
+    finally:
+        if runid_log_handle is not None:
+            runid_log_handle.close()
+        close_archives()
+    return new_runids
+
+
+def _resubmit_records(
+    config: CLIConfig,
+    filepath: str,
+    run_sources: List[dict],
+    tags: dict,
+    submitter: WorkflowSubmitter,
+    simulate: bool,
+):
+    """Resubmit the ReferenceData / MasterData records of each run read from the same file"""
+    wanted = set().union(*(run_source["records"] for run_source in run_sources))
+    records = _read_records(filepath, run_sources[0]["type"], wanted)
+    for run_source in run_sources:
+        data_type = run_source["type"]
+        found = [i for i in run_source["records"] if i in records]
+        if len(found) < len(run_source["records"]):
+            logger.warning(
+                "%i records are no longer in %s",
+                len(run_source["records"]) - len(found),
+                filepath,
+            )
+        batch = [records[i] for i in found]
+        _restore_ids(run_source, found, batch)
+        for datu in batch:
+            apply_legal_and_acl_tags(datu, tags)
+        manifest = {"kind": "osdu:wks:Manifest:1.0.0", data_type: batch}
+        print(f"Resubmitting {len(batch)} {data_type} records from {filepath}")
+        create_and_submit(
+            config,
+            manifest,
+            submitter,
+            simulate,
+            source=dict(run_source, records=found),
+        )
+
+
+def _restore_ids(run_source: dict, indices: List[int], records: List[dict]):
+    """Give records without an id in their file (e.g. generated with --id-rules) the ids they
+    were submitted with"""
+    if len(run_source["ids"]) != len(run_source["records"]):
+        return
+    ids = dict(zip(run_source["records"], run_source["ids"]))
+    for index, record in zip(indices, records):
+        if "id" not in record and ids.get(index) is not None:
+            record["id"] = ids[index]
+
+
+def _read_records(filepath: str, record_type: str, indices: Set[int]) -> Dict[int, dict]:
+    """Read the ReferenceData / MasterData records at the given indices of a file"""
+    records = {}
+    if not indices:
+        return records
+    last = max(indices)
+    index = -1
+    with open_file(filepath) as file:
+        for key, value in manifest_reader(file, filepath, record_type=record_type):
+            if key not in STREAMED_DATA_TYPES:
+                continue
+            index += 1
+            if index in indices:
+                records[index] = value
+            if index >= last:
+                break
+    return records
@@ -0,0 +1,178 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Local index of the source records carried by each workflow run"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, List
+
+from osducli.config import CONFIG_DATA_PARTITION_ID, CONFIG_SERVER, CLIConfig
+from osducli.log import get_logger
+from osducli.util.batch import batched
+from osducli.util.file import ensure_directory_exists
+
+logger = get_logger(__name__)
+
+# sqlite limits the number of variables in a single statement
+_QUERY_CHUNK_SIZE = 500
+
+
+def encode_ranges(indices: Iterable[int]) -> str:
+    """Compactly encode record indices as ranges, e.g. [0, 1, 2, 5] as '0-2,5'
+
+    Args:
+        indices (Iterable[int]): ascending record indices
+
+    Returns:
+        str: comma separated indices and inclusive ranges of indices
+    """
+    ranges = []
+    for index in indices:
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def decode_ranges(text: str) -> List[int]:
+    """Decode record indices encoded by encode_ranges
+
+    Args:
+        text (str): encoded indices
+
+    Returns:
+        List[int]: record indices
+    """
+    indices = []
+    for part in filter(None, text.split(",")):
+        first, _, last = part.partition("-")
+        indices.extend(range(int(first), int(last or first) + 1))
+    return indices
+
+
+class RunIndex:
+    """Indexed local store of the source of each workflow run submitted into a partition.
+
+    For each run the file its records were read from, their data type and their ids and indices
+    (counting the ReferenceData / MasterData records of the file from 0) are kept, so the records
+    of failed runs can be read again and resubmitted. Work-Product runs just record their file.
+    """
+
+    def __init__(self, path: str, server: str, partition: str):
+        """Open (creating if needed) the index
+
+        Args:
+            path (str): path of the index database
+            server (str): OSDU server the runs were submitted to
+            partition (str): data partition the runs were submitted to
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            ensure_directory_exists(directory)
+        self.server = server
+        self.partition = partition
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " server TEXT NOT NULL, partition TEXT NOT NULL, runid TEXT NOT NULL,"
+            " file TEXT NOT NULL, type TEXT NOT NULL, records TEXT, ids TEXT, retried INTEGER,"
+            " PRIMARY KEY (server, partition, runid))"
+        )
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, runid: str, source: dict, record_ids: List[str] = None):
+        """Add (or replace) the source of a run
+
+        Args:
+            runid (str): run id
+            source (dict): file, data type and (for ReferenceData / MasterData) record indices
+            record_ids (List[str], optional): ids of the records carried. Defaults to None.
+        """
+        records = source.get("records")
+        self._connection.execute(
+            "INSERT OR REPLACE INTO runs (server, partition, runid, file, type, records, ids)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.server,
+                self.partition,
+                runid,
+                source["file"],
+                source["type"],
+                encode_ranges(records) if records is not None else None,
+                json.dumps(record_ids, separators=(",", ":")) if record_ids else None,
+            ),
+        )
+        self._connection.commit()
+
+    def sources(self, runids: List[str], include_retried: bool = False) -> Dict[str, dict]:
+        """Get the source of each of the given runs known to the index
+
+        Args:
+            runids (List[str]): run ids
+            include_retried (bool, optional): also return runs that have already been retried.
+                Defaults to False.
+
+        Returns:
+            Dict[str, dict]: run id to a source with file, type, records (indices) and ids
+        """
+        found = {}
+        for chunk in batched(runids, _QUERY_CHUNK_SIZE):
+            rows = self._connection.execute(
+                "SELECT runid, file, type, records, ids, retried FROM runs"
+                f" WHERE server = ? AND partition = ? AND runid IN ({','.join('?' * len(chunk))})",
+                [self.server, self.partition, *chunk],
+            )
+            for runid, file, data_type, records, ids, retried in rows:
+                if retried and not include_retried:
+                    logger.info("Run %s has already been retried", runid)
+                    continue
+                found[runid] = {
+                    "file": file,
+                    "type": data_type,
+                    "records": decode_ranges(records) if records is not None else None,
+                    "ids": json.loads(ids) if ids else [],
+                }
+        return found
+
+    def mark_retried(self, runids: List[str]):
+        """Record that runs have been retried so they are not retried again
+
+        Args:
+            runids (List[str]): run ids of the retried runs
+        """
+        self._connection.executemany(
+            "UPDATE runs SET retried = 1 WHERE server = ? AND partition = ? AND runid = ?",
+            ((self.server, self.partition, runid) for runid in runids),
+        )
+        self._connection.commit()
+
+    def close(self):
+        """Close the index"""
+        self._connection.close()
+
+
+def open_run_index(config: CLIConfig, path: str) -> RunIndex:
+    """Open the run index of the configured server and partition
+
+    Args:
+        config (CLIConfig): cli configuration
+        path (str): path of the index database
+
+    Returns:
+        RunIndex: the open index
+    """
+    return RunIndex(
+        path, config.get("core", CONFIG_SERVER), config.get("core", CONFIG_DATA_PARTITION_ID)
+    )
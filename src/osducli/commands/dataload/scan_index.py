@@ -0,0 +1,143 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Local index of the files processed by the CLI, used to find new or modified files"""
+
+import hashlib
+import os
+import sqlite3
+from typing import Iterable, Iterator
+
+from osducli.config import CLI_CONFIG_DIR
+from osducli.log import get_logger
+from osducli.util.archive import file_stat, open_file
+from osducli.util.file import ensure_directory_exists
+
+logger = get_logger(__name__)
+
+DEFAULT_SCAN_INDEX_PATH = os.path.join(CLI_CONFIG_DIR, "scan_index.db")
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(filepath: str) -> str:
+    """Hash of the contents of a file
+
+    Args:
+        filepath (str): path of the file
+
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    with open_file(filepath) as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScanIndex:
+    """Indexed local store of the size, modification time and content hash of processed files.
+
+    Files are compared by size and modification time first, so unchanged files are never read.
+    Only files whose modification time changed but whose size did not are hashed, to tell a real
+    change from one that just touched the file. New files aren't hashed when recorded, so they are
+    read just once, by the command processing them; the first time one of them is touched it is
+    processed again and its hash kept for the next time.
+
+    Entries are kept per scope (e.g. command, server and partition) so processing a tree for one
+    target doesn't hide its files from another.
+    """
+
+    def __init__(self, path: str, scope: str):
+        """Open (creating if needed) the index
+
+        Args:
+            path (str): path of the index database
+            scope (str): scope of the entries to use
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            ensure_directory_exists(directory)
+        self.scope = scope
+        self._seen = {}
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " scope TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (scope, path))"
+        )
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def changed(self, filepaths: Iterable[str]) -> Iterator[str]:
+        """Lazily filter files down to those that are new or modified since they were recorded
+
+        Args:
+            filepaths (Iterable[str]): paths of the files to check
+
+        Yields:
+            Iterator[str]: paths of the new or modified files
+        """
+        unchanged = 0
+        for filepath in filepaths:
+            key = os.path.abspath(filepath)
+            size, mtime_ns = file_stat(filepath)
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, hash FROM files WHERE scope = ? AND path = ?",
+                (self.scope, key),
+            ).fetchone()
+            content_hash = None
+            if row is not None and row[0] == size:
+                if row[1] == mtime_ns:
+                    unchanged += 1
+                    continue
+                content_hash = file_hash(filepath)
+                if content_hash == row[2]:
+                    # touched but not modified
+                    self._store(key, size, mtime_ns, content_hash)
+                    unchanged += 1
+                    continue
+            self._seen[key] = (size, mtime_ns, content_hash)
+            yield filepath
+        self._connection.commit()
+        logger.info("Skipped %i files unchanged since they were last processed", unchanged)
+
+    def record(self, filepaths: Iterable[str] = None):
+        """Record files as processed, as they were when returned by changed
+
+        Files modified since then are left out so they are processed again next time.
+
+        Args:
+            filepaths (Iterable[str]): paths of the processed files, or None for all the files
+                returned by changed
+        """
+        if filepaths is None:
+            filepaths = list(self._seen)
+        for filepath in filepaths:
+            key = os.path.abspath(filepath)
+            current = file_stat(filepath)
+            size, mtime_ns, content_hash = self._seen.pop(key, current + (None,))
+            if (size, mtime_ns) != current:
+                logger.info("%s changed while it was processed", filepath)
+                continue
+            self._store(key, size, mtime_ns, content_hash or "")
+        self._connection.commit()
+
+    def close(self):
+        """Close the index"""
+        self._connection.close()
+
+    def _store(self, key: str, size: int, mtime_ns: int, content_hash: str):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO files (scope, path, size, mtime_ns, hash)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (self.scope, key, size, mtime_ns, content_hash),
+        )
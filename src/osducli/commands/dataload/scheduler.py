@@ -0,0 +1,145 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Backpressure on the number of active workflow runs"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from requests.exceptions import RequestException
+
+from osducli.commands.dataload.status import STATUS, TERMINAL_STATUSES, get_run
+from osducli.config import CLIConfig
+from osducli.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_POLL_INTERVAL = 10
+
+
+def wait_for_runs(
+    config: CLIConfig, runids: list, poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> Dict[str, str]:
+    """Wait for workflow runs to reach a terminal state
+
+    Args:
+        config (CLIConfig): cli configuration
+        runids (list): ids of the runs to wait for
+        poll_interval (float, optional): seconds between polls of run status.
+            Defaults to DEFAULT_POLL_INTERVAL.
+
+    Returns:
+        Dict[str, str]: the final status of each run
+    """
+    statuses = {}
+    remaining = list(runids)
+    while True:
+        active = []
+        for runid in remaining:
+            run_status = _poll_status(config, runid)
+            if run_status in TERMINAL_STATUSES:
+                statuses[runid] = run_status
+            else:
+                active.append(runid)
+        remaining = active
+        if not remaining:
+            return statuses
+        logger.info("Waiting for %i workflow runs to finish", len(remaining))
+        time.sleep(poll_interval)
+
+
+class RunScheduler:
+    """Limit the number of workflow runs started by this process that haven't yet finished.
+
+    Call acquire before starting a run and then either started with the new run id or release if
+    the run could not be started. acquire blocks while the limit is reached, polling the status of
+    the active runs until one of them reaches a terminal state and frees a slot.
+    """
+
+    def __init__(
+        self, config: CLIConfig, max_active: int, poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """Setup the new scheduler
+
+        Args:
+            config (CLIConfig): cli configuration
+            max_active (int): maximum number of non terminal runs
+            poll_interval (float, optional): seconds between polls of run status while waiting for
+                a slot. Defaults to DEFAULT_POLL_INTERVAL.
+        """
+        self.config = config
+        self.max_active = max(1, max_active)
+        self.poll_interval = poll_interval
+        self._active = []
+        self._reserved = 0
+        self._condition = threading.Condition()
+        self._polling = False
+
+    @property
+    def active(self) -> list:
+        """Run ids of the runs started that were not in a terminal state when last polled"""
+        with self._condition:
+            return list(self._active)
+
+    def acquire(self):
+        """Wait for and reserve a slot for a new run"""
+        with self._condition:
+            while len(self._active) + self._reserved >= self.max_active:
+                if self._polling or not self._active:
+                    # another thread is polling, or slots are only reserved by starting runs
+                    self._condition.wait(self.poll_interval)
+                    continue
+                self._polling = True
+                self._condition.release()
+                try:
+                    finished = self._poll()
+                finally:
+                    self._condition.acquire()
+                    self._polling = False
+                self._active = [runid for runid in self._active if runid not in finished]
+                self._condition.notify_all()
+                if len(self._active) + self._reserved >= self.max_active:
+                    logger.info(
+                        "%i workflow runs active - waiting for one to finish", len(self._active)
+                    )
+                    self._condition.wait(self.poll_interval)
+            self._reserved += 1
+
+    def started(self, runid: str):
+        """Record a run started in a reserved slot
+
+        Args:
+            runid (str): id of the new run
+        """
+        with self._condition:
+            self._reserved -= 1
+            self._active.append(runid)
+
+    def release(self):
+        """Give back a reserved slot without starting a run"""
+        with self._condition:
+            self._reserved -= 1
+            self._condition.notify_all()
+
+    def _poll(self) -> set:
+        """Get the run ids of the active runs that have reached a terminal state"""
+        finished = set()
+        for runid in self.active:
+            if _poll_status(self.config, runid) in TERMINAL_STATUSES:
+                finished.add(runid)
+        return finished
+
+
+def _poll_status(config: CLIConfig, runid: str) -> Optional[str]:
+    """Get the status of a run, or None if it couldn't be fetched this time, in which case the run
+    is still counted as active and polled again later"""
+    try:
+        response_json = get_run(config, runid)
+    except RequestException as ex:
+        logger.warning("Unable to fetch status of run %s (%s) - polling again later", runid, ex)
+        return None
+    return response_json.get(STATUS) if response_json is not None else None
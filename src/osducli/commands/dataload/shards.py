@@ -0,0 +1,127 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Writing of records into manifest files (shards) bounded in records and bytes"""
+
+import os
+from typing import List
+
+from osducli.util import json_backend
+from osducli.util.file import ensure_directory_exists
+
+DEFAULT_SHARD_SIZE = 10000
+MANIFEST_KIND = "osdu:wks:Manifest:1.0.0"
+
+_FOOTER = b"\n]}\n"
+
+
+class ShardWriter:
+    """Write records one at a time into numbered manifest files name-00001.json, name-00002.json...
+    in a directory, starting a new file whenever the next record would take the current one over
+    max_records records or max_bytes bytes, or is of a different data type.
+
+    Each shard holds the given header members (e.g. the manifest kind) followed by its records, so
+    it can be ingested on its own. Only the current record is held in memory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        max_records: int,
+        max_bytes: int = None,
+        header: dict = None,
+    ):
+        """Setup the writer
+
+        Args:
+            directory (str): directory to write the shards to, created if needed
+            name (str): name of the shards, which are numbered from name-00001.json
+            max_records (int): maximum number of records in a shard
+            max_bytes (int, optional): maximum size in bytes of a shard. A single record larger
+                than this is written to a shard on its own. Defaults to None for no limit.
+            header (dict, optional): members written at the start of every shard. Defaults to
+                the manifest kind.
+        """
+        ensure_directory_exists(directory)
+        self.directory = directory
+        self.name = name
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.shards = []
+        # the header object without its closing brace, ready for the data type to be appended
+        self._prefix = json_backend.dumps_bytes(header or {"kind": MANIFEST_KIND})[:-1]
+        if not self._prefix.endswith(b"{"):
+            self._prefix += b","
+        self._handle = None
+        self._position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(complete=exc_type is None)
+
+    @property
+    def files(self) -> List[str]:
+        """Paths of the shards written"""
+        return [os.path.join(self.directory, shard["file"]) for shard in self.shards]
+
+    def write(self, data_type: str, record: dict):
+        """Write a record, starting a new shard if needed
+
+        Args:
+            data_type (str): ReferenceData or MasterData
+            record (dict): record to write
+        """
+        data = json_backend.dumps_bytes(record)
+        shard = self.shards[-1] if self._handle is not None else None
+        if (
+            shard is None
+            or shard["type"] != data_type
+            or shard["records"] >= self.max_records
+            or (self.max_bytes and shard["bytes"] + len(data) + len(_FOOTER) + 2 > self.max_bytes)
+        ):
+            shard = self._start(data_type)
+        else:
+            self._handle.write(b",\n")
+            shard["bytes"] += 2
+        self._handle.write(data)
+        shard["bytes"] += len(data)
+        shard["records"] += 1
+        self._position += 1
+
+    def close(self, complete: bool = True):
+        """Finish the current shard
+
+        Args:
+            complete (bool, optional): whether all the records were written. An incomplete shard is
+                left unterminated so it can't be mistaken for a valid manifest. Defaults to True.
+        """
+        if self._handle is None:
+            return
+        if complete:
+            self._handle.write(_FOOTER)
+            self.shards[-1]["bytes"] += len(_FOOTER)
+        self._handle.close()
+        self._handle = None
+
+    def _start(self, data_type: str) -> dict:
+        self.close()
+        shard = {
+            "file": f"{self.name}-{len(self.shards) + 1:05d}.json",
+            "type": data_type,
+            "first": self._position,
+            "records": 0,
+            "bytes": 0,
+        }
+        self.shards.append(shard)
+        start = self._prefix + json_backend.dumps_bytes(data_type) + b":[\n"
+        filepath = os.path.join(self.directory, shard["file"])
+        self._handle = open(filepath, "wb")  # pylint: disable=R1732
+        self._handle.write(start)
+        shard["bytes"] = len(start)
+        return shard
@@ -0,0 +1,139 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Dataload split command"""
+
+import os
+
+import click
+
+from osducli.click_cli import State, command_with_output
+from osducli.cliclient import handle_cli_exceptions
+from osducli.commands.dataload.shards import DEFAULT_SHARD_SIZE, MANIFEST_KIND, ShardWriter
+from osducli.log import get_logger
+from osducli.util import json_backend
+from osducli.util.exceptions import CliError
+from osducli.util.manifest import STREAMED_DATA_TYPES, manifest_reader
+
+SHARD_INDEX_EXTENSION = ".shards"
+
+logger = get_logger(__name__)
+
+
+# click entry point
+@click.command()
+@click.option(
+    "-p",
+    "--path",
+    help="Path to the manifest or JSON Lines file to split.",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
+    required=True,
+)
+@click.option(
+    "--output-dir",
+    help="Directory to write the shards and their index to.",
+    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
+    required=True,
+)
+@click.option(
+    "--shard-size",
+    help="Maximum number of records in a shard.",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SHARD_SIZE,
+    show_default=True,
+)
+@click.option(
+    "--shard-bytes",
+    help="Maximum size in bytes of a shard. If not specified shards are only bounded in records.",
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--record-type",
+    help="Data type (ReferenceData or MasterData) of the records in a JSON Lines (.jsonl /"
+    " .ndjson) file. If not specified it is inferred from the kind of each record.",
+    type=click.Choice(STREAMED_DATA_TYPES),
+    metavar="TYPE",
+    default=None,
+)
+@handle_cli_exceptions
+@command_with_output(None)
+def _click_command(
+    state: State,
+    path: str,
+    output_dir: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    shard_bytes: int = None,
+    record_type: str = None,
+):
+    """Split a large manifest into smaller manifests (shards).
+
+    The manifest is read one record at a time and each shard keeps its kind and data type, so the
+    shards can be ingested in parallel and checkpointed one by one by dataload ingest. An index
+    of the shards is written alongside them."""
+    return split(state, path, output_dir, shard_size, shard_bytes, record_type)
+
+
+def split(
+    state: State,  # pylint: disable=unused-argument
+    path: str,
+    output_dir: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    shard_bytes: int = None,
+    record_type: str = None,
+) -> dict:
+    """Split a large manifest into smaller manifests
+
+    Args:
+        state (State): Global state
+        path (str): Path to the manifest or JSON Lines file to split
+        output_dir (str): Directory to write the shards and their index to
+        shard_size (int): Maximum number of records in a shard
+        shard_bytes (int): Maximum size in bytes of a shard
+        record_type (str): Data type of the records in a JSON Lines file, inferred if None
+
+    Returns:
+        dict: the index of the shards
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    header = {}
+    writer = None
+    complete = False
+    try:
+        with open(path, "rb") as file:
+            for key, value in manifest_reader(file, path, record_type=record_type):
+                if key not in STREAMED_DATA_TYPES:
+                    if key == "Data":
+                        raise CliError(f"{path} is a Work-Product manifest, which can't be split")
+                    if writer is None:
+                        header[key] = value
+                    elif header.get(key) != value:
+                        logger.warning("%s after the records of %s is not in the shards", key, path)
+                    continue
+
+                if writer is None:
+                    header.setdefault("kind", MANIFEST_KIND)
+                    writer = ShardWriter(output_dir, name, shard_size, shard_bytes, header)
+                writer.write(key, value)
+        complete = True
+    finally:
+        if writer is not None:
+            writer.close(complete)
+
+    if writer is None:
+        raise CliError(f"No ReferenceData or MasterData records found in {path}")
+
+    index = {
+        "source": path,
+        "kind": header["kind"],
+        "records": sum(shard["records"] for shard in writer.shards),
+        "shards": writer.shards,
+    }
+    index_path = os.path.join(output_dir, name + SHARD_INDEX_EXTENSION)
+    with open(index_path, "wb") as file:
+        file.write(json_backend.dumps_bytes(index, indent=2))
+    logger.info("Wrote %i shards and their index %s", len(writer.shards), index_path)
+    return index
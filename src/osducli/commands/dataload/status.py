@@ -6,15 +6,28 @@
 
 """Dataload status command"""
 
+import os
 import sys
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
-from osducli.config import CONFIG_WORKFLOW_URL, CLIConfig
+from osducli.cliclient import get_client, handle_cli_exceptions
+from osducli.commands.dataload.failed_runs import group_failed_runs
+from osducli.commands.dataload.run_index import RunIndex
+from osducli.config import (
+    CONFIG_DATA_PARTITION_ID,
+    CONFIG_SERVER,
+    CONFIG_WORKFLOW_URL,
+    CLIConfig,
+)
 from osducli.log import get_logger
+from osducli.util import json_backend
+from osducli.util.exceptions import CliError
 
 START_TIME = "startTimeStamp"
 END_TIME = "endTimeStamp"
@@ -23,6 +36,9 @@ RUN_ID = "runId"
 TIME_TAKEN = "timeTaken"
 FINISHED = "finished"
 FAILED = "failed"
+SUCCESS = "success"
+TERMINAL_STATUSES = (FINISHED, FAILED, SUCCESS)
+DEFAULT_STATUS_PARALLEL = 8
 
 logger = get_logger(__name__)
 
@@ -39,19 +55,65 @@ logger = get_logger(__name__)
 @click.option(
     "-w", "--wait", help="Whether to wait for runs to complete.", is_flag=True, show_default=True
 )
+@click.option(
+    "--parallel",
+    help="Maximum number of run statuses to fetch concurrently.",
+    type=click.IntRange(min=1),
+    default=DEFAULT_STATUS_PARALLEL,
+    show_default=True,
+)
+@click.option(
+    "--failed-by-type",
+    help="Report the failed runs grouped by the types of records they carried, found in the run"
+    " index, and by error, with the number of runs and records in each group.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option("--report", help="Path to write the report of failed runs by type to as json.")
+@click.option(
+    "--run-index",
+    help="Path to the local index of the records carried by each workflow run, required by"
+    " --failed-by-type. See dataload ingest -h.",
+)
 @handle_cli_exceptions
 @command_with_output(None)
-def _click_command(state: State, runid: str = None, runid_log: str = None, wait: bool = False):
+def _click_command(
+    state: State,
+    runid: str = None,
+    runid_log: str = None,
+    wait: bool = False,
+    parallel: int = DEFAULT_STATUS_PARALLEL,
+    failed_by_type: bool = False,
+    report: str = None,
+    run_index: str = None,
+):
     """Get status of workflow runs."""
-    return status(state, runid, runid_log, wait)
+    return status(state, runid, runid_log, wait, parallel, failed_by_type, report, run_index)
 
 
-def status(state: State, runid: str = None, runid_log: str = None, wait: bool = False) -> dict:
+def status(
+    state: State,
+    runid: str = None,
+    runid_log: str = None,
+    wait: bool = False,
+    parallel: int = 1,
+    failed_by_type: bool = False,
+    report: str = None,
+    run_index: str = None,
+) -> dict:
     """Get status of workflow runs
 
     Args:
         state (State): Global state
-        group (str): Email address of the group
+        runid (str): Run id to get the status of
+        runid_log (str): Path to a file containing run ids to get status of
+        wait (bool): Whether to wait for runs to complete
+        parallel (int): Maximum number of run statuses to fetch concurrently
+        failed_by_type (bool): Report failed runs grouped by the types of records they carried
+            and their error instead of the status of each run
+        report (str): Path to write the report of failed runs by type to
+        run_index (str): Path to the local index of the records carried by each run
 
     Returns:
         dict: Response from service
@@ -66,21 +128,25 @@ def status(state: State, runid: str = None, runid_log: str = None, wait: bool =
         logger.error("Specify either runid or runid_log")
         sys.exit(1)
 
-    return check_status(state.config, runids, wait)
+    if failed_by_type:
+        return _failed_by_type(state.config, runids, parallel, run_index, report)
+
+    return check_status(state.config, runids, wait, parallel)
 
 
-def check_status(config: CLIConfig, runids: list, wait: bool) -> list:
+def check_status(config: CLIConfig, runids: list, wait: bool, parallel: int = 1) -> list:
     """Check statis for a list of runids
 
     Args:
         config (CLIConfig): configuration
         runids (list): list of runids
         wait (bool): whether to wait for status to change out of running
+        parallel (int, optional): maximum number of statuses to fetch concurrently. Defaults to 1.
 
     Returns:
         list: list containing runid and status.
     """
-    results = _check_status(config, runids)
+    results = _check_status(config, runids, parallel)
 
     if wait:
         # parse the results to see if the ingestion is complete.
@@ -100,20 +166,92 @@ def check_status(config: CLIConfig, runids: list, wait: bool) -> list:
 
             print(results)
             time.sleep(30)  # 30 seconds sleep.
-            results = _check_status(config, runids)  # recheck the status.
+            results = _check_status(config, runids, parallel)  # recheck the status.
 
     return results
 
 
-def _check_status(config: CLIConfig, run_id_list: list):
+def get_run(config: CLIConfig, run_id: str) -> dict:
+    """Get the details of an Osdu_ingest workflow run
+
+    Args:
+        config (CLIConfig): configuration
+        run_id (str): run id
+
+    Returns:
+        dict: workflow run details including its status
+    """
+    connection = get_client(config)
+    return connection.cli_get_returning_json(
+        CONFIG_WORKFLOW_URL, "workflow/Osdu_ingest/workflowRun/" + run_id
+    )
+
+
+def get_runs(config: CLIConfig, run_ids: List[str], parallel: int = 1) -> List[dict]:
+    """Get the details of a number of Osdu_ingest workflow runs, fetching them concurrently
+
+    Args:
+        config (CLIConfig): configuration
+        run_ids (List[str]): run ids
+        parallel (int, optional): maximum number of runs to fetch concurrently. Defaults to 1.
+
+    Returns:
+        List[dict]: workflow run details of each run, in the same order as run_ids
+    """
+    if parallel <= 1 or len(run_ids) <= 1:
+        return [get_run(config, run_id) for run_id in run_ids]
+
+    # make sure the shared connection pool can serve all the concurrent requests
+    get_client(config, parallel)
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="osducli-status") as executor:
+        return list(executor.map(lambda run_id: get_run(config, run_id), run_ids))
+
+
+def _failed_by_type(
+    config: CLIConfig, runids: list, parallel: int, run_index: str, report: str
+) -> dict:
+    if not run_index:
+        raise CliError("--failed-by-type requires the --run-index written by dataload ingest")
+    if not os.path.exists(run_index):
+        raise CliError(
+            f"Run index {run_index} doesn't exist - write one with dataload ingest --run-index"
+        )
+
+    runs = get_runs(config, runids, parallel)
+    statuses = Counter(run.get(STATUS) if run else "unknown" for run in runs)
+    failed = [run for run in runs if run and run.get(STATUS) == FAILED]
+
+    sources = {}
+    if failed:
+        with RunIndex(
+            run_index,
+            config.get("core", CONFIG_SERVER),
+            config.get("core", CONFIG_DATA_PARTITION_ID),
+        ) as index:
+            sources = index.sources([run.get(RUN_ID) for run in failed], include_retried=True)
+
+    groups = group_failed_runs(failed, sources)
+    print(
+        f"{len(failed)} of {len(runids)} runs failed, in {len(groups)} groups by record type"
+        " and error."
+    )
+    failed_report = {
+        "runs": len(runids),
+        "statuses": dict(statuses),
+        "failed": len(failed),
+        "groups": groups,
+    }
+    if report is not None:
+        with open(report, "w") as handle:
+            handle.write(json_backend.dumps(failed_report, indent=2))
+    return failed_report
+
+
+def _check_status(config: CLIConfig, run_id_list: list, parallel: int = 1):
     logger.debug("list of run-ids: %s", run_id_list)
 
     results = []
-    for run_id in run_id_list:
-        connection = CliOsduClient(config)
-        response_json = connection.cli_get_returning_json(
-            CONFIG_WORKFLOW_URL, "workflow/Osdu_ingest/workflowRun/" + run_id
-        )
+    for run_id, response_json in zip(run_id_list, get_runs(config, run_id_list, parallel)):
         if response_json is not None:
             run_status = response_json.get(STATUS)
             if run_status == "running":
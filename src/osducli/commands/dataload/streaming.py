@@ -0,0 +1,320 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Batched submission of the records of manifest and JSON Lines files, read incrementally"""
+
+import itertools
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable
+
+from osducli.commands.dataload.ledger import IngestLedger, record_hash
+from osducli.commands.dataload.options import DEFAULT_BATCH_SIZE, IngestOptions
+from osducli.commands.dataload.prepare import apply_legal_and_acl_tags, legal_and_acl_tags
+from osducli.commands.dataload.submission import (
+    create_and_submit,
+    create_and_submit_work_products,
+)
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.commands.dataload.upload import DatasetUploader
+from osducli.commands.dataload.verify import batch_verify
+from osducli.config import CLIConfig
+from osducli.log import get_logger
+from osducli.util.archive import open_file
+from osducli.util.batch import batched, batched_with_last, json_size
+from osducli.util.manifest import STREAMED_DATA_TYPES, is_stdin, manifest_reader
+
+LOOKUP_AHEAD = 2  # batches of existence lookups to run ahead of submission with --skip-existing
+
+logger = get_logger(__name__)
+
+
+def ingest_streamed_file(
+    config: CLIConfig,
+    position: dict,
+    options: IngestOptions,
+    submitter: WorkflowSubmitter,
+    uploader: DatasetUploader = None,
+    id_generator: Callable[[dict], bool] = None,
+):
+    """Ingest a manifest or JSON Lines file reading records incrementally.
+
+    Each run of records of one data type is fed through a single batching (and, with
+    skip_existing, lookup) pipeline as it is read, so batches are filled across the whole run and
+    looking up records overlaps with submitting earlier ones.
+
+    position is the journal checkpoint to continue from - records already submitted are skipped,
+    seeking straight past them when their byte offset is known."""
+    filepath = position["file"]
+    resume_at = None
+    skip = position["records"]
+    if position["offset"] is not None:
+        resume_at = (position["type"], position["offset"])
+        skip = 0
+    else:
+        # records are counted from the start of the file, skipping those already submitted
+        position = dict(position, records=0)
+
+    header = {}
+    data_type = None
+    records = position["records"]
+    with _open_manifest(filepath) as file:
+        reader = manifest_reader(
+            file, filepath, resume_at=resume_at, record_type=options.record_type
+        )
+        for key, group in itertools.groupby(reader, key=lambda item: item[0]):
+            values = (value for _, value in group)
+            if key == "Data" and is_stdin(filepath):
+                # each Work-Product manifest piped in is submitted as soon as it has been read
+                for value in values:
+                    create_and_submit_work_products(
+                        config,
+                        {**header, key: value},
+                        options.files,
+                        submitter,
+                        options.simulate,
+                        uploader,
+                        filepath,
+                    )
+                continue
+            if key not in STREAMED_DATA_TYPES:
+                header.update((key, value) for value in values)
+                continue
+
+            data_type = key
+            if skip > 0:
+                skipped = sum(1 for _ in itertools.islice(values, skip))
+                skip -= skipped
+                records += skipped
+            records += _submit_records(
+                config,
+                options,
+                values,
+                reader,
+                submitter,
+                dict(position, type=data_type, records=records, offset=None),
+                id_generator,
+            )
+
+    if data_type is None and resume_at is None:
+        if "Data" in header:
+            create_and_submit_work_products(
+                config, header, options.files, submitter, options.simulate, uploader, filepath
+            )
+        elif not header:
+            logger.error("Error with file %s. File is empty.", filepath)
+
+
+def _open_manifest(filepath: str):
+    """Open a manifest file for reading as binary - stdin is left open once read"""
+    if is_stdin(filepath):
+        return nullcontext(sys.stdin.buffer)
+    return open_file(filepath)
+
+
+def _submit_records(config, options, values, reader, submitter, position, id_generator) -> int:
+    """Submit a run of records of one data type read from a streamed file in batches, returning
+    the number of records read"""
+    batch_size = options.batch_size or DEFAULT_BATCH_SIZE
+    offsets = OrderedDict()
+    return process_batch(
+        config,
+        options,
+        batch_size,
+        position["type"],
+        _read_records(config, values, reader, offsets, batch_size, id_generator),
+        submitter,
+        position,
+        offsets,
+    )
+
+
+def _read_records(config, values, reader, offsets: OrderedDict, batch_size: int, id_generator=None):
+    """Tag (and give ids to) records as they are read from a streamed file, noting the byte offset
+    in offsets after each number of records read. Only the offsets of the records that can still
+    be waiting to be submitted are kept."""
+    limit = (LOOKUP_AHEAD + 2) * batch_size + 1
+    tags = legal_and_acl_tags(config)
+    for count, value in enumerate(values, 1):
+        if id_generator is not None:
+            id_generator(value)
+        apply_legal_and_acl_tags(value, tags)
+        offsets[count] = reader.offset
+        if len(offsets) > limit:
+            offsets.popitem(last=False)
+        yield value
+
+
+def process_batch(
+    config: CLIConfig,
+    options: IngestOptions,
+    batch_size: int,
+    data_type: str,
+    data_objects,
+    submitter: WorkflowSubmitter,
+    position: dict = None,
+    offsets: OrderedDict = None,
+) -> int:
+    """Submit data_objects in batches of at most batch_size records and (if given) batch_bytes
+    bytes of serialized records.
+
+    data_objects can be a list or any iterable of records, which is read as the batches are
+    submitted. position is the journal checkpoint at the start of data_objects (file, data type
+    and number of source records before them). A checkpoint recording the source records consumed
+    is submitted along with each batch, including the byte offset after them if offsets gives it
+    for that number of records.
+
+    With skip_existing, existence lookups run ahead on a background thread so that checking the
+    next records overlaps with submitting the current batch.
+
+    Returns:
+        int: number of records read from data_objects
+    """
+    total = len(data_objects) if isinstance(data_objects, list) else None
+    read = 0
+
+    def counted():
+        nonlocal read
+        for data in data_objects:
+            read += 1
+            yield data
+
+    if options.skip_existing:
+        records = _records_to_submit(config, batch_size, counted(), submitter.ledger)
+    else:
+        records = enumerate(counted())
+
+    # batches of (source index, record) - a record is read beyond each batch so that the last
+    # batch is known when it is submitted
+    full_checkpoint_recorded = False
+    for current_batch, last in batched_with_last(
+        records, batch_size, options.batch_bytes, lambda item: json_size(item[1])
+    ):
+        consumed = current_batch[-1][0] + 1
+        if total is not None:
+            print(
+                f"Processing batch - total {total - current_batch[0][0]}, "
+                f"batch size {len(current_batch)}, remaining {total - consumed}"
+            )
+        else:
+            print(f"Processing batch - batch size {len(current_batch)}, records read {consumed}")
+        if last:
+            consumed = read
+            full_checkpoint_recorded = True
+
+        checkpoint = None
+        source = None
+        if position is not None:
+            checkpoint = _checkpoint(position, consumed, offsets)
+            source = {
+                "file": position["file"],
+                "type": data_type,
+                "records": [position["records"] + index for index, _ in current_batch],
+            }
+        create_and_submit(
+            config,
+            {"kind": "osdu:wks:Manifest:1.0.0", data_type: [d for _, d in current_batch]},
+            submitter,
+            options.simulate,
+            checkpoint,
+            source=source,
+        )
+
+    if position is not None and not full_checkpoint_recorded and read > 0 and not options.simulate:
+        # the remaining records already existed - still record the progress
+        submitter.checkpoint(_checkpoint(position, read, offsets))
+
+    return read
+
+
+def _checkpoint(position: dict, consumed: int, offsets: OrderedDict = None) -> dict:
+    """Journal checkpoint after the first consumed records from position, with the byte offset
+    after them if offsets gives it"""
+    offset = offsets.get(consumed) if offsets is not None else None
+    return dict(position, records=position["records"] + consumed, offset=offset)
+
+
+def _records_to_submit(config, batch_size, data_objects, ledger: IngestLedger = None):
+    """Yield the source index and record of the records in data_objects that don't already exist
+    in OSDU.
+
+    Records are looked up batch_size at a time. Records confirmed in the local ledger with the same
+    content are skipped, and those confirmed with different content are submitted, without a
+    search. Records the ledger hasn't confirmed are searched for, on a background thread running
+    up to LOOKUP_AHEAD batches ahead of the records being consumed. Any found are added to the
+    ledger. Records without an id can't be looked up, so are always submitted."""
+    counts = {"read": 0, "skip": 0, "found": 0, "submit": 0, "no id": 0}
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="osducli-verify") as executor:
+        lookups = deque()
+        try:
+            for number, chunk in enumerate(batched(data_objects, batch_size)):
+                counts["read"] += len(chunk)
+                lookups.append(
+                    _start_lookup(config, batch_size, number * batch_size, chunk, ledger, executor)
+                )
+                if len(lookups) > LOOKUP_AHEAD:
+                    yield from _finish_lookup(*lookups.popleft(), ledger, counts)
+            while lookups:
+                yield from _finish_lookup(*lookups.popleft(), ledger, counts)
+        finally:
+            for lookup in lookups:
+                lookup[-1].cancel()
+
+    logger.info(
+        "%i of %i records already exist (%i in the local ledger). Submitted %i records",
+        counts["skip"] + counts["found"],
+        counts["read"],
+        counts["skip"],
+        counts["submit"],
+    )
+    if counts["no id"]:
+        logger.warning(
+            "%i records have no id so can't be checked for and were submitted (see --id-rules)",
+            counts["no id"],
+        )
+
+
+def _start_lookup(config, batch_size, start, chunk, ledger, executor):
+    known = {}
+    if ledger is not None:
+        known = ledger.lookup([data["id"] for data in chunk if "id" in data])
+
+    ids_to_verify = []
+    skip = set()
+    for data in chunk:
+        if "id" in data:
+            record_id = data.get("id")
+            if record_id not in known:
+                ids_to_verify.append(record_id)
+            elif known[record_id] == record_hash(data):
+                skip.add(record_id)
+
+    return start, chunk, skip, executor.submit(_existing_ids, config, batch_size, ids_to_verify)
+
+
+def _finish_lookup(start, chunk, skip, future, ledger, counts):
+    found = future.result()
+    if ledger is not None and found:
+        ledger.add(data for data in chunk if data.get("id") in found)
+    counts["skip"] += len(skip)
+    counts["found"] += len(found)
+    for index, data in enumerate(chunk):
+        if "id" not in data:
+            counts["no id"] += 1
+        elif data.get("id") in skip or data.get("id") in found:
+            continue
+        counts["submit"] += 1
+        yield start + index, data
+
+
+def _existing_ids(config, batch_size, ids_to_verify) -> set:
+    found = []
+    not_found = []
+    if ids_to_verify:
+        batch_verify(config, batch_size, ids_to_verify, found, not_found, True)
+    return set(found)
@@ -0,0 +1,155 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Building and submitting the workflow requests for manifests, shared by dataload ingest and
+retry"""
+
+import os
+
+from osducli.commands.dataload.prepare import apply_legal_and_acl_tags, legal_and_acl_tags
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.commands.dataload.upload import DatasetUploader
+from osducli.config import CONFIG_DATA_PARTITION_ID, CLIConfig
+from osducli.log import LazyPayload, get_logger
+
+logger = get_logger(__name__)
+
+
+def create_and_submit(
+    config: CLIConfig,
+    manifest: dict,
+    submitter: WorkflowSubmitter,
+    simulate: bool,
+    checkpoint: dict = None,
+    prepare=None,
+    source: dict = None,
+):
+    """Build the workflow request for a manifest and submit it
+
+    Args:
+        config (CLIConfig): cli configuration
+        manifest (dict): manifest to load
+        submitter (WorkflowSubmitter): submitter to submit the request with
+        simulate (bool): only build the request (and run prepare), without submitting it
+        checkpoint (dict, optional): journal checkpoint recorded with the run. Defaults to None.
+        prepare (Callable, optional): called before the request is sent, e.g. to upload files.
+            Defaults to None.
+        source (dict, optional): source of the records added to the run index. Defaults to None.
+    """
+    if simulate and prepare is not None:
+        prepare()
+    request_data = _populate_request_body(config, manifest)
+    if not simulate:
+        submitter.submit(request_data, checkpoint, prepare, source)
+
+
+def create_and_submit_work_products(
+    config, manifest, files, submitter: WorkflowSubmitter, simulate, uploader=None, filepath=None
+):
+    """Submit a Work-Product manifest, uploading its datasets as part of the submission so that
+    uploads for different manifests run concurrently when submitting in parallel
+
+    Args:
+        config (CLIConfig): cli configuration
+        manifest (dict): Work-Product manifest
+        files (str): directory of the associated files to upload
+        submitter (WorkflowSubmitter): submitter to submit the request with
+        simulate (bool): only build the request, without uploading files or submitting it
+        uploader (DatasetUploader, optional): uploader of the files. Defaults to None to create
+            one per manifest.
+        filepath (str, optional): file the manifest was read from. Defaults to None.
+    """
+
+    def prepare():
+        _update_work_products_metadata(config, manifest["Data"], files, simulate, uploader)
+
+    source = {"file": filepath, "type": "Data"} if filepath is not None else None
+    create_and_submit(config, manifest, submitter, simulate, prepare=prepare, source=source)
+
+
+def _populate_request_body(config: CLIConfig, manifest):
+    request = {
+        "executionContext": {
+            "Payload": {
+                "AppKey": "osdu-cli",
+                "data-partition-id": config.get("core", CONFIG_DATA_PARTITION_ID),
+            },
+            "manifest": manifest,
+        }
+    }
+    logger.debug("Request to be sent %s", LazyPayload(request, indent=2))
+    return request
+
+
+def _update_work_products_metadata(
+    config: CLIConfig, data, files, simulate, uploader: DatasetUploader = None
+):
+    if "WorkProduct" in data:
+        _update_legal_and_acl_tags(config, data["WorkProduct"])
+    if "WorkProductComponents" in data:
+        _update_legal_and_acl_tags_all(config, data["WorkProductComponents"])
+    if "Datasets" in data:
+        _update_legal_and_acl_tags_all(config, data["Datasets"])
+
+        # if files is specified then upload any needed data.
+        if files:
+            to_upload = []
+            for dataset in data.get("Datasets"):
+                file_source_info = (
+                    dataset.get("data", {}).get("DatasetProperties", {}).get("FileSourceInfo")
+                )
+                # only process if FileSource isn't already specified
+                if file_source_info and not file_source_info.get("FileSource"):
+                    if not simulate:
+                        to_upload.append(file_source_info)
+                else:
+                    logger.info(
+                        "FileSource already especified for '%s' - skipping.",
+                        file_source_info["Name"],
+                    )
+
+            if to_upload:
+                if uploader is None:
+                    with DatasetUploader(config) as new_uploader:
+                        file_sources = new_uploader.upload_all(
+                            [os.path.join(files, info["Name"]) for info in to_upload]
+                        )
+                else:
+                    file_sources = uploader.upload_all(
+                        [os.path.join(files, info["Name"]) for info in to_upload]
+                    )
+                for file_source_info, file_source in zip(to_upload, file_sources):
+                    file_source_info["FileSource"] = file_source
+
+    # TO DO: Here we scan by name from filemap
+    # with open(file_location_map) as file:
+    #     location_map = json.load(file)
+
+    # file_name = data["WorkProduct"]["data"]["Name"]
+    # if file_name in location_map:
+    #     file_source = location_map[file_name]["file_source"]
+    #     file_id = location_map[file_name]["file_id"]
+
+    #     # Update Dataset with Generated File Id and File Source.
+    #     data["Datasets"][0]["id"] = file_id
+    #     data["Datasets"][0]["data"]["DatasetProperties"]["FileSourceInfo"]["FileSource"] = file_source
+    #     del data["Datasets"][0]["data"]["DatasetProperties"]["FileSourceInfo"]["PreloadFilePath"]
+
+    #     # Update FileId in WorkProductComponent
+    #     data["WorkProductComponents"][0]["data"]["Datasets"][0] = file_id
+    # else:
+    #     logger.warn(f"Filemap {file_name} does not exist")
+
+    # logger.debug(f"data to upload workproduct \n {data}")
+
+
+def _update_legal_and_acl_tags_all(config: CLIConfig, data):
+    for _datu in data:
+        _update_legal_and_acl_tags(config, _datu)
+
+
+def _update_legal_and_acl_tags(config: CLIConfig, datu):
+    apply_legal_and_acl_tags(datu, legal_and_acl_tags(config))
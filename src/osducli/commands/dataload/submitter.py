@@ -0,0 +1,311 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Bounded concurrency submission of workflow runs"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional, Tuple
+
+from requests.models import HTTPError
+
+from osducli.cliclient import get_client
+from osducli.commands.dataload.journal import IngestJournal
+from osducli.commands.dataload.ledger import IngestLedger
+from osducli.commands.dataload.run_index import RunIndex
+from osducli.commands.dataload.scheduler import RunScheduler
+from osducli.config import CONFIG_WORKFLOW_URL, CLIConfig
+from osducli.log import LazyPayload, get_logger
+from osducli.util.exceptions import PayloadTooLargeError
+from osducli.util.manifest import STREAMED_DATA_TYPES
+
+logger = get_logger(__name__)
+
+WORKFLOW_RUN_PATH = "workflow/Osdu_ingest/workflowRun"
+REQUEST_ENTITY_TOO_LARGE = 413
+
+
+class WorkflowSubmitter:
+    """Submit ingestion workflow runs keeping up to `parallel` requests in flight.
+
+    Run ids are recorded (and written to the run id log) in submission order, regardless of the
+    order in which the requests complete. On the first failure no further requests are started,
+    requests already in flight are allowed to finish and recorded, and the error is re-raised.
+
+    Checkpoints passed with a submission are written to the journal (if any) in the same order, so
+    the journal never records progress past a batch that was not submitted. Likewise records are
+    only added to the ledger (if any), pending, once the run carrying them has been submitted, and
+    the source of a submission is added to the run index (if any) under the run id of each run it
+    resulted in.
+
+    If a scheduler is given each run is only started once it grants a slot, capping the number of
+    active runs regardless of `parallel`.
+    """
+
+    def __init__(
+        self,
+        config: CLIConfig,
+        runids: list,
+        runid_log_handle=None,
+        parallel: int = 1,
+        journal: IngestJournal = None,
+        ledger: IngestLedger = None,
+        scheduler: RunScheduler = None,
+        run_index: RunIndex = None,
+    ):
+        """Setup the new submitter
+
+        Args:
+            config (CLIConfig): cli configuration
+            runids (list): list to which returned run ids are appended
+            runid_log_handle ([type], optional): open file to write run ids to. Defaults to None.
+            parallel (int, optional): maximum number of concurrent requests. Defaults to 1.
+            journal (IngestJournal, optional): journal to record checkpoints to. Defaults to None.
+            ledger (IngestLedger, optional): ledger to add submitted records to, pending.
+                Defaults to None.
+            scheduler (RunScheduler, optional): limits the number of active runs.
+                Defaults to None.
+            run_index (RunIndex, optional): index to add the source of each run to.
+                Defaults to None.
+        """
+        self.config = config
+        self.runids = runids
+        self.runid_log_handle = runid_log_handle
+        self.journal = journal
+        self.ledger = ledger
+        self.scheduler = scheduler
+        self.run_index = run_index
+        self.parallel = max(1, parallel or 1)
+        self._pending = deque()
+        self._executor = None
+        if self.parallel > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.parallel, thread_name_prefix="osducli-submit"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._abort()
+
+    def submit(
+        self,
+        request_data: dict,
+        checkpoint: dict = None,
+        prepare: Callable = None,
+        source: dict = None,
+    ):
+        """Submit a workflow run, blocking only while the maximum number of requests are in flight
+
+        If the request is rejected as too large it is split in half and each half submitted in
+        turn, so a single submission can result in more than one run.
+
+        Args:
+            request_data (dict): body of the workflowRun request
+            checkpoint (dict, optional): journal entry to record once submitted. Defaults to None.
+            prepare (Callable, optional): called (concurrently with other submissions) to finish
+                preparing request_data before it is sent, e.g. to upload its files.
+                Defaults to None.
+            source (dict, optional): file, data type and source indices of the records in
+                request_data to add to the run index. Defaults to None.
+        """
+        if self._executor is None:
+            self._record(self._prepare_and_send(request_data, prepare, source), checkpoint)
+            return
+
+        while len(self._pending) >= self.parallel:
+            wait([future for future, _ in self._pending], return_when=FIRST_COMPLETED)
+            self._drain_completed()
+
+        self._pending.append(
+            (
+                self._executor.submit(self._prepare_and_send, request_data, prepare, source),
+                checkpoint,
+            )
+        )
+
+    def checkpoint(self, checkpoint: dict):
+        """Record a journal entry once everything submitted before it has been recorded
+
+        Args:
+            checkpoint (dict): journal entry
+        """
+        if not self._pending:
+            self._record([], checkpoint)
+            return
+
+        future = Future()
+        future.set_result([])
+        self._pending.append((future, checkpoint))
+
+    def flush(self):
+        """Wait for all in flight requests to complete and record their run ids"""
+        try:
+            self.drain()
+        finally:
+            self._shutdown()
+
+    def drain(self):
+        """Wait for all in flight requests to complete and record their run ids, keeping the
+        submitter open for further submissions"""
+        try:
+            while self._pending:
+                future, checkpoint = self._pending.popleft()
+                self._record(future.result(), checkpoint)
+        except BaseException:
+            self._abort()
+            raise
+
+    def _drain_completed(self):
+        """Record completed requests from the head of the queue so ordering is preserved"""
+        failed = next((f for f, _ in self._pending if f.done() and f.exception() is not None), None)
+        if failed is not None:
+            self._abort()
+            raise failed.exception()
+
+        while self._pending and self._pending[0][0].done():
+            future, checkpoint = self._pending.popleft()
+            self._record(future.result(), checkpoint)
+
+    def _abort(self):
+        """Stop submitting, let in flight requests finish and record any that succeeded.
+
+        Checkpoints are only recorded up to the first failed or cancelled submission."""
+        for future, _ in self._pending:
+            future.cancel()
+        in_order = True
+        while self._pending:
+            future, checkpoint = self._pending.popleft()
+            if future.cancelled() or future.exception() is not None:
+                in_order = False
+                continue
+            self._record(future.result(), checkpoint if in_order else None)
+        self._shutdown()
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _prepare_and_send(self, request_data: dict, prepare: Callable = None, source: dict = None):
+        if prepare is not None:
+            prepare()
+        return self._send(request_data, source)
+
+    def _send(self, request_data: dict, source: dict = None) -> List[Tuple[str, dict, dict]]:
+        """Post a request, splitting and retrying it if rejected as too large
+
+        Returns:
+            List[Tuple[str, dict, dict]]: run id, request body and source of each run created
+        """
+        try:
+            return [(self._post(request_data), request_data, source)]
+        except PayloadTooLargeError:
+            parts = _split_request(request_data)
+            if parts is None:
+                raise
+            logger.warning(
+                "Request rejected as too large - retrying as %i smaller batches", len(parts)
+            )
+            results = []
+            sources = _split_source(source, [len(_manifest_records(part)) for part in parts])
+            for part, part_source in zip(parts, sources):
+                results.extend(self._send(part, part_source))
+            return results
+
+    def _post(self, request_data: dict) -> str:
+        if self.scheduler is None:
+            return self._start_run(request_data)
+
+        self.scheduler.acquire()
+        try:
+            runid = self._start_run(request_data)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        self.scheduler.started(runid)
+        return runid
+
+    def _start_run(self, request_data: dict) -> str:
+        connection = get_client(self.config, self.parallel)
+        try:
+            response = connection.cli_post(CONFIG_WORKFLOW_URL, WORKFLOW_RUN_PATH, request_data)
+        except HTTPError as ex:
+            logger.debug("%s", LazyPayload(ex.response.text))
+            if ex.response.status_code == REQUEST_ENTITY_TOO_LARGE:
+                raise PayloadTooLargeError(
+                    f"({ex.response.status_code}) Request too large to submit"
+                ) from ex
+            raise
+        response_json = response.json()
+        logger.debug("Response %s", LazyPayload(response_json))
+        return response_json.get("runId")
+
+    def _record(self, results: List[Tuple[str, dict, dict]], checkpoint: dict = None):
+        for index, (runid, request_data, source) in enumerate(results):
+            logger.info("Returned runID: %s", runid)
+            if self.runid_log_handle:
+                self.runid_log_handle.write(f"{runid}\n")
+            self.runids.append(runid)
+            if self.ledger is not None:
+                self.ledger.add(_manifest_records(request_data), runid)
+            if self.run_index is not None and source is not None:
+                self.run_index.add(
+                    runid, source, [record.get("id") for record in _manifest_records(request_data)]
+                )
+            if checkpoint is not None and self.journal is not None and index < len(results) - 1:
+                # extra runs from splitting a request - position is recorded with the last one
+                self.journal.record({"file": checkpoint["file"]}, runid)
+
+        if checkpoint is not None and self.journal is not None:
+            self.journal.record(checkpoint, results[-1][0] if results else None)
+
+
+def _manifest_records(request_data: dict) -> list:
+    """Get the ReferenceData / MasterData records carried by a workflowRun request"""
+    manifest = request_data["executionContext"]["manifest"]
+    records = []
+    for data_type in STREAMED_DATA_TYPES:
+        records.extend(manifest.get(data_type, []))
+    return records
+
+
+def _split_source(source: dict, sizes: List[int]) -> List[dict]:
+    """Split the source of a request to match the number of records in each part it was split into"""
+    if source is None or source.get("records") is None:
+        return [source] * len(sizes)
+    parts = []
+    start = 0
+    for size in sizes:
+        parts.append(dict(source, records=source["records"][start : start + size]))
+        start += size
+    return parts
+
+
+def _split_request(request_data: dict) -> Optional[List[dict]]:
+    """Split a workflowRun request into two carrying half of the records each
+
+    Returns:
+        Optional[List[dict]]: the two requests, or None if the request can't be split
+    """
+    context = request_data["executionContext"]
+    manifest = context["manifest"]
+    for data_type in STREAMED_DATA_TYPES:
+        records = manifest.get(data_type)
+        if records and len(records) > 1:
+            half = len(records) // 2
+            return [
+                dict(
+                    request_data,
+                    executionContext=dict(context, manifest=dict(manifest, **{data_type: part})),
+                )
+                for part in (records[:half], records[half:])
+            ]
+    return None
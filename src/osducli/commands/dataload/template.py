@@ -0,0 +1,207 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Record templates mapping CSV columns to the fields of records, for dataload generate"""
+
+import functools
+import itertools
+from string import Formatter
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from osducli.util.exceptions import CliError
+
+_TRUE = ("true", "yes", "y", "1")
+_FALSE = ("false", "no", "n", "0")
+_OMIT = object()  # value of a field left out of the record as its column is empty
+
+
+def _boolean(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(value)
+
+
+def _number(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+# types a field holding a single column can be converted to, e.g. "{Depth:number}"
+_CONVERTERS = {"string": str, "number": _number, "integer": int, "boolean": _boolean}
+
+
+def compile_template(
+    template: dict, columns: List[str], constants: Dict[str, str] = None
+) -> Callable[..., Iterator[dict]]:
+    """Compile a template of a record whose string values can hold {Column} placeholders, for CSV
+    files with the given columns.
+
+    A value that is a single placeholder takes the value of the column, converted if a type is
+    given as in {Column:number} (one of string, number, integer or boolean), and is left out of
+    the record when the column is empty. Placeholders within other text are substituted as is.
+    Placeholders naming one of constants rather than a column take its value.
+
+    Records are built a block of rows at a time: each field is computed for a whole column at once
+    using map over the column, so the per row work is only assembling the record.
+
+    Args:
+        template (dict): record template
+        columns (List[str]): names of the columns, in order, from the CSV header
+        constants (Dict[str, str], optional): values of placeholders that aren't columns.
+            Defaults to None.
+
+    Raises:
+        CliError: if the template refers to an unknown column or type
+
+    Returns:
+        Callable[..., Iterator[dict]]: function taking rows of column values, e.g. from
+            csv.reader, and optionally the number of rows converted together (1024 by default),
+            that yields a record built from each row in order. Empty rows are skipped and short
+            rows padded with empty values. It raises CliError if a value can't be converted to
+            the type of its field.
+    """
+    if not isinstance(template, dict):
+        raise CliError("The record template must be a JSON object")
+    indices = {name: index for index, name in enumerate(columns)}
+    fields = []
+    build = _compile(template, indices, constants or {}, fields)
+    return functools.partial(_records, build, fields, len(indices))
+
+
+def _records(build, fields: list, width: int, rows: Iterable[List[str]], block_size: int = 1024):
+    number = 0
+    iterator = iter(rows)
+    while True:
+        rows = list(itertools.islice(iterator, block_size))
+        if not rows:
+            return
+        block = [
+            row if len(row) == width else (row + [""] * (width - len(row)))[:width]
+            for row in rows
+            if row
+        ]
+        if not block:
+            continue
+        columns = list(zip(*block))
+        values = [field(columns, number) for field in fields]
+        for row_values in zip(*values) if values else itertools.repeat((), len(block)):
+            yield build(row_values)
+        number += len(block)
+
+
+def _compile(node, indices: dict, constants: dict, fields: list) -> Callable[[tuple], object]:
+    """Get a function building the value of a template node from the values of the fields,
+    adding the fields it uses to fields"""
+    if isinstance(node, dict):
+        members = [
+            (key, _compile(value, indices, constants, fields)) for key, value in node.items()
+        ]
+
+        def build_object(values):
+            record = {}
+            for key, build in members:
+                value = build(values)
+                if value is not _OMIT:
+                    record[key] = value
+            return record
+
+        return build_object
+
+    if isinstance(node, list):
+        items = [_compile(item, indices, constants, fields) for item in node]
+        return lambda values: [
+            value for value in (build(values) for build in items) if value is not _OMIT
+        ]
+
+    if isinstance(node, str):
+        field = _compile_string(node, indices, constants)
+        if not isinstance(field, str):
+            slot = len(fields)
+            fields.append(field)
+            return lambda values: values[slot]
+        node = field
+    return lambda values: node
+
+
+def _compile_string(text: str, indices: dict, constants: dict):
+    """Get a function computing a string's values for a block of columns, or just the string
+    (with escaped braces replaced) if it has no placeholders"""
+    try:
+        parts = list(Formatter().parse(text))
+    except ValueError as ex:
+        raise CliError(f"Invalid placeholder in template value {text}: {ex}") from ex
+    if all(name is None for _, name, _, _ in parts):
+        return "".join(literal for literal, _, _, _ in parts)
+
+    if len(parts) == 1 and not parts[0][0] and parts[0][1] not in constants:
+        _, name, type_name, _ = parts[0]
+        return _column_field(name, type_name or "string", indices)
+
+    pattern = ""
+    column_indices = []
+    for literal, name, type_name, _ in parts:
+        pattern += literal.replace("{", "{{").replace("}", "}}")
+        if name is None:
+            continue
+        if type_name:
+            raise CliError(f"A type can only be given for a single placeholder, not in {text}")
+        if name in constants:
+            pattern += str(constants[name]).replace("{", "{{").replace("}", "}}")
+        else:
+            pattern += "{}"
+            column_indices.append(_column_index(name, indices))
+    if not column_indices:
+        text = pattern.format()
+        return lambda columns, _: itertools.repeat(text, len(columns[0]))
+    return lambda columns, _: map(pattern.format, *(columns[index] for index in column_indices))
+
+
+def _column_field(name: str, type_name: str, indices: dict):
+    """Get a function computing the converted values of a column, omitting empty values"""
+    index = _column_index(name, indices)
+    converter = _CONVERTERS.get(type_name)
+    if converter is None:
+        raise CliError(
+            f"Unknown type {type_name} for column {name} - use one of {', '.join(_CONVERTERS)}"
+        )
+
+    def field(columns, first_row):
+        column = columns[index]
+        if converter is str:
+            return [value if value != "" else _OMIT for value in column]
+        try:
+            # the whole column converts at once unless it has empty or invalid values
+            return list(map(converter, column))
+        except ValueError:
+            pass
+        values = []
+        for number, value in enumerate(column, first_row + 1):
+            if value == "":
+                values.append(_OMIT)
+                continue
+            try:
+                values.append(converter(value))
+            except ValueError as ex:
+                raise CliError(
+                    f"Invalid {type_name} '{value}' in column {name} of row {number}"
+                ) from ex
+        return values
+
+    return field
+
+
+def _column_index(name: str, indices: dict) -> int:
+    if name not in indices:
+        raise CliError(
+            f"The template refers to an unknown column {name} - the columns are"
+            f" {', '.join(indices)}"
+        )
+    return indices[name]
@@ -0,0 +1,340 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Upload of dataset files to signed upload urls"""
+
+import base64
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from urllib.parse import quote
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
+
+from osducli.cliclient import get_client
+from osducli.config import CONFIG_FILE_URL, CLIConfig
+from osducli.log import get_logger
+from osducli.util.exceptions import CliError
+
+logger = get_logger(__name__)
+
+MEBIBYTE = 1024 * 1024
+DEFAULT_UPLOAD_PARALLEL = 4
+DEFAULT_FILE_PARALLEL = 4
+MAX_BLOCKS = 50000  # maximum number of blocks in an Azure block blob
+BLOCK_RETRIES = 3
+RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class UploadLocationPool:
+    """Fetch upload locations from the file service on a background thread.
+
+    Each location creates a file location on the server, so only locations that will be used are
+    fetched: one for each call of get, plus any reserved ahead of time for files about to be
+    uploaded, which are fetched while earlier files are still uploading.
+    """
+
+    def __init__(self, config: CLIConfig, size: int = DEFAULT_FILE_PARALLEL):
+        """Setup the new pool
+
+        Args:
+            config (CLIConfig): cli configuration
+            size (int, optional): maximum number of reserved locations to keep ready. Defaults to
+                DEFAULT_FILE_PARALLEL.
+        """
+        self.config = config
+        self.size = max(1, size)
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._wanted = threading.Condition()
+        self._pending = 0  # locations requested and not yet fetched
+        self._reserved = 0  # locations requested ahead of a call to get
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def reserve(self, count: int):
+        """Start fetching locations for files that are about to be uploaded
+
+        Args:
+            count (int): number of locations that will be asked for with get
+        """
+        with self._wanted:
+            count = max(0, min(count, self.size - self._reserved))
+            self._reserved += count
+            self._request(count)
+
+    def get(self) -> dict:
+        """Get an upload location, waiting for it to be fetched if none is ready
+
+        Returns:
+            dict: Location returned by files/uploadURL with SignedURL and FileSource
+        """
+        with self._wanted:
+            if self._reserved:
+                self._reserved -= 1
+            else:
+                self._request(1)
+            thread = self._thread
+        while True:
+            try:
+                location = self._queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not thread.is_alive() and self._queue.empty():
+                    raise CliError("Fetching upload locations stopped unexpectedly") from None
+        if isinstance(location, BaseException):
+            # leave the error for any other waiting uploads
+            self._queue.put(location)
+            raise location
+        return location
+
+    def close(self):
+        """Stop fetching locations"""
+        with self._wanted:
+            self._stop.set()
+            self._wanted.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _request(self, count: int):
+        """Ask the background thread for more locations - called holding _wanted"""
+        if count <= 0:
+            return
+        self._pending += count
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._fetch, name="osducli-upload-urls", daemon=True
+            )
+            self._thread.start()
+        self._wanted.notify()
+
+    def _fetch(self):
+        while True:
+            with self._wanted:
+                while not self._pending and not self._stop.is_set():
+                    self._wanted.wait()
+                if self._stop.is_set():
+                    return
+                self._pending -= 1
+            try:
+                location = fetch_upload_location(self.config)
+            except BaseException as ex:  # pylint: disable=broad-except
+                # e.g. SystemExit from the client, which must still reach the waiting uploads
+                self._queue.put(ex)
+                return
+            self._queue.put(location)
+
+
+def fetch_upload_location(config: CLIConfig) -> dict:
+    """Get a new upload location from the file service
+
+    Args:
+        config (CLIConfig): cli configuration
+
+    Returns:
+        dict: Location with SignedURL and FileSource
+    """
+    connection = get_client(config)
+    initiate_upload_response_json = connection.cli_get_returning_json(
+        CONFIG_FILE_URL, "files/uploadURL"
+    )
+    location = initiate_upload_response_json.get("Location")
+    if not location:
+        raise CliError(f"No upload location returned: {initiate_upload_response_json}")
+    return location
+
+
+class DatasetUploader:
+    """Upload dataset files to the upload urls handed out by the file service.
+
+    Up to `file_parallel` files are uploaded concurrently, across all callers of upload_all, to
+    locations fetched ahead by an UploadLocationPool.
+
+    By default each file is uploaded with a single PUT. If a block size is given files larger than
+    one block are instead uploaded as a BlockBlob: blocks are staged concurrently, each block is
+    retried individually on transient failures and the block list is committed at the end.
+    """
+
+    def __init__(
+        self,
+        config: CLIConfig,
+        block_size: int = None,
+        parallel: int = DEFAULT_UPLOAD_PARALLEL,
+        file_parallel: int = DEFAULT_FILE_PARALLEL,
+    ):
+        """Setup the new uploader
+
+        Args:
+            config (CLIConfig): cli configuration
+            block_size (int, optional): block size in bytes for chunked uploads. Defaults to None
+                which uploads every file with a single request.
+            parallel (int, optional): maximum number of blocks to upload concurrently.
+                Defaults to DEFAULT_UPLOAD_PARALLEL.
+            file_parallel (int, optional): maximum number of files to upload concurrently.
+                Defaults to DEFAULT_FILE_PARALLEL.
+        """
+        self.config = config
+        self.block_size = block_size
+        self.parallel = max(1, parallel or 1)
+        self.file_parallel = max(1, file_parallel or 1)
+        self.locations = UploadLocationPool(config, self.file_parallel)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Wait for any uploads in progress and stop fetching upload locations"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.locations.close()
+
+    def upload(self, filepath: str) -> str:
+        """Upload a file to a new upload location
+
+        Args:
+            filepath (str): path of the file to upload
+
+        Returns:
+            str: FileSource of the uploaded file
+        """
+        location = self.locations.get()
+        self.put_file(location.get("SignedURL"), filepath)
+        logger.info("Uploaded %s", filepath)
+        return location.get("FileSource")
+
+    def upload_all(self, filepaths: List[str]) -> List[str]:
+        """Upload files concurrently, each to a new upload location
+
+        Args:
+            filepaths (List[str]): paths of the files to upload
+
+        Returns:
+            List[str]: FileSource of each uploaded file, in the same order as filepaths
+        """
+        if len(filepaths) <= 1:
+            return [self.upload(filepath) for filepath in filepaths]
+
+        self.locations.reserve(len(filepaths))
+
+        with self._lock:
+            if self._executor is None:
+                # make sure the shared connection pool can serve all the concurrent file uploads
+                get_client(self.config, self.file_parallel)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.file_parallel, thread_name_prefix="osducli-upload-file"
+                )
+            futures = [self._executor.submit(self.upload, filepath) for filepath in filepaths]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def put_file(self, signed_url: str, filepath: str):
+        """Upload a file to a signed url, in blocks if it is larger than the block size
+
+        Args:
+            signed_url (str): signed url to upload to
+            filepath (str): path of the file to upload
+        """
+        size = os.path.getsize(filepath)
+        if not self.block_size or size <= self.block_size:
+            self._put_single(signed_url, filepath)
+        else:
+            self._put_blocks(signed_url, filepath, size)
+
+    def _put_single(self, signed_url: str, filepath: str):
+        connection = get_client(self.config)
+        headers = {"Content-Type": "application/octet-stream", "x-ms-blob-type": "BlockBlob"}
+        with open(filepath, "rb") as file_handle:
+            response = connection.session.put(signed_url, data=file_handle, headers=headers)
+        if response.status_code not in [200, 201]:
+            raise CliError(f"({response.status_code}) {response.text[:250]}")
+
+    def _put_blocks(self, signed_url: str, filepath: str, size: int):
+        # grow the block size if needed to keep within the maximum number of blocks
+        block_size = max(self.block_size, math.ceil(size / MAX_BLOCKS))
+        count = math.ceil(size / block_size)
+        # block ids must all be the same length
+        block_ids = [base64.b64encode(f"{index:08d}".encode()).decode() for index in range(count)]
+        logger.info("Uploading %s in %i blocks of %i bytes", filepath, count, block_size)
+
+        # make sure the shared connection pool can serve all the concurrent block uploads
+        get_client(self.config, self.parallel)
+        with ThreadPoolExecutor(
+            max_workers=self.parallel, thread_name_prefix="osducli-upload"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._put_block, signed_url, filepath, block_id, index * block_size, block_size
+                )
+                for index, block_id in enumerate(block_ids)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        block_list = "".join(f"<Latest>{block_id}</Latest>" for block_id in block_ids)
+        self._put_with_retries(
+            _with_query(signed_url, "comp=blocklist"),
+            f'<?xml version="1.0" encoding="utf-8"?><BlockList>{block_list}</BlockList>',
+            {
+                "Content-Type": "application/xml",
+                "x-ms-blob-content-type": "application/octet-stream",
+            },
+        )
+
+    def _put_block(self, signed_url: str, filepath: str, block_id: str, offset: int, length: int):
+        with open(filepath, "rb") as file_handle:
+            file_handle.seek(offset)
+            data = file_handle.read(length)
+        url = _with_query(signed_url, f"comp=block&blockid={quote(block_id, safe='')}")
+        self._put_with_retries(url, data, {"Content-Type": "application/octet-stream"})
+
+    def _put_with_retries(self, url: str, data, headers: dict):
+        session = get_client(self.config).session
+        for attempt in range(BLOCK_RETRIES + 1):
+            try:
+                response = session.put(url, data=data, headers=headers)
+            except (RequestsConnectionError, Timeout) as ex:
+                if attempt == BLOCK_RETRIES:
+                    raise
+                logger.debug("Upload request failed (%s) - retrying", ex)
+            else:
+                if response.status_code in [200, 201]:
+                    return
+                if response.status_code not in RETRY_STATUS_CODES or attempt == BLOCK_RETRIES:
+                    raise CliError(f"({response.status_code}) {response.text[:250]}")
+                logger.debug("Upload request failed (%i) - retrying", response.status_code)
+            time.sleep(2**attempt)
+
+
+def _with_query(url: str, query: str) -> str:
+    """Add query parameters to a url that may already carry a query string (e.g. a SAS token)"""
+    return f"{url}{'&' if '?' in url else '?'}{query}"
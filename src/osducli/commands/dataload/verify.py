@@ -6,15 +6,24 @@
 
 """Dataload verify command"""
 
-import json
-
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
-from osducli.config import CONFIG_SEARCH_URL, CLIConfig
-from osducli.log import get_logger
-from osducli.util.file import get_files_from_path
+from osducli.cliclient import get_client, handle_cli_exceptions
+from osducli.commands.dataload.record_ids import load_id_generator
+from osducli.commands.dataload.scan_index import DEFAULT_SCAN_INDEX_PATH, ScanIndex
+from osducli.config import CONFIG_DATA_PARTITION_ID, CONFIG_SEARCH_URL, CONFIG_SERVER, CLIConfig
+from osducli.log import LazyPayload, get_logger
+from osducli.util import json_backend
+from osducli.util.archive import close_archives, open_file
+from osducli.util.batch import batched
+from osducli.util.file import iter_files_from_path
+from osducli.util.manifest import (
+    MANIFEST_EXTENSIONS,
+    STREAMED_DATA_TYPES,
+    is_ndjson,
+    manifest_reader,
+)
 
 logger = get_logger(__name__)
 
@@ -24,7 +33,7 @@ logger = get_logger(__name__)
 @click.option(
     "-p",
     "--path",
-    help="Path to a file or files to check.",
+    help="Path to a file or directory of files to check, or a tar / zip archive of them.",
     type=click.Path(exists=True, file_okay=True, dir_okay=True, readable=True, resolve_path=True),
     required=True,
 )
@@ -36,15 +45,53 @@ logger = get_logger(__name__)
     help="Create batches across files for speed.",
     show_default=True,
 )
+@click.option(
+    "--stream",
+    help="Read record ids incrementally instead of loading whole files.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--changed-only",
+    help="Only check files that are new or modified since they were last verified against this"
+    " partition. Files are recorded in the scan index when all their records are found.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--scan-index",
+    help="Path to the local index of verified files used by --changed-only.",
+    default=DEFAULT_SCAN_INDEX_PATH,
+    show_default=True,
+)
+@click.option(
+    "--id-rules",
+    help="Path to the JSON file of rules for generating ids for records without one, as used"
+    " when ingesting them, so those records can be checked too.",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
+)
 @handle_cli_exceptions
 @command_with_output(None)
-def _click_command(state: State, path: str, batch: int = 200, batch_across_files=True):
+def _click_command(
+    state: State,
+    path: str,
+    batch: int = 200,
+    batch_across_files=True,
+    stream: bool = False,
+    changed_only: bool = False,
+    scan_index: str = DEFAULT_SCAN_INDEX_PATH,
+    id_rules: str = None,
+):
     """Verify if records exist in OSDU.
 
     Note that this doesn't support versioning - success indicates that
     a record is found, although there is no check of the contents so it could be an older version if you have
     done multiple uploads of the same item with different content."""
-    return verify(state, path, batch, batch_across_files)
+    return verify(
+        state, path, batch, batch_across_files, stream, changed_only, scan_index, id_rules
+    )
 
 
 def _create_search_query(record_ids):
@@ -64,14 +111,14 @@ def _verify_ids(config: CLIConfig, record_ids):
     success = []
     failed = []
     search_query = _create_search_query(record_ids)
-    logger.debug("search query %s", json.dumps(search_query))
+    logger.debug("search query %s", LazyPayload(search_query))
 
-    connection = CliOsduClient(config)
+    connection = get_client(config)
     response_json = connection.cli_post_returning_json(
         CONFIG_SEARCH_URL, "query?limit=10000", search_query
     )
 
-    logger.debug("search response %s", response_json)
+    logger.debug("search response %s", LazyPayload(response_json))
     ingested_records = response_json.get("results")
 
     for ingested_record in ingested_records:
@@ -90,48 +137,53 @@ def _verify_ids(config: CLIConfig, record_ids):
 
 
 def batch_verify(config, batch_size, ids_to_verify, success, failed, process_all_ids=False):
-    """Verify a list of id's in batches"""
-    while len(ids_to_verify) >= batch_size or (process_all_ids and len(ids_to_verify) > 0):
-        total_size = len(ids_to_verify)
-        batch_size = min(batch_size, total_size)
-        current_batch = ids_to_verify[:batch_size]
-        del ids_to_verify[:batch_size]
+    """Verify a list of id's in batches
+
+    Full batches are removed from the start of ids_to_verify, and with process_all_ids also the
+    final partial batch."""
+    total_size = len(ids_to_verify)
+    if total_size < batch_size and not (process_all_ids and total_size > 0):
+        return
+    consumed = 0
+    for current_batch in batched(ids_to_verify, batch_size):
+        if len(current_batch) < batch_size and not process_all_ids:
+            break
+        consumed += len(current_batch)
         logger.debug(
             "Processing batch - total %i, batch size %i, remaining %i",
-            total_size,
+            total_size - consumed + len(current_batch),
             len(current_batch),
-            len(ids_to_verify),
+            total_size - consumed,
         )
         _s, _f = _verify_ids(config, current_batch)
 
         success.extend(_s)
         failed.extend(_f)
+    del ids_to_verify[:consumed]
 
 
-def verify(
-    state: State, path: str, batch_size: int, batch_across_files: bool
-) -> dict:  # noqa: C901 pylint: disable=R0912
-    """Verify if records exist in OSDU.
-
-    Args:
-        state (State): Global state
-        path (str): Path to a file containing run ids to get status of
-        batch (int): Batch size
-        batch_across_files (bool): Create batches across files for speed
-
-    Returns:
-        dict: Response from service
-    """
-    files = get_files_from_path(path)
-    logger.debug("Files list: %s", files)
-
+def _verify_files(  # noqa: C901 pylint: disable=R0912
+    config: CLIConfig, files, batch_size, batch_across_files, stream, id_generator=None
+):
+    """Search for the records in the given files, returning the ids found and not found"""
     success = []
     failed = []
     ids_to_verify = []
     for filepath in files:
-        if filepath.endswith(".json"):
-            with open(filepath) as file:
-                data_object = json.load(file)
+        if is_ndjson(filepath) or (stream and filepath.endswith(".json")):
+            logger.info("Processing file %s.", filepath)
+            with open_file(filepath) as file:
+                for key, record in manifest_reader(file, filepath):
+                    if key in STREAMED_DATA_TYPES and id_generator is not None:
+                        id_generator(record)
+                    if key in STREAMED_DATA_TYPES and "id" in record:
+                        ids_to_verify.append(record.get("id"))
+                        batch_verify(config, batch_size, ids_to_verify, success, failed)
+
+            batch_verify(config, batch_size, ids_to_verify, success, failed, not batch_across_files)
+        elif filepath.endswith(".json"):
+            with open_file(filepath) as file:
+                data_object = json_backend.load(file)
 
                 logger.info("Processing file %s.", filepath)
 
@@ -145,17 +197,72 @@ def verify(
                     ingested_data = data_object["MasterData"]
 
                 for ingested_datum in ingested_data:
+                    if id_generator is not None:
+                        id_generator(ingested_datum)
                     if "id" in ingested_datum:
                         ids_to_verify.append(ingested_datum.get("id"))
 
                 batch_verify(
-                    state.config, batch_size, ids_to_verify, success, failed, not batch_across_files
+                    config, batch_size, ids_to_verify, success, failed, not batch_across_files
                 )
 
     # If batching across files then there might be records here so clear those.
     if len(ids_to_verify) > 0:
         logger.debug("Searching remaining records with batch size %s", len(ids_to_verify))
-        batch_verify(state.config, batch_size, ids_to_verify, success, failed, True)
+        batch_verify(config, batch_size, ids_to_verify, success, failed, True)
+
+    return success, failed
+
+
+def verify(
+    state: State,
+    path: str,
+    batch_size: int,
+    batch_across_files: bool,
+    stream: bool = False,
+    changed_only: bool = False,
+    scan_index: str = DEFAULT_SCAN_INDEX_PATH,
+    id_rules: str = None,
+) -> dict:
+    """Verify if records exist in OSDU.
+
+    Args:
+        state (State): Global state
+        path (str): Path to a file containing run ids to get status of
+        batch (int): Batch size
+        batch_across_files (bool): Create batches across files for speed
+        stream (bool): Read record ids incrementally so whole files are never held in memory
+        changed_only (bool): Only check files that are new or modified since last verified
+        scan_index (str): Path to the local index of verified files
+        id_rules (str): Path to the rules for generating ids for records without one
+
+    Returns:
+        dict: Response from service
+    """
+    files = iter_files_from_path(path, MANIFEST_EXTENSIONS)
+    id_generator = None
+    if id_rules:
+        id_generator = load_id_generator(
+            id_rules, state.config.get("core", CONFIG_DATA_PARTITION_ID)
+        )
+    index = None
+    try:
+        if changed_only:
+            index = ScanIndex(
+                scan_index,
+                f"verify:{state.config.get('core', CONFIG_SERVER)}:"
+                f"{state.config.get('core', CONFIG_DATA_PARTITION_ID)}",
+            )
+            files = index.changed(files)
+        success, failed = _verify_files(
+            state.config, files, batch_size, batch_across_files, stream, id_generator
+        )
+        if index is not None and len(failed) == 0:
+            index.record()
+    finally:
+        if index is not None:
+            index.close()
+        close_archives()
 
     if len(failed) == 0:
         print(
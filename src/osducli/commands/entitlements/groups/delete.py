@@ -10,7 +10,7 @@ import click
 from osdu.entitlements import EntitlementsClient
 
 from osducli.click_cli import State, global_params
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 
 
 # click entry point
@@ -30,7 +30,7 @@ def delete_group(state: State, group: str):
         state (State): Global state
         group (str): Unique email identifier of the group
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
 
     entitlements_client = EntitlementsClient(connection)
     entitlements_client.delete_group(group)
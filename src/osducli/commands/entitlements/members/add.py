@@ -10,7 +10,7 @@ import click
 from osdu.entitlements import EntitlementsClient
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 
 
 # click entry point
@@ -44,7 +44,7 @@ def add_member(state: State, member: str, group: str, role: str) -> dict:
     Returns:
         dict: Response from service
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
 
     entitlements_client = EntitlementsClient(connection)
     json_response = entitlements_client.add_member_to_group(member, group, role)
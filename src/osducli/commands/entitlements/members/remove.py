@@ -10,7 +10,7 @@ import click
 from osdu.entitlements import EntitlementsClient
 
 from osducli.click_cli import State, global_params
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 
 
 # click entry point
@@ -35,7 +35,7 @@ def add_member(state: State, member: str, group: str) -> dict:
     Returns:
         dict: Response from service
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
 
     entitlements_client = EntitlementsClient(connection)
     entitlements_client.remove_member_from_group(member, group)
@@ -8,7 +8,7 @@
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 from osducli.config import CONFIG_LEGAL_URL
 
 
@@ -29,7 +29,7 @@ def records(state: State):
     Args:
         state (State): Global state
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     json_response = connection.cli_get_returning_json(CONFIG_LEGAL_URL, "legaltags")
 
     return json_response
@@ -6,14 +6,13 @@
 
 """Version command"""
 
-import json
-
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 from osducli.config import CONFIG_SCHEMA_URL
 from osducli.log import get_logger
+from osducli.util import json_backend
 from osducli.util.exceptions import CliError
 from osducli.util.file import get_files_from_path
 
@@ -60,7 +59,7 @@ def add_schema(state: State, path: str, kind: str, status: str) -> dict:
     Returns:
         dict: Response from service
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     url = "schema"
 
     files = get_files_from_path(path)
@@ -87,7 +86,7 @@ def add_schema(state: State, path: str, kind: str, status: str) -> dict:
     for filepath in files:
         if filepath.endswith(".json"):
             with open(filepath) as file:
-                data_object = json.load(file)
+                data_object = json_backend.load(file)
 
                 logger.info("Processing file %s.", filepath)
 
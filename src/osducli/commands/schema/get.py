@@ -9,7 +9,7 @@
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 from osducli.config import CONFIG_SCHEMA_URL
 
 
@@ -30,7 +30,7 @@ def schema_get(state: State, kind: str):
         state (State): Global state
         kind (str): Kind of the schema
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     url = "schema/" + kind
     json = connection.cli_get_returning_json(CONFIG_SCHEMA_URL, url)
     return json
@@ -11,7 +11,7 @@ from urllib.parse import quote_plus
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 from osducli.config import CONFIG_SCHEMA_URL
 
 
@@ -38,7 +38,7 @@ def schema_list(state: State, authority: str, entity: str, source: str):
         entity (str): Global state
         source (str): Global state
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     url = "schema?limit=10000"
     if authority:
         url += "&authority=" + quote_plus(authority)
@@ -10,7 +10,7 @@ import click
 from osdu.search import SearchClient
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 
 
 # click entry point
@@ -29,7 +29,7 @@ def query(state: State, id: str):  # TO FIX later pylint: disable=invalid-name,r
     Args:
         state (State): Global state
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
 
     search_client = SearchClient(connection)
     json_response = search_client.query_by_id(id)
@@ -10,7 +10,7 @@ import click
 from osdu.search import SearchClient
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 
 
 # click entry point
@@ -30,7 +30,7 @@ def query(state: State, kind: str, id: str):  # pylint: disable=invalid-name,red
     Args:
         state (State): Global state
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
 
     search_client = SearchClient(connection)
     json_response = search_client.query(kind, id)
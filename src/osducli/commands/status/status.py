@@ -10,7 +10,7 @@ import click
 from requests.models import HTTPError
 
 from osducli.click_cli import global_params
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import CliOsduClient, get_client, handle_cli_exceptions
 from osducli.config import (
     CONFIG_FILE_URL,
     CONFIG_LEGAL_URL,
@@ -37,7 +37,7 @@ def status(state):  # pylint: disable=unused-argument
     Args:
         state (State): Global state
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     # HTTPConnection.debuglevel = 1
     check_print_status(connection, "File service", CONFIG_FILE_URL, "readiness_check")
     check_print_status(connection, "Legal service", CONFIG_LEGAL_URL, "_ah/readiness_check")
@@ -9,7 +9,7 @@
 import click
 
 from osducli.click_cli import State, command_with_output
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 from osducli.config import CONFIG_UNIT_URL
 
 
@@ -28,6 +28,6 @@ def unit_list(state: State):
     Args:
         state (State): Global state
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     json = connection.cli_get_returning_json(CONFIG_UNIT_URL, "unit?limit=10000")
     return json
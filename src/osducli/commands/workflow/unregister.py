@@ -9,7 +9,7 @@
 import click
 
 from osducli.click_cli import State, global_params
-from osducli.cliclient import CliOsduClient, handle_cli_exceptions
+from osducli.cliclient import get_client, handle_cli_exceptions
 from osducli.config import CONFIG_WORKFLOW_URL
 
 
@@ -33,5 +33,5 @@ def unregister_workflow(state: State, name: str) -> dict:
     Returns:
         dict: Response from service
     """
-    connection = CliOsduClient(state.config)
+    connection = get_client(state.config)
     connection.cli_delete(CONFIG_WORKFLOW_URL, "workflow/" + name, [204])
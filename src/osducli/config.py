@@ -29,6 +29,8 @@ CONFIG_SEARCH_URL = "search_url"
 CONFIG_STORAGE_URL = "storage_url"
 CONFIG_UNIT_URL = "unit_url"
 CONFIG_WORKFLOW_URL = "workflow_url"
+# optional per service request compression (gzip or deflate) e.g. workflow_compression = gzip
+CONFIG_COMPRESSION_SUFFIX = "_compression"
 
 CONFIG_DATA_PARTITION_ID = "data_partition_id"
 CONFIG_LEGAL_TAG = "legal_tag"
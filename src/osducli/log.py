@@ -9,12 +9,16 @@
 import logging
 from enum import IntEnum
 
+from osducli.util import json_backend
+
 CLI_LOGGER_NAME = "cli"
 # Add more logger names to this list so that ERROR, WARNING, INFO logs from these loggers can also be displayed
 # without --debug flag.
 cli_logger_names = [CLI_LOGGER_NAME]
 
 LOG_FILE_ENCODING = "utf-8"
+# maximum number of characters of a payload written to the log
+PAYLOAD_LOG_LIMIT = 10000
 
 
 class CliLogLevel(IntEnum):
@@ -47,3 +51,44 @@ def get_logger(module_name=None):
     else:
         logger_name = CLI_LOGGER_NAME
     return logging.getLogger(logger_name)
+
+
+class LazyPayload:
+    """Log argument for a potentially large payload (e.g. a request or response body) that is only
+    formatted, and truncated to a limit, if a log record using it is actually emitted.
+
+    Example:
+        logger.debug("Request to be sent %s", LazyPayload(request, indent=2))
+    """
+
+    def __init__(self, payload, indent: int = None, limit: int = PAYLOAD_LOG_LIMIT):
+        """Wrap a payload for logging
+
+        Args:
+            payload: text or a value to format as JSON
+            indent (int, optional): indent JSON by this many spaces. Defaults to None for
+                compact output.
+            limit (int, optional): maximum number of characters to log. Defaults to
+                PAYLOAD_LOG_LIMIT.
+        """
+        self.payload = payload
+        self.indent = indent
+        self.limit = limit
+
+    def __str__(self):
+        payload = self.payload
+        if isinstance(payload, bytes):
+            text = payload.decode("utf-8", errors="replace")
+        elif isinstance(payload, str):
+            text = payload
+        else:
+            try:
+                text = json_backend.dumps(payload, self.indent)
+            except (TypeError, ValueError):
+                text = repr(payload)
+        if self.limit is not None and len(text) > self.limit:
+            return f"{text[: self.limit]}... ({len(text) - self.limit} more characters)"
+        return text
+
+    def __repr__(self):
+        return f"LazyPayload({self})"
@@ -0,0 +1,237 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Reading of manifest files straight from tar and zip archives.
+
+A file in an archive is addressed by the path of the archive and the name of the member joined by
+MEMBER_SEPARATOR, e.g. drop.tar.gz!/wells/well-1.json, so it can be used wherever a file path is.
+
+Each archive is opened once per process and kept open until close_archives is called. Members are
+read straight from the archive without being extracted. Tar archives are read as a stream, listing
+members as the stream reaches them, so a compressed archive is decompressed once when its members
+are listed and read in order. Reading a member the stream has already passed restarts it.
+"""
+
+import os
+import tarfile
+import threading
+import time
+import zipfile
+from typing import IO, Iterator, Optional, Tuple
+
+ARCHIVE_EXTENSIONS = (
+    ".zip",
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+MEMBER_SEPARATOR = "!/"
+
+_lock = threading.Lock()
+_archives = {}  # open archives by process id and path - forked workers don't share file positions
+
+
+def is_archive(path: str) -> bool:
+    """Whether a path is a tar or zip archive that manifest files can be read from
+
+    Args:
+        path (str): path of the file
+
+    Returns:
+        bool: True for .zip, .tar and compressed .tar files
+    """
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+
+def split_member_path(path: str) -> Optional[Tuple[str, str]]:
+    """Split the path of a file in an archive into the archive path and member name
+
+    Args:
+        path (str): path of a file, possibly in an archive
+
+    Returns:
+        Optional[Tuple[str, str]]: archive path and member name, or None for a plain file
+    """
+    index = path.find(MEMBER_SEPARATOR)
+    while index != -1:
+        archive = path[:index]
+        if is_archive(archive):
+            return archive, path[index + len(MEMBER_SEPARATOR) :]
+        index = path.find(MEMBER_SEPARATOR, index + 1)
+    return None
+
+
+def iter_archive_members(archive: str, extensions: Tuple[str, ...] = None) -> Iterator[str]:
+    """Yield the paths of the files in an archive, in the order they are stored
+
+    Tar archives are listed as they are read, so a member can be read as soon as it is yielded
+    without reading the archive again.
+
+    Args:
+        archive (str): path of the archive
+        extensions (Tuple[str, ...], optional): only yield files that have one of these
+            extensions. Defaults to None for all files.
+
+    Yields:
+        Iterator[str]: paths of the members as used by open_file
+    """
+    handle = _open_archive(archive)
+    if isinstance(handle, zipfile.ZipFile):
+        names = (info.filename for info in handle.infolist() if not info.is_dir())
+    else:
+        names = handle.names()
+    for name in names:
+        if extensions is None or name.endswith(extensions):
+            yield f"{archive}{MEMBER_SEPARATOR}{name}"
+
+
+def open_file(path: str) -> IO[bytes]:
+    """Open a plain file or a file in an archive for reading as binary
+
+    A file in a tar archive must be read before the next one is opened or listed.
+
+    Args:
+        path (str): path of a file, possibly in an archive
+
+    Returns:
+        IO[bytes]: open file
+    """
+    member = split_member_path(path)
+    if member is None:
+        return open(path, "rb")  # pylint: disable=R1732
+
+    archive, name = member
+    handle = _open_archive(archive)
+    with _lock:
+        try:
+            return handle.open(name)
+        except KeyError as ex:
+            raise FileNotFoundError(f"No file {name} in {archive}") from ex
+
+
+def file_stat(path: str) -> Tuple[int, int]:
+    """Get the size and modification time of a plain file or a file in an archive
+
+    Args:
+        path (str): path of a file, possibly in an archive
+
+    Returns:
+        Tuple[int, int]: size in bytes and modification time in nanoseconds
+    """
+    member = split_member_path(path)
+    if member is None:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    archive, name = member
+    handle = _open_archive(archive)
+    with _lock:
+        info = handle.getinfo(name)
+    if isinstance(info, zipfile.ZipInfo):
+        mtime = time.mktime(info.date_time + (0, 0, -1))
+        return info.file_size, int(mtime * 1e9)
+    return info.size, int(info.mtime * 1e9)
+
+
+def close_archives():
+    """Close all the archives opened by this process"""
+    pid = os.getpid()
+    with _lock:
+        for key in [key for key in _archives if key[0] == pid]:
+            _archives.pop(key).close()
+
+
+def _open_archive(archive: str):
+    """Get the open zip file or tar stream of an archive, opening it on first use"""
+    key = (os.getpid(), os.path.abspath(archive))
+    with _lock:
+        if key not in _archives:
+            if zipfile.is_zipfile(archive):
+                _archives[key] = zipfile.ZipFile(archive)  # pylint: disable=R1732
+            else:
+                _archives[key] = _TarStream(archive)
+        return _archives[key]
+
+
+class _TarStream:
+    """A tar archive read forwards as a stream, keeping the file members seen so far"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tar = None
+        self._current = -1  # index in _infos of the file member the stream is at
+        self._opened = False  # whether the current member has been opened, so read from
+        self._infos = []  # file members in the order they are stored
+        self._indices = {}  # index in _infos of each file member by name
+        self._complete = False
+        self._restart()
+
+    def names(self) -> Iterator[str]:
+        """Yield the names of the file members, reading the stream forwards as they are consumed"""
+        index = 0
+        while True:
+            with _lock:
+                if index >= len(self._infos) and not self._complete:
+                    self._advance_to(len(self._infos))
+                if index >= len(self._infos):
+                    return
+                name = self._infos[index].name
+            yield name
+            index += 1
+
+    def getinfo(self, name: str) -> tarfile.TarInfo:
+        """Get a file member by name, reading the stream forwards to it if not yet seen"""
+        if name not in self._indices:
+            self._advance_to(None, name)
+        return self._infos[self._indices[name]]
+
+    def open(self, name: str) -> IO[bytes]:
+        """Open a file member, restarting the stream if it is already past it"""
+        index = self._indices.get(name)
+        if index is not None and (
+            index < self._current or (index == self._current and self._opened)
+        ):
+            self._restart()
+        self._advance_to(index, name)
+        self._opened = True
+        return self._tar.extractfile(self._infos[self._current])
+
+    def close(self):
+        """Close the underlying file"""
+        self._tar.close()
+
+    def _restart(self):
+        if self._tar is not None:
+            self._tar.close()
+        self._tar = tarfile.open(self.path, "r|*")  # pylint: disable=R1732
+        self._current = -1
+        self._opened = False
+
+    def _advance_to(self, index: Optional[int], name: str = None):
+        """Read the stream forwards to the file member at index, or named name if its index isn't
+        known yet. Raises KeyError if the stream ends first."""
+        while index is None or self._current < index:
+            info = self._tar.next()
+            if info is None:
+                # the stream is past the data of the last member
+                self._current = len(self._infos)
+                self._complete = True
+                if name is None:
+                    return
+                raise KeyError(name)
+            if not info.isfile():
+                continue
+            self._current += 1
+            self._opened = False
+            if self._current == len(self._infos):
+                self._infos.append(info)
+                self._indices[info.name] = self._current
+            if index is None and info.name == name:
+                index = self._current
@@ -0,0 +1,98 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Splitting of records or ids into batches"""
+
+import itertools
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from osducli.util import json_backend
+
+
+def json_size(item) -> int:
+    """Size in bytes of an item serialized as compact JSON
+
+    Args:
+        item: value to measure
+
+    Returns:
+        int: number of bytes
+    """
+    return len(json_backend.dumps_bytes(item))
+
+
+def batched(
+    items: Iterable,
+    size: int,
+    max_bytes: int = None,
+    item_size: Callable[[object], int] = json_size,
+) -> Iterator[List]:
+    """Split items into consecutive batches of at most size items and (if given) max_bytes bytes.
+
+    Items are consumed from an iterator and each is handled once, so splitting n items is O(n)
+    whatever the batch size. A single item larger than max_bytes is put in a batch on its own.
+    Each batch is yielded as soon as it is known to be complete.
+
+    Args:
+        items (Iterable): items to split, e.g. a list or a generator
+        size (int): maximum number of items in a batch
+        max_bytes (int, optional): maximum total size of the items in a batch. Defaults to None
+            for no limit.
+        item_size (Callable[[object], int], optional): size in bytes of an item. Defaults to its
+            size serialized as JSON.
+
+    Yields:
+        Iterator[List]: batches of items, in order
+    """
+    if not max_bytes:
+        if size < 1:
+            raise ValueError(f"Batch size must be at least 1, not {size}")
+        iterator = iter(items)
+        while True:
+            batch = list(itertools.islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+    for batch, _ in batched_with_last(items, size, max_bytes, item_size):
+        yield batch
+
+
+def batched_with_last(
+    items: Iterable,
+    size: int,
+    max_bytes: int = None,
+    item_size: Callable[[object], int] = json_size,
+) -> Iterator[Tuple[List, bool]]:
+    """Split items into batches as batched does, also telling whether each batch is the last one.
+
+    Only a single item is read beyond each batch to find out, so a generator of items is never
+    consumed more than one item ahead of the batch being processed.
+
+    Args:
+        items (Iterable): items to split, e.g. a list or a generator
+        size (int): maximum number of items in a batch
+        max_bytes (int, optional): maximum total size of the items in a batch. Defaults to None
+            for no limit.
+        item_size (Callable[[object], int], optional): size in bytes of an item. Defaults to its
+            size serialized as JSON.
+
+    Yields:
+        Iterator[Tuple[List, bool]]: each batch of items, in order, and whether it is the last
+    """
+    if size < 1:
+        raise ValueError(f"Batch size must be at least 1, not {size}")
+    batch = []
+    batch_bytes = 0
+    for item in items:
+        current_size = item_size(item) if max_bytes else 0
+        if batch and (len(batch) >= size or (max_bytes and batch_bytes + current_size > max_bytes)):
+            yield batch, False
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += current_size
+    if batch:
+        yield batch, True
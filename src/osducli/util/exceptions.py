@@ -15,3 +15,11 @@ class CliError(Exception):
     def __init__(self, message: str):
         self.message = message
         super().__init__(self.message)
+
+
+class PayloadTooLargeError(CliError):
+    """Raised when a service rejects a request body as too large (HTTP 413).
+
+    Attributes:
+        message -- explanation of the error
+    """
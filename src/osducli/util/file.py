@@ -6,26 +6,48 @@
 
 import errno
 import os
+from typing import Iterator, Tuple
 
+from osducli.util.archive import is_archive, iter_archive_members
 
-def get_files_from_path(path: str) -> list:
-    """Given a path get a list of all files.
+
+def iter_files_from_path(path: str, extensions: Tuple[str, ...] = None) -> Iterator[str]:
+    """Given a path lazily yield all files, walking directories as the files are consumed.
 
     Args:
-        path (str): path
+        path (str): path of a file, a directory or a tar / zip archive
+        extensions (Tuple[str, ...], optional): only yield files found in directories that have
+            one of these extensions. Defaults to None for all files.
 
-    Returns:
-        list: list of file paths
+    Yields:
+        Iterator[str]: file paths
     """
-    allfiles = []
+    if is_archive(path):
+        yield from iter_archive_members(path, extensions)
+        return
     if os.path.isfile(path):
-        allfiles = [path]
+        yield path
+        return
 
-    # Recursive traversal of files and subdirectories of the root directory and files processing
+    # Recursive traversal of files and subdirectories of the root directory
     for root, _, files in os.walk(path):
         for file in files:
-            allfiles.append(os.path.join(root, file))
-    return allfiles
+            if extensions is None or file.endswith(extensions):
+                yield os.path.join(root, file)
+
+
+def get_files_from_path(path: str, extensions: Tuple[str, ...] = None) -> list:
+    """Given a path get a list of all files.
+
+    Args:
+        path (str): path
+        extensions (Tuple[str, ...], optional): only include files found in directories that have
+            one of these extensions. Defaults to None for all files.
+
+    Returns:
+        list: list of file paths
+    """
+    return list(iter_files_from_path(path, extensions))
 
 
 def ensure_directory_exists(directory: str):
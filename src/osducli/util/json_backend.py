@@ -0,0 +1,99 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""JSON encoding and decoding using orjson when it is installed and the standard library otherwise"""
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def loads(data):
+    """Decode a JSON document
+
+    Args:
+        data (Union[str, bytes]): JSON text
+
+    Returns:
+        the decoded value
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. NaN / Infinity, which only the standard library accepts
+            pass
+    return json.loads(data)
+
+
+def load(handle):
+    """Decode a JSON document from an open text or binary file
+
+    Args:
+        handle: open file handle
+
+    Returns:
+        the decoded value
+    """
+    return loads(handle.read())
+
+
+def dumps_bytes(obj, indent: int = None) -> bytes:
+    """Encode a value as utf-8 JSON
+
+    Args:
+        obj: value to encode
+        indent (int, optional): indent nested values by this many spaces. Defaults to None for
+            compact output.
+
+    Returns:
+        bytes: JSON text
+    """
+    if orjson is not None and indent in (None, 2):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            # e.g. integers larger than 64 bits, which only the standard library can encode
+            pass
+    separators = None if indent else (",", ":")
+    return json.dumps(obj, indent=indent, separators=separators, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj, indent: int = None, ensure_ascii: bool = False) -> str:
+    """Encode a value as JSON
+
+    Args:
+        obj: value to encode
+        indent (int, optional): indent nested values by this many spaces. Defaults to None for
+            compact output.
+        ensure_ascii (bool, optional): escape non-ASCII characters as \\uXXXX, as json.dumps does
+            by default. Defaults to False.
+
+    Returns:
+        str: JSON text
+    """
+    text = dumps_bytes(obj, indent).decode("utf-8")
+    if ensure_ascii:
+        # non-ASCII characters can only occur within strings, so can be escaped in place
+        text = _NON_ASCII.sub(_escape, text)
+    return text
+
+
+def _escape(match) -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:
+        # characters outside the basic multilingual plane are escaped as a surrogate pair
+        code -= 0x10000
+        return f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}"
+    return f"\\u{code:04x}"
@@ -0,0 +1,370 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Incremental reading of manifest files"""
+
+import codecs
+import json
+from typing import Iterator, Tuple
+
+from osducli.util import json_backend
+
+STREAMED_DATA_TYPES = ("ReferenceData", "MasterData")
+NDJSON_EXTENSIONS = (".jsonl", ".ndjson")
+MANIFEST_EXTENSIONS = (".json",) + NDJSON_EXTENSIONS
+STDIN_PATH = "-"
+
+_WHITESPACE = " \t\n\r"
+_DEFAULT_CHUNK_SIZE = 64 * 1024
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Minimal cursor over a text or binary (utf-8) file that decodes one JSON value at a time.
+
+    Only the data needed for the value currently being decoded is held in memory."""
+
+    def __init__(self, handle, chunk_size: int, start_offset: int = 0):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = None
+        self._consumed = start_offset  # byte offset in the file of buffer[: self._counted]
+        self._counted = 0
+        self._read = getattr(handle, "read1", handle.read)
+
+    @property
+    def offset(self) -> int:
+        """Byte offset in the file of the current position (only meaningful for binary files).
+
+        Only the characters consumed since the offset was last taken are encoded to count their
+        bytes, so taking it after every value costs no more than reading the file."""
+        if self._counted < self.pos:
+            self._consumed += len(self.buffer[self._counted : self.pos].encode("utf-8"))
+            self._counted = self.pos
+        return self._consumed
+
+    def _fill(self, size: int) -> bool:
+        # read1 returns whatever is available rather than waiting for size bytes from a pipe
+        chunk = self._read(size)
+        if isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = self._decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+            return False
+        self._consumed = self.offset
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        self._counted = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or an empty string at the end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char: str):
+        """Consume the given structural character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid manifest - expected '{char}' but found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # A value ending exactly at the end of the buffer might be truncated (e.g. a number)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so large records are not re-parsed too many times
+            self._fill(max(self.chunk_size, len(self.buffer) - self.pos))
+
+
+class ManifestReader:
+    """Incrementally read a manifest, iterating over its top level members as (key, value) pairs.
+
+    Arrays stored under one of data_types are not loaded as a whole - instead (key, record) is
+    produced for each of their elements, so memory use is bounded by the largest single record.
+    When reading a binary file, offset gives the byte offset just after the last item produced,
+    which can be passed back as resume_at to continue reading from that point later.
+    """
+
+    def __init__(
+        self,
+        handle,
+        data_types: tuple = STREAMED_DATA_TYPES,
+        chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        resume_at: Tuple[str, int] = None,
+    ):
+        """Setup the reader
+
+        Args:
+            handle: open file handle positioned at the start of the manifest
+            data_types (tuple, optional): keys whose arrays should be streamed record by record.
+                Defaults to STREAMED_DATA_TYPES.
+            chunk_size (int, optional): number of characters / bytes to read at a time.
+            resume_at (Tuple[str, int], optional): data type and byte offset of a previously
+                read record to continue reading after. Defaults to None.
+        """
+        self.data_types = data_types
+        self.resume_at = resume_at
+        start_offset = 0
+        if resume_at is not None:
+            start_offset = resume_at[1]
+            handle.seek(start_offset)
+        self._stream = _JsonStream(handle, chunk_size, start_offset)
+
+    @property
+    def offset(self) -> int:
+        """Byte offset just after the last item read"""
+        return self._stream.offset
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        stream = self._stream
+        if self.resume_at is not None:
+            key = self.resume_at[0]
+            if stream.peek() == ",":
+                stream.expect(",")
+                yield from self._array_items(key)
+            else:
+                stream.expect("]")
+        else:
+            if stream.peek() == "":
+                return
+            stream.expect("{")
+            if stream.peek() == "}":
+                return
+            yield from self._members()
+            return
+
+        if stream.peek() != ",":
+            stream.expect("}")
+            return
+        stream.expect(",")
+        yield from self._members()
+
+    def _members(self) -> Iterator[Tuple[str, object]]:
+        stream = self._stream
+        while True:
+            key = stream.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Invalid manifest - expected a key but found '{key}'")
+            stream.expect(":")
+            if key in self.data_types and stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    yield from self._array_items(key)
+            else:
+                yield key, stream.value()
+
+            if stream.peek() != ",":
+                stream.expect("}")
+                break
+            stream.expect(",")
+
+    def _array_items(self, key: str) -> Iterator[Tuple[str, object]]:
+        stream = self._stream
+        while True:
+            yield key, stream.value()
+            if stream.peek() != ",":
+                stream.expect("]")
+                break
+            stream.expect(",")
+
+
+class NdjsonReader:
+    """Read a JSON Lines (NDJSON) file holding one record per line, iterating over it as
+    (data type, record) pairs like ManifestReader.
+
+    The data type of each record is record_type if given, and otherwise inferred from the record's
+    kind. Blank lines are skipped. offset gives the byte offset just after the last record produced
+    and can be passed back as resume_at to continue reading from that point later.
+    """
+
+    def __init__(self, handle, record_type: str = None, resume_at: Tuple[str, int] = None):
+        """Setup the reader
+
+        Args:
+            handle: open file handle positioned at the start of the file
+            record_type (str, optional): data type of all records, one of STREAMED_DATA_TYPES.
+                Defaults to None to infer it from each record's kind.
+            resume_at (Tuple[str, int], optional): data type and byte offset of a previously
+                read record to continue reading after. Defaults to None.
+        """
+        self.handle = handle
+        self.record_type = record_type
+        self._offset = 0
+        if resume_at is not None:
+            self._offset = resume_at[1]
+            handle.seek(self._offset)
+
+    @property
+    def offset(self) -> int:
+        """Byte offset just after the last record read"""
+        return self._offset
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        for number, line in enumerate(self.handle, 1):
+            self._offset += len(line) if isinstance(line, bytes) else len(line.encode("utf-8"))
+            if not line.strip():
+                continue
+            try:
+                record = json_backend.loads(line)
+            except json.JSONDecodeError as ex:
+                raise ValueError(f"Invalid record on line {number}: {ex}") from ex
+            yield self.record_type or record_data_type(record), record
+
+
+class JsonSequenceReader(ManifestReader):
+    """Read a sequence of JSON objects - records, one per line or otherwise, and / or whole
+    manifests - as piped to stdin, iterating over it as (data type, record) pairs like
+    ManifestReader.
+
+    The records of each manifest are produced as they are read, followed by its other top level
+    members once it ends. Any other object is a record whose data type is record_type if given,
+    and otherwise inferred from its kind.
+    """
+
+    def __init__(
+        self,
+        handle,
+        data_types: tuple = STREAMED_DATA_TYPES,
+        chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        record_type: str = None,
+    ):
+        """Setup the reader
+
+        Args:
+            handle: open file handle positioned at the start of the sequence
+            data_types (tuple, optional): keys of a manifest whose arrays should be streamed
+                record by record. Defaults to STREAMED_DATA_TYPES.
+            chunk_size (int, optional): maximum number of characters / bytes to read at a time.
+            record_type (str, optional): data type of the records that are not in a manifest.
+                Defaults to None to infer it from each record's kind.
+        """
+        super().__init__(handle, data_types, chunk_size)
+        self.record_type = record_type
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        stream = self._stream
+        while stream.peek() != "":
+            stream.expect("{")
+            if stream.peek() == "}":
+                stream.expect("}")
+                continue
+
+            members = {}
+            is_manifest = False
+            for key, value in self._members():
+                if key in self.data_types:
+                    is_manifest = True
+                    yield key, value
+                else:
+                    members[key] = value
+
+            if is_manifest or ":Manifest:" in str(members.get("kind", "")) or "Data" in members:
+                yield from members.items()
+            else:
+                yield self.record_type or record_data_type(members), members
+
+
+def record_data_type(record: dict) -> str:
+    """Infer whether a record is ReferenceData or MasterData from its kind
+
+    Args:
+        record (dict): record
+
+    Returns:
+        str: ReferenceData for reference-data kinds, otherwise MasterData
+    """
+    kind = record.get("kind", "") if isinstance(record, dict) else ""
+    return "ReferenceData" if ":reference-data--" in kind else "MasterData"
+
+
+def is_ndjson(filepath: str) -> bool:
+    """Whether a file holds JSON Lines (NDJSON) records rather than a manifest
+
+    Args:
+        filepath (str): path of the file
+
+    Returns:
+        bool: True for .jsonl and .ndjson files
+    """
+    return filepath.endswith(NDJSON_EXTENSIONS)
+
+
+def is_stdin(filepath: str) -> bool:
+    """Whether a path refers to stdin rather than a file
+
+    Args:
+        filepath (str): path of the file
+
+    Returns:
+        bool: True for STDIN_PATH
+    """
+    return filepath == STDIN_PATH
+
+
+def is_manifest_file(filepath: str) -> bool:
+    """Whether a file holds a manifest or manifest records that can be loaded
+
+    Args:
+        filepath (str): path of the file
+
+    Returns:
+        bool: True for .json, .jsonl and .ndjson files
+    """
+    return filepath.endswith(MANIFEST_EXTENSIONS)
+
+
+def manifest_reader(
+    handle,
+    filepath: str,
+    data_types: tuple = STREAMED_DATA_TYPES,
+    resume_at: Tuple[str, int] = None,
+    record_type: str = None,
+):
+    """Get a reader for a manifest (.json) or JSON Lines (.jsonl / .ndjson) file, or for the
+    records and manifests piped to stdin
+
+    Args:
+        handle: open file handle positioned at the start of the file
+        filepath (str): path of the file, used to tell its format, or STDIN_PATH
+        data_types (tuple, optional): keys of a manifest whose arrays should be streamed record by
+            record. Defaults to STREAMED_DATA_TYPES.
+        resume_at (Tuple[str, int], optional): data type and byte offset of a previously read
+            record to continue reading after. Defaults to None.
+        record_type (str, optional): data type of the records in a JSON Lines file or stdin.
+            Defaults to None to infer it from each record's kind.
+
+    Returns:
+        Union[ManifestReader, NdjsonReader, JsonSequenceReader]: reader
+    """
+    if is_stdin(filepath):
+        if resume_at is not None:
+            raise ValueError("Reading from stdin can't be resumed")
+        return JsonSequenceReader(handle, data_types, record_type=record_type)
+    if is_ndjson(filepath):
+        return NdjsonReader(handle, record_type, resume_at)
+    return ManifestReader(handle, data_types, resume_at=resume_at)
@@ -0,0 +1,101 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.dependencies"""
+
+import json
+import os
+import unittest
+
+from osducli.commands.dataload.dependencies import dependency_levels, manifest_references
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _write(directory, name, manifest):
+    filepath = os.path.join(directory, f"{name}.json")
+    with open(filepath, "w") as file:
+        json.dump(dict(manifest, kind="osdu:wks:Manifest:1.0.0"), file)
+    return filepath
+
+
+class TestDependencies(unittest.TestCase):
+    def setUp(self):
+        self.directory = temp_directory(self)
+        self.wellbore = _write(
+            self.directory,
+            "wellbore",
+            {
+                "MasterData": [
+                    {
+                        "id": "opendes:master-data--Wellbore:1",
+                        "data": {"WellID": "opendes:master-data--Well:1:"},
+                    }
+                ]
+            },
+        )
+        self.well = _write(
+            self.directory,
+            "well",
+            {
+                "MasterData": [
+                    {
+                        "id": "opendes:master-data--Well:1",
+                        "data": {"FacilityTypeID": "opendes:reference-data--FacilityType:Well:"},
+                    }
+                ]
+            },
+        )
+        self.reference = _write(
+            self.directory,
+            "reference",
+            {"ReferenceData": [{"id": "opendes:reference-data--FacilityType:Well", "data": {}}]},
+        )
+        self.other = _write(
+            self.directory,
+            "other",
+            {"ReferenceData": [{"id": "opendes:reference-data--UnitOfMeasure:m", "data": {}}]},
+        )
+
+    def test_manifest_references(self):
+        defined, referenced = manifest_references(self.wellbore)
+        self.assertEqual({"opendes:master-data--Wellbore:1"}, defined)
+        self.assertEqual({"opendes:master-data--Well:1:"}, referenced)
+
+    def test_dependency_levels(self):
+        levels = dependency_levels([self.wellbore, self.well, self.reference, self.other])
+        self.assertEqual([[self.reference, self.other], [self.well], [self.wellbore]], levels)
+
+    def test_dependency_levels_with_cycle(self):
+        first = _write(
+            self.directory,
+            "first",
+            {
+                "MasterData": [
+                    {"id": "opendes:master-data--A:1", "data": {"B": "opendes:master-data--B:1"}}
+                ]
+            },
+        )
+        second = _write(
+            self.directory,
+            "second",
+            {
+                "MasterData": [
+                    {"id": "opendes:master-data--B:1", "data": {"A": "opendes:master-data--A:1:"}}
+                ]
+            },
+        )
+        self.assertEqual(
+            [[self.other], [first, second]], dependency_levels([first, second, self.other])
+        )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,96 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.failed_runs"""
+
+import unittest
+
+from nose2.tools import params
+
+from osducli.commands.dataload.failed_runs import (
+    NO_ERROR,
+    UNKNOWN_TYPE,
+    entity_type,
+    group_failed_runs,
+    run_error,
+)
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _run(runid, **details):
+    return dict(details, runId=runid, status="failed", startTimeStamp=1, endTimeStamp=2)
+
+
+class TestFailedRuns(unittest.TestCase):
+    @params(
+        ("opendes:reference-data--UnitOfMeasure:m:", "reference-data--UnitOfMeasure"),
+        ("opendes:master-data--Well:1234", "master-data--Well"),
+        ("no-type", UNKNOWN_TYPE),
+        (None, UNKNOWN_TYPE),
+    )
+    def test_entity_type(self, record_id, expected):
+        self.assertEqual(expected, entity_type(record_id))
+
+    @params(
+        ({"errorMessage": "Invalid kind"}, "Invalid kind"),
+        ({"error": {"code": 400}}, "{'code': 400}"),
+        ({}, NO_ERROR),
+    )
+    def test_run_error(self, details, expected):
+        self.assertEqual(expected, run_error(_run("run-1", **details)))
+
+    def test_group_failed_runs(self):
+        runs = [_run(f"run-{index}") for index in range(1, 6)]
+        runs += [_run(f"run-{index}", errorMessage="Invalid kind") for index in (6, 7)]
+        well = {"type": "MasterData", "ids": ["opendes:master-data--Well:1"], "records": [0]}
+        sources = {
+            "run-1": dict(well, file="a.json"),
+            "run-2": dict(well, file="b.json", records=[1, 2]),
+            "run-3": {
+                "file": "c.json",
+                "type": "ReferenceData",
+                "ids": ["opendes:reference-data--UnitOfMeasure:m"],
+                "records": [5],
+            },
+            "run-4": dict(well, file="a.json"),
+            "run-6": dict(well, file="d.json"),
+            "run-7": dict(well, file="d.json", records=[1]),
+        }
+
+        groups = group_failed_runs(runs, sources)
+
+        self.assertEqual(
+            [
+                {
+                    "entityTypes": ["master-data--Well"],
+                    "error": NO_ERROR,
+                    "runs": 3,
+                    "records": 4,
+                    "files": ["a.json", "b.json"],
+                    "runIds": ["run-1", "run-2", "run-4"],
+                },
+                {
+                    "entityTypes": ["master-data--Well"],
+                    "error": "Invalid kind",
+                    "runs": 2,
+                    "records": 2,
+                    "files": ["d.json"],
+                    "runIds": ["run-6", "run-7"],
+                },
+                (["reference-data--UnitOfMeasure"], NO_ERROR, ["run-3"]),
+                ([], NO_ERROR, ["run-5"]),
+            ],
+            groups[:2]
+            + [(group["entityTypes"], group["error"], group["runIds"]) for group in groups[2:]],
+        )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,88 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for dataload generate"""
+
+import io
+import json
+import os
+import unittest
+
+from mock import MagicMock, patch
+
+from osducli.commands.dataload.generate import generate
+from osducli.util.file import get_files_from_path
+from osducli.util.manifest import manifest_reader
+from tests.commands.dataload.test_ingest import MOCK_CONFIG
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestGenerate(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = temp_directory(self)
+        self.csv = os.path.join(self.temp_dir, "units.csv")
+        with open(self.csv, "w", encoding="utf-8-sig", newline="") as file:
+            file.write("Code,Name\r\n" + "".join(f"u{i},Unit {i}\r\n" for i in range(5)))
+        self.template = os.path.join(self.temp_dir, "template.json")
+        with open(self.template, "w") as file:
+            json.dump(
+                {
+                    "kind": "osdu:wks:reference-data--UnitOfMeasure:1.0.0",
+                    "id": "{data-partition-id}:reference-data--UnitOfMeasure:{Code}",
+                    "data": {"Name": "{Name}"},
+                },
+                file,
+            )
+        self.state = MagicMock(config=MOCK_CONFIG)
+
+    def _expected(self, i):
+        return {
+            "kind": "osdu:wks:reference-data--UnitOfMeasure:1.0.0",
+            "id": f"core_data_partition_id:reference-data--UnitOfMeasure:u{i}",
+            "data": {"Name": f"Unit {i}"},
+            "legal": {},
+            "acl": {},
+        }
+
+    def test_generate_json_lines_to_stdout(self):
+        stdout = MagicMock(buffer=io.BytesIO())
+        with patch("sys.stdout", stdout):
+            self.assertIsNone(generate(self.state, self.csv, self.template))
+
+        lines = stdout.buffer.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(
+            [self._expected(i) for i in range(5)], [json.loads(line) for line in lines]
+        )
+
+    def test_generate_manifest_shards(self):
+        output_dir = os.path.join(self.temp_dir, "manifests")
+        files = generate(self.state, self.csv, self.template, output_dir, 2)
+
+        self.assertEqual(
+            [os.path.join(output_dir, f"units-0000{i}.json") for i in (1, 2, 3)], files
+        )
+        self.assertEqual(files, sorted(get_files_from_path(output_dir)))
+        records = []
+        for filepath in files:
+            with open(filepath) as file:
+                manifest = json.load(file)
+            self.assertEqual("osdu:wks:Manifest:1.0.0", manifest["kind"])
+            records.extend(manifest["ReferenceData"])
+            with open(filepath, "rb") as file:
+                self.assertEqual(
+                    manifest["ReferenceData"],
+                    [r for key, r in manifest_reader(file, filepath) if key == "ReferenceData"],
+                )
+        self.assertEqual([self._expected(i) for i in range(5)], records)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,436 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for dataload ingest"""
+
+import io
+import json
+import os
+import threading
+import unittest
+
+from mock import MagicMock, Mock, patch
+from nose2.tools import params
+
+from osducli.commands.dataload.ingest import _ingest_files, ingest
+from osducli.commands.dataload.options import IngestOptions
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.util.archive import close_archives
+from osducli.util.exceptions import CliError
+from osducli.util.file import get_files_from_path
+from osducli.util.manifest import MANIFEST_EXTENSIONS, STDIN_PATH
+from tests.helpers import temp_directory, write_archive
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def mock_config_values(section, name, fallback=None):  # pylint: disable=W0613
+    """Validate and mock config returns"""
+    return f"{section}_{name}"
+
+
+MOCK_CONFIG = MagicMock()
+MOCK_CONFIG.get.side_effect = mock_config_values
+
+
+def _write_manifest(directory, name, count):
+    records = [
+        {"id": f"opendes:reference-data--{name}:{i}", "legal": {}, "acl": {}, "data": {}}
+        for i in range(count)
+    ]
+    filepath = os.path.join(directory, f"{name}.json")
+    with open(filepath, "w") as file:
+        json.dump({"kind": "osdu:wks:Manifest:1.0.0", "ReferenceData": records}, file, indent=2)
+    return filepath
+
+
+def _succeeded(config, runids, wait):  # pylint: disable=W0613
+    return [{"runId": runid, "status": "finished"} for runid in runids]
+
+
+class RecordingPost:  # pylint: disable=too-few-public-methods
+    """Record the ids sent in each workflow run, optionally failing on a given call"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.submitted = []
+
+    def __call__(self, request_data):
+        if len(self.submitted) == self.fail_on:
+            raise SystemExit(1)
+        manifest = request_data["executionContext"]["manifest"]
+        self.submitted.append([record.get("id") for record in manifest["ReferenceData"]])
+        return f"run-{len(self.submitted)}"
+
+
+class TestIngest(unittest.TestCase):
+    @params(False, True)
+    def test_ingest_resume_from_journal(self, stream):
+        temp_dir = temp_directory(self)
+        files = [_write_manifest(temp_dir, "A", 10), _write_manifest(temp_dir, "B", 4)]
+        journal = os.path.join(temp_dir, "journal")
+        runid_log = os.path.join(temp_dir, "runids")
+
+        first = RecordingPost(fail_on=2)
+        with patch.object(WorkflowSubmitter, "_post", side_effect=first):
+            with self.assertRaises(SystemExit):
+                _ingest_files(
+                    MOCK_CONFIG,
+                    files,
+                    IngestOptions(
+                        runid_log=runid_log, batch_size=3, stream=stream, journal=journal
+                    ),
+                )
+
+        second = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=second):
+            runids = _ingest_files(
+                MOCK_CONFIG,
+                files,
+                IngestOptions(
+                    runid_log=runid_log, batch_size=3, stream=stream, journal=journal, resume=True
+                ),
+            )
+
+        first_ids = [i for batch in first.submitted for i in batch]
+        second_ids = [i for batch in second.submitted for i in batch]
+        self.assertEqual([f"opendes:reference-data--A:{i}" for i in range(6)], first_ids)
+        self.assertEqual(
+            [f"opendes:reference-data--A:{i}" for i in range(6, 10)]
+            + [f"opendes:reference-data--B:{i}" for i in range(4)],
+            second_ids,
+        )
+        self.assertEqual(["run-1", "run-2", "run-1", "run-2", "run-3", "run-4"], runids)
+        with open(runid_log) as handle:
+            self.assertEqual(runids, [line.rstrip() for line in handle])
+
+    @params((1, 0), (2, 0), (2, 300))
+    def test_ingest_prepares_manifests_in_order(self, workers, min_worker_file_size):
+        temp_dir = temp_directory(self)
+        # files of 3 records are sent to the workers, those of 2 prepared in this process
+        counts = {"A": 2, "B": 3, "C": 2, "D": 2, "E": 3}
+        files = [_write_manifest(temp_dir, name, count) for name, count in counts.items()]
+
+        recorder = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=recorder), patch(
+            "osducli.commands.dataload.prepare.MIN_WORKER_FILE_SIZE", min_worker_file_size
+        ):
+            _ingest_files(MOCK_CONFIG, files, IngestOptions(batch_size=2, workers=workers))
+
+        submitted = [i for batch in recorder.submitted for i in batch]
+        self.assertEqual(
+            [
+                f"opendes:reference-data--{name}:{i}"
+                for name in "ABCDE"
+                for i in range(counts[name])
+            ],
+            submitted,
+        )
+
+    def test_ingest_skip_existing_uses_ledger(self):
+        temp_dir = temp_directory(self)
+        files = [_write_manifest(temp_dir, "A", 5)]
+        ledger = os.path.join(temp_dir, "ledger.db")
+
+        first = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=first), patch(
+            "osducli.commands.dataload.streaming.batch_verify"
+        ), patch("osducli.commands.dataload.ingest.check_status", side_effect=_succeeded):
+            _ingest_files(
+                MOCK_CONFIG,
+                files,
+                IngestOptions(batch_size=2, wait=True, skip_existing=True, ledger=ledger),
+            )
+
+        files.append(_write_manifest(temp_dir, "B", 2))
+        second = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=second), patch(
+            "osducli.commands.dataload.streaming.batch_verify"
+        ) as mock_verify:
+            _ingest_files(
+                MOCK_CONFIG, files, IngestOptions(batch_size=2, skip_existing=True, ledger=ledger)
+            )
+
+        self.assertEqual(3, len(first.submitted))
+        # Only the records the ledger hasn't confirmed are searched for
+        self.assertEqual(1, mock_verify.call_count)
+        self.assertEqual(
+            ["opendes:reference-data--B:0", "opendes:reference-data--B:1"],
+            mock_verify.call_args[0][2],
+        )
+        self.assertEqual(
+            [["opendes:reference-data--B:0", "opendes:reference-data--B:1"]], second.submitted
+        )
+
+    def test_ingest_skip_existing_searches_for_unconfirmed_records(self):
+        temp_dir = temp_directory(self)
+        files = [_write_manifest(temp_dir, "A", 2)]
+        ledger = os.path.join(temp_dir, "ledger.db")
+
+        for _ in range(2):
+            recorder = RecordingPost()
+            with patch.object(WorkflowSubmitter, "_post", side_effect=recorder), patch(
+                "osducli.commands.dataload.streaming.batch_verify"
+            ) as mock_verify:
+                # not waiting, so the run is never seen to succeed
+                _ingest_files(
+                    MOCK_CONFIG,
+                    files,
+                    IngestOptions(batch_size=2, skip_existing=True, ledger=ledger),
+                )
+            self.assertEqual(1, mock_verify.call_count)
+            self.assertEqual(1, len(recorder.submitted))
+
+    def test_ingest_only_opens_ledger_to_skip_existing(self):
+        temp_dir = temp_directory(self)
+        files = [_write_manifest(temp_dir, "A", 2)]
+        ledger = os.path.join(temp_dir, "ledger.db")
+
+        with patch.object(WorkflowSubmitter, "_post", side_effect=RecordingPost()):
+            _ingest_files(MOCK_CONFIG, files, IngestOptions(batch_size=2, ledger=ledger))
+
+        self.assertFalse(os.path.exists(ledger))
+
+    @params(False, True)
+    def test_ingest_skip_existing_with_generated_ids(self, stream):
+        temp_dir = temp_directory(self)
+        filepath = os.path.join(temp_dir, "units.json")
+        records = [
+            {
+                "kind": "osdu:wks:reference-data--A:1.0.0",
+                "legal": {},
+                "acl": {},
+                "data": {"Code": c},
+            }
+            for c in ("m", "ft")
+        ]
+        with open(filepath, "w") as file:
+            json.dump({"kind": "osdu:wks:Manifest:1.0.0", "ReferenceData": records}, file)
+        id_rules = os.path.join(temp_dir, "id_rules.json")
+        with open(id_rules, "w") as file:
+            json.dump({"osdu:wks:reference-data--A": ["data.Code"]}, file)
+        ledger = os.path.join(temp_dir, "ledger.db")
+
+        submitted = []
+        for rules in (None, id_rules, id_rules):
+            recorder = RecordingPost()
+            with patch.object(WorkflowSubmitter, "_post", side_effect=recorder), patch(
+                "osducli.commands.dataload.streaming.batch_verify"
+            ), patch("osducli.commands.dataload.ingest.check_status", side_effect=_succeeded):
+                _ingest_files(
+                    MOCK_CONFIG,
+                    [filepath],
+                    IngestOptions(
+                        batch_size=2,
+                        wait=True,
+                        skip_existing=True,
+                        stream=stream,
+                        ledger=ledger,
+                        id_rules=rules,
+                    ),
+                )
+            submitted.append(recorder.submitted)
+
+        ids = [f"core_data_partition_id:reference-data--A:{c}" for c in ("m", "ft")]
+        # without rules records that have no id are still submitted, with rules only once
+        self.assertEqual([[[None, None]], [ids], []], submitted)
+
+    @params(False, True)
+    def test_ingest_skip_existing_submits_while_looking_up(self, stream):
+        temp_dir = temp_directory(self)
+        files = [_write_manifest(temp_dir, "A", 6)]
+        first_submitted = threading.Event()
+        overlapped = []
+
+        def _verify(
+            config, batch_size, ids, found, not_found, process_all
+        ):  # pylint: disable=W0613
+            if ids[0].endswith(":4"):
+                # the last lookup is still running when the first batch is submitted
+                overlapped.append(first_submitted.wait(5))
+            found.extend(i for i in ids if i.endswith(":3"))
+
+        recorder = RecordingPost()
+
+        def _post(request_data):
+            runid = recorder(request_data)
+            first_submitted.set()
+            return runid
+
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_post), patch(
+            "osducli.commands.dataload.streaming.batch_verify", side_effect=_verify
+        ):
+            _ingest_files(
+                MOCK_CONFIG, files, IngestOptions(batch_size=2, skip_existing=True, stream=stream)
+            )
+
+        self.assertEqual([True], overlapped)
+        self.assertEqual(
+            [[f"opendes:reference-data--A:{i}" for i in ids] for ids in ([0, 1], [2, 4], [5])],
+            recorder.submitted,
+        )
+
+    def test_ingest_ordered_waits_for_each_level(self):
+        temp_dir = temp_directory(self)
+        dependent = os.path.join(temp_dir, "dependent.json")
+        with open(dependent, "w") as file:
+            record = {
+                "id": "opendes:master-data--Well:1",
+                "legal": {},
+                "acl": {},
+                "data": {"TypeID": "opendes:reference-data--A:0:"},
+            }
+            json.dump({"MasterData": [record]}, file)
+        files = [dependent, _write_manifest(temp_dir, "A", 2)]
+
+        posted = []
+
+        def _post(request_data):
+            manifest = request_data["executionContext"]["manifest"]
+            posted.append(
+                [r["id"] for data in manifest.values() if isinstance(data, list) for r in data]
+            )
+            return f"run-{len(posted)}"
+
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_post), patch(
+            "osducli.commands.dataload.ingest.wait_for_runs", return_value={"run-1": "finished"}
+        ) as mock_wait:
+            runids = _ingest_files(MOCK_CONFIG, files, IngestOptions(ordered=True))
+
+        self.assertEqual(
+            [
+                ["opendes:reference-data--A:0", "opendes:reference-data--A:1"],
+                ["opendes:master-data--Well:1"],
+            ],
+            posted,
+        )
+        self.assertEqual(["run-1", "run-2"], runids)
+        mock_wait.assert_called_once_with(MOCK_CONFIG, ["run-1"])
+
+        # dependants aren't submitted when a run of the level they depend on failed
+        posted.clear()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_post), patch(
+            "osducli.commands.dataload.ingest.wait_for_runs", return_value={"run-1": "failed"}
+        ):
+            with self.assertRaises(CliError):
+                _ingest_files(MOCK_CONFIG, files, IngestOptions(ordered=True))
+        self.assertEqual([["opendes:reference-data--A:0", "opendes:reference-data--A:1"]], posted)
+
+    def test_ingest_ndjson_resume_from_journal(self):
+        temp_dir = temp_directory(self)
+        filepath = os.path.join(temp_dir, "records.jsonl")
+        with open(filepath, "w") as file:
+            for i in range(5):
+                record = {"id": f"opendes:reference-data--A:{i}", "legal": {}, "acl": {}}
+                file.write(json.dumps(dict(record, kind="osdu:wks:reference-data--A:1.0.0")) + "\n")
+        journal = os.path.join(temp_dir, "journal")
+
+        first = RecordingPost(fail_on=1)
+        with patch.object(WorkflowSubmitter, "_post", side_effect=first):
+            with self.assertRaises(SystemExit):
+                _ingest_files(MOCK_CONFIG, [filepath], IngestOptions(batch_size=2, journal=journal))
+
+        second = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=second):
+            _ingest_files(
+                MOCK_CONFIG, [filepath], IngestOptions(batch_size=2, journal=journal, resume=True)
+            )
+
+        self.assertEqual(
+            [["opendes:reference-data--A:0", "opendes:reference-data--A:1"]], first.submitted
+        )
+        self.assertEqual(
+            [
+                ["opendes:reference-data--A:2", "opendes:reference-data--A:3"],
+                ["opendes:reference-data--A:4"],
+            ],
+            second.submitted,
+        )
+
+    @params((1, False), (2, False), (1, True))
+    def test_ingest_from_archive(self, workers, stream):
+        temp_dir = temp_directory(self)
+        members = []
+        for name, count in (("B", 3), ("A", 2)):
+            with open(_write_manifest(temp_dir, name, count), "rb") as file:
+                members.append((f"manifests/{name}.json", file.read()))
+        records = [
+            {
+                "id": f"opendes:reference-data--C:{i}",
+                "kind": "osdu:wks:reference-data--C:1.0.0",
+                "legal": {},
+                "acl": {},
+                "data": {},
+            }
+            for i in range(2)
+        ]
+        members.append(
+            ("manifests/C.jsonl", "".join(json.dumps(r) + "\n" for r in records).encode())
+        )
+        archive = write_archive(temp_dir, "drop.tar.gz", members)
+
+        recorder = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=recorder):
+            try:
+                _ingest_files(
+                    MOCK_CONFIG,
+                    get_files_from_path(archive, MANIFEST_EXTENSIONS),
+                    IngestOptions(batch_size=2, stream=stream, workers=workers),
+                )
+            finally:
+                close_archives()
+
+        self.assertEqual(
+            [
+                [f"opendes:reference-data--B:{i}" for i in (0, 1)],
+                ["opendes:reference-data--B:2"],
+                [f"opendes:reference-data--A:{i}" for i in (0, 1)],
+                [f"opendes:reference-data--C:{i}" for i in (0, 1)],
+            ],
+            recorder.submitted,
+        )
+
+    def test_ingest_from_stdin(self):
+        records = [
+            {
+                "id": f"opendes:reference-data--A:{i}",
+                "kind": "osdu:wks:reference-data--A:1.0.0",
+                "legal": {},
+                "acl": {},
+                "data": {},
+            }
+            for i in range(3)
+        ]
+        piped = "\n".join(
+            [json.dumps(records[0]), json.dumps({"ReferenceData": records[1:]})]
+        ).encode()
+
+        recorder = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=recorder), patch(
+            "sys.stdin", Mock(buffer=io.BytesIO(piped))
+        ):
+            _ingest_files(MOCK_CONFIG, [STDIN_PATH], IngestOptions(batch_size=2))
+
+        self.assertEqual(
+            [
+                ["opendes:reference-data--A:0", "opendes:reference-data--A:1"],
+                ["opendes:reference-data--A:2"],
+            ],
+            recorder.submitted,
+        )
+
+    def test_ingest_from_stdin_cannot_resume(self):
+        with self.assertRaises(CliError):
+            ingest(
+                MagicMock(), STDIN_PATH, IngestOptions(batch_size=2, journal="journal", resume=True)
+            )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
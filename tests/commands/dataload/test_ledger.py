@@ -0,0 +1,63 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.ledger"""
+
+import os
+import unittest
+
+from osducli.commands.dataload.ledger import IngestLedger, record_hash
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestIngestLedger(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(temp_directory(self), "ledger.db")
+
+    def test_lookup_returns_hash_of_confirmed_records(self):
+        records = [{"id": "a", "data": {"x": 1}}, {"id": "b", "data": {}}, {"data": {}}]
+        with IngestLedger(self.path, "server", "opendes") as ledger:
+            ledger.add(records, "run-1")
+            ledger.confirm_runs(["run-1"])
+
+        with IngestLedger(self.path, "server", "opendes") as ledger:
+            known = ledger.lookup(["a", "b", "c"])
+        self.assertEqual({"a": record_hash(records[0]), "b": record_hash(records[1])}, known)
+
+    def test_lookup_skips_pending_records(self):
+        with IngestLedger(self.path, "server", "opendes") as ledger:
+            ledger.add([{"id": "a"}], "run-1")
+            ledger.add([{"id": "b"}])
+            self.assertEqual(["b"], list(ledger.lookup(["a", "b"])))
+
+    def test_lookup_is_per_partition(self):
+        with IngestLedger(self.path, "server", "opendes") as ledger:
+            ledger.add([{"id": "a"}])
+        with IngestLedger(self.path, "server", "other") as ledger:
+            self.assertEqual({}, ledger.lookup(["a"]))
+
+    def test_forget_runs(self):
+        with IngestLedger(self.path, "server", "opendes") as ledger:
+            ledger.add([{"id": "a"}], "run-1")
+            ledger.add([{"id": "b"}], "run-2")
+            ledger.confirm_runs(["run-1", "run-2"])
+            ledger.forget_runs(["run-1"])
+            self.assertEqual(["b"], list(ledger.lookup(["a", "b"])))
+
+    def test_record_hash_ignores_key_order(self):
+        self.assertEqual(
+            record_hash({"id": "a", "data": {"x": 1, "y": 2}}),
+            record_hash({"data": {"y": 2, "x": 1}, "id": "a"}),
+        )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
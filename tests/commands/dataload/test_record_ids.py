@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.record_ids"""
+
+import json
+import os
+import unittest
+
+from nose2.tools import params
+
+from osducli.commands.dataload.record_ids import id_generator, load_id_generator
+from osducli.util.exceptions import CliError
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+UNIT_KIND = "osdu:wks:reference-data--UnitOfMeasure:1.0.0"
+WELL_KIND = "osdu:wks:master-data--Well:1.1.0"
+
+
+def _record(kind, **data):
+    return {"kind": kind, "acl": {}, "legal": {}, "data": data}
+
+
+class TestIdGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = id_generator(
+            {
+                UNIT_KIND: ["data.Code"],
+                "osdu:wks:master-data--Well": ["data.Field", "data.Name"],
+                "*": "hash",
+            },
+            "opendes",
+        )
+
+    def test_natural_key(self):
+        record = _record(UNIT_KIND, Code="m")
+        self.assertTrue(self.generator(record))
+        self.assertEqual("opendes:reference-data--UnitOfMeasure:m", record["id"])
+
+    def test_natural_key_for_any_version_is_encoded(self):
+        record = _record(WELL_KIND, Field="North Sea", Name="A/1~2")
+        self.generator(record)
+        self.assertEqual("opendes:master-data--Well:North%20Sea:A%2F1%7E2", record["id"])
+
+    def test_hash_is_stable_and_ignores_tags(self):
+        first = _record("osdu:wks:master-data--Wellbore:1.0.0", Name="A", Depth=1)
+        second = dict(_record("osdu:wks:master-data--Wellbore:1.0.0", Depth=1, Name="A"))
+        second["legal"] = {"legaltags": ["tag"]}
+        self.generator(first)
+        self.generator(second)
+        self.assertEqual(first["id"], second["id"])
+        self.assertTrue(first["id"].startswith("opendes:master-data--Wellbore:"))
+
+        third = _record("osdu:wks:master-data--Wellbore:1.0.0", Name="B", Depth=1)
+        self.generator(third)
+        self.assertNotEqual(first["id"], third["id"])
+
+    @params(
+        {"id": "opendes:reference-data--UnitOfMeasure:x", "kind": UNIT_KIND, "data": {}},
+        _record(UNIT_KIND, Name="metre"),
+        _record(UNIT_KIND, Code=""),
+        {"kind": "not a kind", "data": {}},
+    )
+    def test_no_id_generated(self, record):
+        original = dict(record)
+        self.assertFalse(self.generator(record))
+        self.assertEqual(original, record)
+
+    def test_kind_without_rule(self):
+        generator = id_generator({UNIT_KIND: ["data.Code"]}, "opendes")
+        self.assertFalse(generator(_record(WELL_KIND, Name="A")))
+
+    @params([], "uuid", ["data.Code", 1], {"field": "data.Code"})
+    def test_invalid_rule(self, rule):
+        with self.assertRaises(CliError):
+            id_generator({UNIT_KIND: rule}, "opendes")
+
+    def test_load_id_generator(self):
+        path = os.path.join(temp_directory(self), "rules.json")
+        with open(path, "w") as file:
+            json.dump({UNIT_KIND: ["data.Code"]}, file)
+        generator = load_id_generator(path, "opendes")
+        record = _record(UNIT_KIND, Code="m")
+        self.assertTrue(generator(record))
+        self.assertEqual("opendes:reference-data--UnitOfMeasure:m", record["id"])
+
+        with open(path, "w") as file:
+            json.dump([UNIT_KIND], file)
+        with self.assertRaises(CliError):
+            load_id_generator(path, "opendes")
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,156 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for dataload retry"""
+
+import json
+import os
+import unittest
+
+from mock import MagicMock, patch
+from nose2.tools import params
+
+from osducli.commands.dataload.ingest import _ingest_files
+from osducli.commands.dataload.options import IngestOptions
+from osducli.commands.dataload.retry import retry
+from osducli.commands.dataload.run_index import RunIndex
+from osducli.commands.dataload.status import FAILED, FINISHED, RUN_ID, STATUS
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from tests.commands.dataload.test_ingest import MOCK_CONFIG, RecordingPost, _write_manifest
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _statuses(failed):
+    def _check_status(config, runids, wait):  # pylint: disable=W0613
+        return [
+            {RUN_ID: runid, STATUS: FAILED if runid in failed else FINISHED} for runid in runids
+        ]
+
+    return _check_status
+
+
+class TestRetry(unittest.TestCase):
+    @params(False, True)
+    def test_retry_resubmits_records_of_failed_runs(self, stream):
+        temp_dir = temp_directory(self)
+        files = [_write_manifest(temp_dir, "A", 5), _write_manifest(temp_dir, "B", 3)]
+        runid_log = os.path.join(temp_dir, "runids")
+        run_index = os.path.join(temp_dir, "run_index.db")
+
+        first = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=first):
+            _ingest_files(
+                MOCK_CONFIG,
+                files,
+                IngestOptions(
+                    runid_log=runid_log, batch_size=2, stream=stream, run_index=run_index
+                ),
+            )
+        self.assertEqual(5, len(first.submitted))
+
+        state = MagicMock(config=MOCK_CONFIG)
+        second = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=second), patch(
+            "osducli.commands.dataload.retry.check_status",
+            side_effect=_statuses({"run-2", "run-4"}),
+        ):
+            new_runids = retry(state, runid_log=runid_log, run_index=run_index)
+
+        self.assertEqual(["run-1", "run-2"], new_runids)
+        self.assertEqual([first.submitted[1], first.submitted[3]], second.submitted)
+        with open(runid_log) as handle:
+            self.assertEqual(7, len(handle.readlines()))
+
+        # runs that have been retried aren't retried again
+        third = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=third), patch(
+            "osducli.commands.dataload.retry.check_status",
+            side_effect=_statuses({"run-2", "run-4"}),
+        ):
+            retry(state, runid_log=runid_log, run_index=run_index)
+        self.assertEqual([], third.submitted)
+
+    def test_retry_keeps_generated_ids(self):
+        temp_dir = temp_directory(self)
+        filepath = os.path.join(temp_dir, "units.json")
+        records = [
+            {
+                "kind": "osdu:wks:reference-data--A:1.0.0",
+                "legal": {},
+                "acl": {},
+                "data": {"Code": c},
+            }
+            for c in ("m", "ft", "in")
+        ]
+        with open(filepath, "w") as file:
+            json.dump({"kind": "osdu:wks:Manifest:1.0.0", "ReferenceData": records}, file)
+        id_rules = os.path.join(temp_dir, "id_rules.json")
+        with open(id_rules, "w") as file:
+            json.dump({"*": "hash"}, file)
+        run_index = os.path.join(temp_dir, "run_index.db")
+
+        first = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=first):
+            _ingest_files(
+                MOCK_CONFIG,
+                [filepath],
+                IngestOptions(batch_size=2, run_index=run_index, id_rules=id_rules),
+            )
+
+        second = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=second), patch(
+            "osducli.commands.dataload.retry.check_status", side_effect=_statuses({"run-2"})
+        ):
+            retry(MagicMock(config=MOCK_CONFIG), runid="run-2", run_index=run_index)
+
+        self.assertEqual([first.submitted[1]], second.submitted)
+        self.assertIsNotNone(second.submitted[0][0])
+
+    def test_retry_resubmits_work_product_once_per_file(self):
+        temp_dir = temp_directory(self)
+        filepath = os.path.join(temp_dir, "work_product.json")
+        with open(filepath, "w") as file:
+            json.dump({"kind": "osdu:wks:Manifest:1.0.0", "Data": {}}, file)
+        run_index = os.path.join(temp_dir, "run_index.db")
+        with RunIndex(run_index, "core_server", "core_data_partition_id") as index:
+            for runid in ("run-1", "run-2"):
+                index.add(runid, {"file": filepath, "type": "Data"})
+
+        with patch(
+            "osducli.commands.dataload.retry.check_status",
+            side_effect=_statuses({"run-1", "run-2"}),
+        ), patch("osducli.commands.dataload.retry.create_and_submit_work_products") as mock_submit:
+            retry(
+                MagicMock(config=MOCK_CONFIG),
+                runid_log=self._runid_log(temp_dir, ["run-1", "run-2"]),
+                run_index=run_index,
+            )
+
+        self.assertEqual(1, mock_submit.call_count)
+
+    def test_retry_nothing_failed(self):
+        state = MagicMock(config=MOCK_CONFIG)
+        with patch(
+            "osducli.commands.dataload.retry.check_status", side_effect=_statuses(set())
+        ), patch.object(WorkflowSubmitter, "_post") as mock_post:
+            self.assertEqual([], retry(state, runid="run-1"))
+        mock_post.assert_not_called()
+
+    @staticmethod
+    def _runid_log(directory, runids):
+        runid_log = os.path.join(directory, "runids")
+        with open(runid_log, "w") as handle:
+            handle.writelines(f"{runid}\n" for runid in runids)
+        return runid_log
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
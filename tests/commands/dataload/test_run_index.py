@@ -0,0 +1,70 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.run_index"""
+
+import os
+import unittest
+
+from nose2.tools import params
+
+from osducli.commands.dataload.run_index import RunIndex, decode_ranges, encode_ranges
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestRunIndex(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(temp_directory(self), "run_index.db")
+
+    @params(
+        ([], ""),
+        ([3], "3"),
+        ([0, 1, 2, 5, 7, 8], "0-2,5,7-8"),
+    )
+    def test_ranges_round_trip(self, indices, text):
+        self.assertEqual(text, encode_ranges(indices))
+        self.assertEqual(indices, decode_ranges(text))
+
+    def test_sources_of_added_runs(self):
+        source = {"file": "a.json", "type": "MasterData", "records": [0, 1, 3]}
+        with RunIndex(self.path, "server", "opendes") as index:
+            index.add("run-1", source, ["a", "b", "d"])
+            index.add("run-2", {"file": "wp.json", "type": "Data"})
+
+        with RunIndex(self.path, "server", "opendes") as index:
+            self.assertEqual(
+                {
+                    "run-1": dict(source, ids=["a", "b", "d"]),
+                    "run-2": {"file": "wp.json", "type": "Data", "records": None, "ids": []},
+                },
+                index.sources(["run-1", "run-2", "run-3"]),
+            )
+
+    def test_sources_are_per_partition(self):
+        with RunIndex(self.path, "server", "opendes") as index:
+            index.add("run-1", {"file": "a.json", "type": "Data"})
+        with RunIndex(self.path, "server", "other") as index:
+            self.assertEqual({}, index.sources(["run-1"]))
+
+    def test_retried_runs_are_excluded(self):
+        with RunIndex(self.path, "server", "opendes") as index:
+            index.add("run-1", {"file": "a.json", "type": "Data"})
+            index.add("run-2", {"file": "b.json", "type": "Data"})
+            index.mark_retried(["run-1"])
+
+            self.assertEqual(["run-2"], list(index.sources(["run-1", "run-2"])))
+            self.assertEqual(
+                ["run-1", "run-2"], sorted(index.sources(["run-1", "run-2"], include_retried=True))
+            )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.scan_index"""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from osducli.commands.dataload.scan_index import ScanIndex
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestScanIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = temp_directory(self)
+        self.path = os.path.join(self.directory, "index", "scan_index.db")
+        self.files = []
+        for name in ("a.json", "b.json"):
+            filepath = os.path.join(self.directory, name)
+            with open(filepath, "w") as file:
+                file.write('{"MasterData": []}')
+            self.files.append(filepath)
+
+    def _record_all(self, scope="ingest"):
+        with ScanIndex(self.path, scope) as index:
+            index.record(list(index.changed(self.files)))
+
+    def test_new_files_are_changed(self):
+        with ScanIndex(self.path, "ingest") as index:
+            self.assertEqual(self.files, list(index.changed(self.files)))
+
+    def test_recorded_files_are_unchanged_without_reading_them(self):
+        self._record_all()
+        with ScanIndex(self.path, "ingest") as index, patch(
+            "osducli.commands.dataload.scan_index.file_hash"
+        ) as mock_hash:
+            self.assertEqual([], list(index.changed(self.files)))
+        mock_hash.assert_not_called()
+
+    def test_modified_file_is_changed(self):
+        self._record_all()
+        with open(self.files[1], "w") as file:
+            file.write('{"MasterData": [{}]}')
+
+        with ScanIndex(self.path, "ingest") as index:
+            self.assertEqual([self.files[1]], list(index.changed(self.files)))
+
+    def test_new_files_are_recorded_without_reading_them(self):
+        with ScanIndex(self.path, "ingest") as index, patch(
+            "osducli.commands.dataload.scan_index.file_hash"
+        ) as mock_hash:
+            for _ in index.changed(self.files):
+                pass
+            index.record()
+        mock_hash.assert_not_called()
+
+        with ScanIndex(self.path, "ingest") as index:
+            self.assertEqual([], list(index.changed(self.files)))
+
+    def _touch(self, filepath):
+        stat = os.stat(filepath)
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_touched_file_is_unchanged_once_hashed(self):
+        self._record_all()
+        self._touch(self.files[0])
+
+        # the hash of a new file isn't kept, so the first touch can't be told from a change
+        with ScanIndex(self.path, "ingest") as index:
+            self.assertEqual([self.files[0]], list(index.changed(self.files)))
+            index.record()
+        self._touch(self.files[0])
+
+        with ScanIndex(self.path, "ingest") as index:
+            self.assertEqual([], list(index.changed(self.files)))
+        with ScanIndex(self.path, "ingest") as index, patch(
+            "osducli.commands.dataload.scan_index.file_hash"
+        ) as mock_hash:
+            self.assertEqual([], list(index.changed(self.files)))
+        mock_hash.assert_not_called()
+
+    def test_file_modified_while_processed_is_not_recorded(self):
+        with ScanIndex(self.path, "ingest") as index:
+            changed = list(index.changed(self.files))
+            with open(self.files[0], "w") as file:
+                file.write('{"ReferenceData": [{}, {}]}')
+            index.record(changed)
+
+        with ScanIndex(self.path, "ingest") as index:
+            self.assertEqual([self.files[0]], list(index.changed(self.files)))
+
+    def test_entries_are_per_scope(self):
+        self._record_all("ingest:server:opendes")
+        with ScanIndex(self.path, "ingest:server:other") as index:
+            self.assertEqual(self.files, list(index.changed(self.files)))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
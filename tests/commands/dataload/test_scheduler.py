@@ -0,0 +1,118 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.scheduler"""
+
+import threading
+import unittest
+
+from mock import MagicMock, patch
+from nose2.tools import params
+from requests.models import HTTPError
+
+from osducli.commands.dataload.scheduler import RunScheduler, wait_for_runs
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class MockWorkflowService:
+    """Runs finish after their status has been polled twice"""
+
+    def __init__(self):
+        self.polls = {}
+        self.started = []
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def active(self):
+        return [runid for runid in self.started if self.polls.get(runid, 0) < 2]
+
+    def start_run(self, request_data):
+        with self._lock:
+            runid = f"run-{request_data['index']}"
+            self.started.append(runid)
+            self.max_active = max(self.max_active, len(self.active()))
+            return runid
+
+    def get_run(self, config, runid):  # pylint: disable=unused-argument
+        with self._lock:
+            self.polls[runid] = self.polls.get(runid, 0) + 1
+            return {"status": "running" if self.polls[runid] < 2 else "finished"}
+
+
+def _failing_first(get_run):
+    """Make the first status request of each run fail"""
+    failed = set()
+
+    def _get_run(config, runid):
+        if runid not in failed:
+            failed.add(runid)
+            raise HTTPError(response=MagicMock(status_code=503))
+        return get_run(config, runid)
+
+    return _get_run
+
+
+class TestRunScheduler(unittest.TestCase):
+    @params(1, 4)
+    def test_active_runs_are_capped(self, parallel):
+        service = MockWorkflowService()
+        runids = []
+        with patch.object(WorkflowSubmitter, "_start_run", side_effect=service.start_run), patch(
+            "osducli.commands.dataload.scheduler.get_run", side_effect=service.get_run
+        ):
+            scheduler = RunScheduler(MagicMock(), 2, poll_interval=0.01)
+            with WorkflowSubmitter(
+                MagicMock(), runids, None, parallel, scheduler=scheduler
+            ) as submitter:
+                for index in range(8):
+                    submitter.submit({"index": index})
+
+        self.assertEqual([f"run-{index}" for index in range(8)], runids)
+        self.assertEqual(2, service.max_active)
+        self.assertEqual(2, len(scheduler.active))
+
+    def test_failed_status_request_counts_run_as_active(self):
+        service = MockWorkflowService()
+        runids = []
+        with patch.object(WorkflowSubmitter, "_start_run", side_effect=service.start_run), patch(
+            "osducli.commands.dataload.scheduler.get_run",
+            side_effect=_failing_first(service.get_run),
+        ):
+            scheduler = RunScheduler(MagicMock(), 1, poll_interval=0.01)
+            with WorkflowSubmitter(MagicMock(), runids, None, 1, scheduler=scheduler) as submitter:
+                for index in range(3):
+                    submitter.submit({"index": index})
+
+        self.assertEqual(["run-0", "run-1", "run-2"], runids)
+        self.assertEqual(1, service.max_active)
+
+    def test_wait_for_runs_retries_failed_status_request(self):
+        service = MockWorkflowService()
+        with patch(
+            "osducli.commands.dataload.scheduler.get_run",
+            side_effect=_failing_first(service.get_run),
+        ):
+            statuses = wait_for_runs(MagicMock(), ["run-1", "run-2"], poll_interval=0.01)
+
+        self.assertEqual({"run-1": 2, "run-2": 2}, service.polls)
+        self.assertEqual({"run-1": "finished", "run-2": "finished"}, statuses)
+
+    def test_release_frees_reserved_slot(self):
+        scheduler = RunScheduler(MagicMock(), 1, poll_interval=0.01)
+        scheduler.acquire()
+        scheduler.release()
+        scheduler.acquire()
+        scheduler.started("run-1")
+        self.assertEqual(["run-1"], scheduler.active)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
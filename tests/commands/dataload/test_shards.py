@@ -0,0 +1,88 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.shards"""
+
+import json
+import os
+import unittest
+
+from osducli.commands.dataload.shards import ShardWriter
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _record(i, size=10):
+    return {"id": f"opendes:reference-data--A:{i}", "data": {"Name": "x" * size}}
+
+
+class TestShardWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = temp_directory(self)
+
+    def _load(self, writer):
+        manifests = []
+        for shard, filepath in zip(writer.shards, writer.files):
+            self.assertEqual(os.path.getsize(filepath), shard["bytes"])
+            with open(filepath) as file:
+                manifests.append(json.load(file))
+        return manifests
+
+    def test_bounded_in_records_and_type(self):
+        with ShardWriter(self.temp_dir, "big", 2, header={"kind": "k"}) as writer:
+            for i in range(3):
+                writer.write("ReferenceData", _record(i))
+            writer.write("MasterData", _record(3))
+
+        self.assertEqual(
+            [
+                {"kind": "k", "ReferenceData": [_record(0), _record(1)]},
+                {"kind": "k", "ReferenceData": [_record(2)]},
+                {"kind": "k", "MasterData": [_record(3)]},
+            ],
+            self._load(writer),
+        )
+        self.assertEqual(
+            [(0, 2), (2, 1), (3, 1)],
+            [(shard["first"], shard["records"]) for shard in writer.shards],
+        )
+        self.assertEqual(
+            ["big-00001.json", "big-00002.json", "big-00003.json"],
+            [shard["file"] for shard in writer.shards],
+        )
+
+    def test_bounded_in_bytes(self):
+        max_bytes = 250
+        with ShardWriter(self.temp_dir, "big", 100, max_bytes) as writer:
+            for i in range(10):
+                writer.write("ReferenceData", _record(i))
+            writer.write("ReferenceData", _record(10, max_bytes))
+
+        manifests = self._load(writer)
+        self.assertEqual(
+            [_record(i) for i in range(10)],
+            [record for manifest in manifests[:-1] for record in manifest["ReferenceData"]],
+        )
+        self.assertTrue(all(shard["bytes"] <= max_bytes for shard in writer.shards[:-1]))
+        # a record larger than the limit is written on its own
+        self.assertEqual([_record(10, max_bytes)], manifests[-1]["ReferenceData"])
+
+    def test_incomplete_shard_is_not_valid(self):
+        with self.assertRaises(RuntimeError):
+            with ShardWriter(self.temp_dir, "big", 100) as writer:
+                writer.write("ReferenceData", _record(0))
+                raise RuntimeError()
+        with open(writer.files[0]) as file:
+            with self.assertRaises(json.JSONDecodeError):
+                json.load(file)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
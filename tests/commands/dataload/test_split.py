@@ -0,0 +1,84 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for dataload split"""
+
+import json
+import os
+import unittest
+
+from mock import MagicMock, patch
+
+from osducli.commands.dataload.ingest import _ingest_files
+from osducli.commands.dataload.options import IngestOptions
+from osducli.commands.dataload.split import SHARD_INDEX_EXTENSION, split
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.util.exceptions import CliError
+from osducli.util.file import get_files_from_path
+from osducli.util.manifest import MANIFEST_EXTENSIONS
+from tests.commands.dataload.test_ingest import MOCK_CONFIG, RecordingPost, _write_manifest
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestSplit(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = temp_directory(self)
+        self.output_dir = os.path.join(self.temp_dir, "shards")
+
+    def test_split_manifest(self):
+        filepath = _write_manifest(self.temp_dir, "A", 5)
+
+        index = split(MagicMock(), filepath, self.output_dir, 2)
+
+        self.assertEqual(5, index["records"])
+        self.assertEqual("osdu:wks:Manifest:1.0.0", index["kind"])
+        self.assertEqual([0, 2, 4], [shard["first"] for shard in index["shards"]])
+        with open(os.path.join(self.output_dir, "A" + SHARD_INDEX_EXTENSION)) as file:
+            self.assertEqual(index, json.load(file))
+
+        # the shards (and not the index) are picked up and ingested like any other manifests
+        shards = sorted(get_files_from_path(self.output_dir, MANIFEST_EXTENSIONS))
+        self.assertEqual(
+            [os.path.join(self.output_dir, s["file"]) for s in index["shards"]], shards
+        )
+        recorder = RecordingPost()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=recorder):
+            _ingest_files(MOCK_CONFIG, shards, IngestOptions())
+        self.assertEqual(
+            [
+                [f"opendes:reference-data--A:{i}" for i in range(j, min(j + 2, 5))]
+                for j in (0, 2, 4)
+            ],
+            recorder.submitted,
+        )
+
+    def test_split_json_lines(self):
+        filepath = os.path.join(self.temp_dir, "records.jsonl")
+        with open(filepath, "w") as file:
+            for i in range(3):
+                file.write(json.dumps({"id": f"opendes:master-data--Well:{i}"}) + "\n")
+
+        index = split(MagicMock(), filepath, self.output_dir, 2, record_type="ReferenceData")
+
+        self.assertEqual(["ReferenceData"] * 2, [shard["type"] for shard in index["shards"]])
+        self.assertEqual([2, 1], [shard["records"] for shard in index["shards"]])
+
+    def test_split_work_product(self):
+        filepath = os.path.join(self.temp_dir, "wp.json")
+        with open(filepath, "w") as file:
+            json.dump({"kind": "osdu:wks:Manifest:1.0.0", "Data": {}}, file)
+
+        with self.assertRaises(CliError):
+            split(MagicMock(), filepath, self.output_dir)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
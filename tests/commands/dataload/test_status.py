@@ -0,0 +1,112 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for dataload status"""
+
+import json
+import os
+import time
+import unittest
+
+from mock import MagicMock, patch
+from nose2.tools import params
+
+from osducli.commands.dataload.failed_runs import NO_ERROR
+from osducli.commands.dataload.run_index import RunIndex
+from osducli.commands.dataload.status import get_runs, status
+from osducli.util.exceptions import CliError
+from tests.commands.dataload.test_ingest import MOCK_CONFIG
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _get_run(config, run_id):  # pylint: disable=W0613
+    index = int(run_id.split("-")[1])
+    # later runs are returned first to check ordering is preserved
+    time.sleep(0.01 * (5 - index))
+    return {
+        "runId": run_id,
+        "status": "failed" if index % 2 else "finished",
+        "startTimeStamp": 1000,
+        "endTimeStamp": 3000,
+    }
+
+
+@patch("osducli.commands.dataload.status.get_client", MagicMock())
+@patch("osducli.commands.dataload.status.get_run", side_effect=_get_run)
+class TestStatus(unittest.TestCase):
+    @params(1, 4)
+    def test_get_runs_in_order(self, parallel, _):
+        runids = [f"run-{index}" for index in range(5)]
+        runs = get_runs(MOCK_CONFIG, runids, parallel)
+        self.assertEqual(runids, [run["runId"] for run in runs])
+
+    def test_failed_by_type_report(self, _):
+        temp_dir = temp_directory(self)
+        runid_log = os.path.join(temp_dir, "runids")
+        with open(runid_log, "w") as handle:
+            handle.write("".join(f"run-{index}\n" for index in range(5)))
+        run_index = os.path.join(temp_dir, "run_index.db")
+        with RunIndex(run_index, "core_server", "core_data_partition_id") as index:
+            for runid in ("run-1", "run-3"):
+                index.add(
+                    runid,
+                    {"file": "a.json", "type": "MasterData", "records": [0, 1]},
+                    ["opendes:master-data--Well:1", "opendes:master-data--Well:2"],
+                )
+        report_path = os.path.join(temp_dir, "report.json")
+
+        state = MagicMock(config=MOCK_CONFIG)
+        report = status(
+            state,
+            runid_log=runid_log,
+            parallel=4,
+            failed_by_type=True,
+            report=report_path,
+            run_index=run_index,
+        )
+
+        self.assertEqual(5, report["runs"])
+        self.assertEqual({"failed": 2, "finished": 3}, report["statuses"])
+        self.assertEqual(
+            [(["master-data--Well"], NO_ERROR, 2, 4, ["run-1", "run-3"])],
+            [
+                (
+                    group["entityTypes"],
+                    group["error"],
+                    group["runs"],
+                    group["records"],
+                    group["runIds"],
+                )
+                for group in report["groups"]
+            ],
+        )
+        with open(report_path) as handle:
+            self.assertEqual(report, json.load(handle))
+
+    @params(None, "missing.db")
+    def test_failed_by_type_requires_run_index(self, run_index, mock_get_run):
+        temp_dir = temp_directory(self)
+        runid_log = os.path.join(temp_dir, "runids")
+        with open(runid_log, "w") as handle:
+            handle.write("run-1\n")
+
+        with self.assertRaises(CliError):
+            status(
+                MagicMock(config=MOCK_CONFIG),
+                runid_log=runid_log,
+                failed_by_type=True,
+                run_index=run_index and os.path.join(temp_dir, run_index),
+            )
+        mock_get_run.assert_not_called()
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.submitter"""
+
+import io
+import time
+import unittest
+
+from mock import MagicMock, patch
+from nose2.tools import params
+
+from osducli.commands.dataload.submitter import WorkflowSubmitter
+from osducli.util.exceptions import PayloadTooLargeError
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _slow_post(request_data):
+    # later requests complete first to check ordering is preserved
+    time.sleep(0.01 * (5 - request_data["index"]))
+    return f"run-{request_data['index']}"
+
+
+class TestWorkflowSubmitter(unittest.TestCase):
+    @params(1, 3)
+    def test_submit_records_runids_in_order(self, parallel):
+        runids = []
+        runid_log = io.StringIO()
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_slow_post):
+            with WorkflowSubmitter(MagicMock(), runids, runid_log, parallel) as submitter:
+                for index in range(5):
+                    submitter.submit({"index": index})
+
+        expected = [f"run-{index}" for index in range(5)]
+        self.assertEqual(expected, runids)
+        self.assertEqual("".join(f"{runid}\n" for runid in expected), runid_log.getvalue())
+
+    def test_submit_stops_on_first_error(self):
+        def _post(request_data):
+            if request_data["index"] == 2:
+                raise SystemExit(1)
+            return f"run-{request_data['index']}"
+
+        runids = []
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_post) as mock_post:
+            with self.assertRaises(SystemExit):
+                with WorkflowSubmitter(MagicMock(), runids, None, 2) as submitter:
+                    for index in range(10):
+                        submitter.submit({"index": index})
+
+        self.assertEqual(["run-0", "run-1"], runids[:2])
+        self.assertNotIn("run-2", runids)
+        self.assertLess(mock_post.call_count, 10)
+
+    def test_submit_splits_requests_rejected_as_too_large(self):
+        def _post(request_data):
+            records = request_data["executionContext"]["manifest"]["MasterData"]
+            if len(records) > 2:
+                raise PayloadTooLargeError("(413) Request too large to submit")
+            return ",".join(records)
+
+        runids = []
+        request = {"executionContext": {"manifest": {"MasterData": ["a", "b", "c", "d", "e"]}}}
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_post):
+            with WorkflowSubmitter(MagicMock(), runids, None, 2) as submitter:
+                submitter.submit(request)
+
+        self.assertEqual(["a,b", "c", "d,e"], runids)
+
+    def test_split_requests_index_the_source_of_each_run(self):
+        def _post(request_data):
+            records = request_data["executionContext"]["manifest"]["MasterData"]
+            if len(records) > 2:
+                raise PayloadTooLargeError("(413) Request too large to submit")
+            return ",".join(record["id"] for record in records)
+
+        run_index = MagicMock()
+        records = [{"id": record_id} for record_id in ("a", "b", "c")]
+        request = {"executionContext": {"manifest": {"MasterData": records}}}
+        source = {"file": "a.json", "type": "MasterData", "records": [4, 5, 7]}
+        with patch.object(WorkflowSubmitter, "_post", side_effect=_post):
+            with WorkflowSubmitter(MagicMock(), [], run_index=run_index) as submitter:
+                submitter.submit(request, source=source)
+
+        self.assertEqual(
+            [
+                ("a", dict(source, records=[4]), ["a"]),
+                ("b,c", dict(source, records=[5, 7]), ["b", "c"]),
+            ],
+            [call.args for call in run_index.add.call_args_list],
+        )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,98 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.template"""
+
+import unittest
+
+from nose2.tools import params
+
+from osducli.commands.dataload.template import compile_template
+from osducli.util.exceptions import CliError
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+TEMPLATE = {
+    "kind": "osdu:wks:reference-data--UnitOfMeasure:1.0.0",
+    "id": "{data-partition-id}:reference-data--UnitOfMeasure:{Code}",
+    "data": {
+        "Code": "{Code}",
+        "Name": "{Name}",
+        "Factor": "{Factor:number}",
+        "IsBase": "{Base:boolean}",
+        "Description": "{Name} ({Code})",
+        "Aliases": ["{Alias}", "literal {{braces}}"],
+    },
+}
+COLUMNS = ["Code", "Name", "Factor", "Base", "Alias"]
+
+
+class TestCompileTemplate(unittest.TestCase):
+    @params(1, 2, 1024)
+    def test_records(self, block_size):
+        rows = [
+            ["m", "metre", "1", "yes", "meter"],
+            [],
+            ["ft", "foot", "0.3048", "no", ""],
+            ["in", "inch"],
+        ]
+        template = compile_template(TEMPLATE, COLUMNS, {"data-partition-id": "opendes"})
+        records = list(template(rows, block_size))
+
+        self.assertEqual(
+            {
+                "kind": "osdu:wks:reference-data--UnitOfMeasure:1.0.0",
+                "id": "opendes:reference-data--UnitOfMeasure:m",
+                "data": {
+                    "Code": "m",
+                    "Name": "metre",
+                    "Factor": 1,
+                    "IsBase": True,
+                    "Description": "metre (m)",
+                    "Aliases": ["meter", "literal {braces}"],
+                },
+            },
+            records[0],
+        )
+        self.assertEqual(0.3048, records[1]["data"]["Factor"])
+        self.assertEqual(["literal {braces}"], records[1]["data"]["Aliases"])
+        # empty columns are left out
+        self.assertEqual(
+            {
+                "Code": "in",
+                "Name": "inch",
+                "Description": "inch (in)",
+                "Aliases": ["literal {braces}"],
+            },
+            records[2]["data"],
+        )
+        self.assertIsNot(records[1]["data"], records[2]["data"])
+
+    def test_template_without_placeholders(self):
+        records = list(compile_template({"kind": "k"}, ["A"])([["1"], ["2"]]))
+        self.assertEqual([{"kind": "k"}, {"kind": "k"}], records)
+
+    def test_invalid_value(self):
+        template = compile_template({"data": {"Factor": "{Factor:number}"}}, ["Factor"])
+        with self.assertRaisesRegex(CliError, "row 3"):
+            list(template([["1"], [""], ["x"]], 2))
+
+    @params(
+        {"id": "{Missing}"},
+        {"id": "{Code:float}"},
+        {"id": "a-{Code:number}"},
+        {"id": "{Code"},
+    )
+    def test_invalid_template(self, template):
+        with self.assertRaises(CliError):
+            compile_template(template, COLUMNS)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
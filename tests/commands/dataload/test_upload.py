@@ -0,0 +1,151 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.commands.dataload.upload"""
+
+import base64
+import os
+import threading
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from mock import MagicMock, patch
+
+from osducli.commands.dataload.upload import DatasetUploader, UploadLocationPool
+from osducli.util.exceptions import CliError
+from tests.helpers import temp_directory
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class MockBlobStore:  # pylint: disable=too-few-public-methods
+    """Accept block and block list PUTs, failing the first attempt at a given block"""
+
+    def __init__(self, fail_block=None):
+        self.fail_block = fail_block
+        self.blocks = {}
+        self.committed = None
+        self.single = None
+        self._lock = threading.Lock()
+
+    def put(self, url, data=None, headers=None):  # pylint: disable=unused-argument
+        query = parse_qs(urlparse(url).query)
+        response = MagicMock(status_code=201, text="")
+        with self._lock:
+            if query.get("comp") == ["block"]:
+                block_id = query["blockid"][0]
+                if block_id == self.fail_block:
+                    self.fail_block = None
+                    response.status_code = 503
+                else:
+                    self.blocks[block_id] = data
+            elif query.get("comp") == ["blocklist"]:
+                ids = [part.split("</Latest>")[0] for part in data.split("<Latest>")[1:]]
+                self.committed = b"".join(self.blocks[block_id] for block_id in ids)
+            else:
+                self.single = data.read()
+        return response
+
+
+class TestDatasetUploader(unittest.TestCase):
+    def setUp(self):
+        self.content = os.urandom(10000)
+        self.filepath = os.path.join(temp_directory(self), "data.segy")
+        with open(self.filepath, "wb") as file:
+            file.write(self.content)
+
+    def _put_file(self, store, block_size):
+        client = MagicMock()
+        client.session.put.side_effect = store.put
+        with patch("osducli.commands.dataload.upload.get_client", return_value=client), patch(
+            "osducli.commands.dataload.upload.time.sleep"
+        ):
+            DatasetUploader(MagicMock(), block_size, 3).put_file(
+                "https://account.blob.core.windows.net/container/data?sig=abc", self.filepath
+            )
+
+    def test_put_file_in_blocks_retries_failed_block(self):
+        store = MockBlobStore(fail_block=base64.b64encode(b"00000002").decode())
+        self._put_file(store, 1024)
+
+        self.assertEqual(10, len(store.blocks))
+        self.assertIsNone(store.fail_block)
+        self.assertEqual(self.content, store.committed)
+
+    def test_put_file_single_request_without_block_size(self):
+        store = MockBlobStore()
+        self._put_file(store, None)
+
+        self.assertEqual({}, store.blocks)
+        self.assertEqual(self.content, store.single)
+
+    def test_upload_all_returns_file_sources_in_order(self):
+        counter = iter(range(100))
+
+        def _fetch(config):  # pylint: disable=unused-argument
+            index = next(counter)
+            return {"SignedURL": f"https://store/{index}?sig=a", "FileSource": f"source-{index}"}
+
+        uploaded = {}
+        filepaths = [os.path.join(os.path.dirname(self.filepath), f"{i}.las") for i in range(6)]
+        for filepath in filepaths:
+            with open(filepath, "w") as file:
+                file.write(filepath)
+
+        def _put_file(signed_url, filepath):
+            uploaded[signed_url] = filepath
+
+        with patch(
+            "osducli.commands.dataload.upload.fetch_upload_location", side_effect=_fetch
+        ), patch("osducli.commands.dataload.upload.get_client"):
+            with DatasetUploader(MagicMock(), None, 1, 3) as uploader:
+                with patch.object(uploader, "put_file", side_effect=_put_file):
+                    sources = uploader.upload_all(filepaths)
+
+        self.assertEqual(6, len(set(sources)))
+        for source, filepath in zip(sources, filepaths):
+            index = source.split("-")[1]
+            self.assertEqual(filepath, uploaded[f"https://store/{index}?sig=a"])
+
+
+class TestUploadLocationPool(unittest.TestCase):
+    def test_get_raises_fetch_error(self):
+        with patch(
+            "osducli.commands.dataload.upload.fetch_upload_location",
+            side_effect=CliError("No upload location returned"),
+        ):
+            with UploadLocationPool(MagicMock(), 2) as pool:
+                with self.assertRaises(CliError):
+                    pool.get()
+                with self.assertRaises(CliError):
+                    pool.get()
+
+    def test_get_raises_system_exit(self):
+        with patch(
+            "osducli.commands.dataload.upload.fetch_upload_location", side_effect=SystemExit(1)
+        ):
+            with UploadLocationPool(MagicMock(), 2) as pool:
+                with self.assertRaises(SystemExit):
+                    pool.get()
+
+    def test_only_fetches_locations_asked_for(self):
+        with patch(
+            "osducli.commands.dataload.upload.fetch_upload_location",
+            side_effect=[{"SignedURL": str(i)} for i in range(10)],
+        ) as mock_fetch:
+            with UploadLocationPool(MagicMock(), 4) as pool:
+                pool.reserve(2)
+                self.assertEqual({"SignedURL": "0"}, pool.get())
+                self.assertEqual({"SignedURL": "1"}, pool.get())
+                self.assertEqual({"SignedURL": "2"}, pool.get())
+        self.assertEqual(3, mock_fetch.call_count)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -400,7 +400,10 @@ class HelpTextTests(unittest.TestCase):
         self.validate_output(
             "osdu dataload",
             commands=(
+                "generate",
                 "ingest",
+                "retry",
+                "split",
                 "status",
                 "verify",
             ),
@@ -6,8 +6,14 @@
 
 """Shared helpers for mocks and utils used among all tests"""
 
+import io
 import os
+import shutil
+import tarfile
+import tempfile
+import unittest
 import xml.etree.ElementTree as ET
+import zipfile
 
 from mock import MagicMock
 
@@ -47,6 +53,38 @@ def mock_config_values(section, name, fallback):
 
 
 MOCK_CONFIG.return_value.get.side_effect = mock_config_values
+# members written to archives by default by write_archive
+ARCHIVE_FILES = [
+    ("b/2.json", b'{"b": 2}'),
+    ("a/1.json", b'{"a": 1}'),
+    ("a/readme.txt", b"text"),
+]
+
+
+def temp_directory(test_case: unittest.TestCase) -> str:
+    """Create a temporary directory removed when the test case finishes"""
+    directory = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+
+def write_archive(directory: str, name: str, files=None) -> str:
+    """Write files (ARCHIVE_FILES if None) into a new zip or tar archive"""
+    path = os.path.join(directory, name)
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path, "w") as archive:
+            for member, data in files or ARCHIVE_FILES:
+                archive.writestr(member, data)
+    else:
+        with tarfile.open(path, "w:gz" if name.endswith(".gz") else "w") as archive:
+            for member, data in files or ARCHIVE_FILES:
+                info = tarfile.TarInfo(member)
+                info.size = len(data)
+                info.mtime = 1600000000
+                archive.addfile(info, io.BytesIO(data))
+    return path
+
+
 # XMLNS for fabric manifests
 XML_NS = {"fabric": "http://schemas.microsoft.com/2011/01/fabric"}
 
@@ -6,6 +6,8 @@
 
 """Test cases for CliOsduClient"""
 
+import gzip
+import json
 import logging
 
 from knack.testsdk import ScenarioTest
@@ -14,7 +16,7 @@ from osdu.identity import OsduTokenCredential
 from requests.models import HTTPError
 from testfixtures import LogCapture
 
-from osducli.cliclient import MSG_HTTP_ERROR, CliOsduClient
+from osducli.cliclient import MSG_HTTP_ERROR, CliOsduClient, get_client
 from osducli.config import CONFIG_AUTHENTICATION_MODE, CONFIG_SERVER
 
 
@@ -99,6 +101,85 @@ class CliOsduClientTests(ScenarioTest):
                 log_capture.check_present(("cli", "ERROR", MSG_HTTP_ERROR))
             self.assertEqual(sysexit.exception.code, 1)
 
+    def test_get_client_shared_per_config(self):
+        """Test the same pooled client is returned for a config and grows to the requested size"""
+        config = MagicMock()
+        config.get.side_effect = mock_config_values
+
+        client = get_client(config)
+        self.assertIs(client, get_client(config, 32))
+        self.assertIsNot(client, get_client(MOCK_CONFIG))
+        adapter = client.session.get_adapter("https://dummy.com")
+        self.assertEqual(32, adapter._pool_maxsize)  # pylint: disable=protected-access
+
+    @patch.object(CliOsduClient, "get_headers", side_effect=dict)
+    def test_cli_post_compresses_and_falls_back(self, mock_get_headers):  # pylint: disable=W0613
+        """Test request bodies are compressed when configured and sent uncompressed if rejected"""
+
+        def _config_values(section, name, fallback=None):
+            if name == "workflow_compression":
+                return "gzip"
+            return mock_config_values(section, name, fallback)
+
+        config = MagicMock()
+        config.get.side_effect = _config_values
+        client = CliOsduClient(config)
+        client.session.post = MagicMock(
+            side_effect=[
+                MagicMock(status_code=200),
+                MagicMock(status_code=415),
+                MagicMock(status_code=200),
+                MagicMock(status_code=200),
+            ]
+        )
+
+        client.cli_post("workflow_url", "workflow", {"a": "b"})
+        kwargs = client.session.post.call_args[1]
+        self.assertEqual("gzip", kwargs["headers"]["Content-Encoding"])
+        self.assertEqual({"a": "b"}, json.loads(gzip.decompress(kwargs["data"])))
+
+        # rejected - resent uncompressed and compression turned off
+        client.cli_post("workflow_url", "workflow", {"a": "b"})
+        kwargs = client.session.post.call_args[1]
+        self.assertNotIn("Content-Encoding", kwargs["headers"])
+        self.assertEqual({"a": "b"}, json.loads(kwargs["data"]))
+        self.assertIsNone(client.request_encoding("workflow_url"))
+        client.cli_post("workflow_url", "workflow", {"a": "b"})
+        self.assertEqual(4, client.session.post.call_count)
+        self.assertIsNone(client.request_encoding("search_url"))
+
+    @patch.object(CliOsduClient, "get_headers", side_effect=dict)
+    def test_cli_post_only_falls_back_when_encoding_rejected(
+        self, mock_get_headers
+    ):  # pylint: disable=W0613
+        """Test a bad request is only resent uncompressed if it names the content encoding"""
+
+        def _config_values(section, name, fallback=None):
+            if name == "workflow_compression":
+                return "gzip"
+            return mock_config_values(section, name, fallback)
+
+        config = MagicMock()
+        config.get.side_effect = _config_values
+        client = CliOsduClient(config)
+        client.session.post = MagicMock(
+            side_effect=[
+                MagicMock(status_code=400, text="Invalid manifest"),
+                MagicMock(status_code=400, text="Unsupported Content-Encoding: gzip"),
+                MagicMock(status_code=200),
+            ]
+        )
+
+        # an invalid request is not sent twice
+        with self.assertRaises(HTTPError):
+            client.cli_post("workflow_url", "workflow", {"a": "b"})
+        self.assertEqual(1, client.session.post.call_count)
+        self.assertEqual("gzip", client.request_encoding("workflow_url"))
+
+        client.cli_post("workflow_url", "workflow", {"a": "b"})
+        self.assertEqual(3, client.session.post.call_count)
+        self.assertIsNone(client.request_encoding("workflow_url"))
+
     # # pylint: disable=W0613
     # @patch.object(CliOsduClient, '_url_from_config', return_value='https://www.test.com/test')
     # @patch.object(Response, 'json', return_value='BAD JSON')
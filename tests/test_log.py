@@ -0,0 +1,45 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.log"""
+
+import logging
+import unittest
+from unittest.mock import patch
+
+from osducli.log import LazyPayload, get_logger
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestLazyPayload(unittest.TestCase):
+    def test_formats_json(self):
+        self.assertEqual('{"a":[1,2]}', str(LazyPayload({"a": [1, 2]})))
+        self.assertEqual('{\n  "a": 1\n}', str(LazyPayload({"a": 1}, indent=2)))
+
+    def test_text_is_unchanged(self):
+        self.assertEqual("not json", str(LazyPayload("not json")))
+        self.assertEqual("bytes", str(LazyPayload(b"bytes")))
+
+    def test_truncates_to_limit(self):
+        self.assertEqual("abcde... (5 more characters)", str(LazyPayload("abcdefghij", limit=5)))
+
+    def test_repr_shows_formatted_payload(self):
+        self.assertEqual('LazyPayload({"a":1})', repr(LazyPayload({"a": 1})))
+
+    def test_not_formatted_unless_logged(self):
+        logger = get_logger("test_log")
+        logger.setLevel(logging.INFO)
+        with patch("osducli.log.json_backend.dumps") as mock_dumps:
+            logger.debug("Payload %s", LazyPayload({"a": 1}))
+        mock_dumps.assert_not_called()
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,96 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.util.archive"""
+
+import os
+import tarfile
+import unittest
+
+from mock import patch
+from nose2.tools import params
+
+from osducli.util.archive import (
+    close_archives,
+    file_stat,
+    iter_archive_members,
+    open_file,
+    split_member_path,
+)
+from osducli.util.file import get_files_from_path
+from tests.helpers import ARCHIVE_FILES, temp_directory, write_archive
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = temp_directory(self)
+
+    def tearDown(self):
+        close_archives()
+
+    @params("drop.zip", "drop.tar", "drop.tar.gz")
+    def test_members_in_archive_order(self, name):
+        archive = write_archive(self.directory, name)
+
+        members = list(iter_archive_members(archive, (".json",)))
+
+        self.assertEqual([f"{archive}!/b/2.json", f"{archive}!/a/1.json"], members)
+        self.assertEqual(members, get_files_from_path(archive, (".json",)))
+
+    @params("drop.zip", "drop.tar.gz")
+    def test_open_file_reads_member(self, name):
+        archive = write_archive(self.directory, name)
+
+        for member, data in ARCHIVE_FILES:
+            with open_file(f"{archive}!/{member}") as file:
+                self.assertEqual(data, file.read())
+        self.assertEqual(
+            len(ARCHIVE_FILES[0][1]), file_stat(f"{archive}!/{ARCHIVE_FILES[0][0]}")[0]
+        )
+
+    def test_tar_read_once_when_members_read_as_listed(self):
+        archive = write_archive(self.directory, "drop.tar.gz")
+
+        read = []
+        with patch("osducli.util.archive.tarfile.open", wraps=tarfile.open) as mock_open:
+            for path in iter_archive_members(archive):
+                with open_file(path) as file:
+                    read.append(file.read())
+
+        self.assertEqual([data for _, data in ARCHIVE_FILES], read)
+        mock_open.assert_called_once()
+
+    @params("drop.zip", "drop.tar.gz")
+    def test_open_file_out_of_order(self, name):
+        archive = write_archive(self.directory, name)
+        list(iter_archive_members(archive))
+
+        for member, data in reversed(ARCHIVE_FILES + ARCHIVE_FILES):
+            with open_file(f"{archive}!/{member}") as file:
+                self.assertEqual(data, file.read())
+
+    @params("drop.zip", "drop.tar.gz")
+    def test_open_file_missing_member(self, name):
+        archive = write_archive(self.directory, name)
+        with self.assertRaises(FileNotFoundError):
+            open_file(f"{archive}!/missing.json")
+
+    def test_split_member_path(self):
+        archive = write_archive(self.directory, "drop.tar")
+        plain = os.path.join(self.directory, "plain.json")
+
+        self.assertEqual((archive, "a/1.json"), split_member_path(f"{archive}!/a/1.json"))
+        self.assertIsNone(split_member_path(plain))
+        self.assertIsNone(split_member_path(f"{plain}!/a/1.json"))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
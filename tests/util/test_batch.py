@@ -0,0 +1,86 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.util.batch"""
+
+import unittest
+
+from nose2.tools import params
+
+from osducli.util.batch import batched, batched_with_last, json_size
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+class TestBatched(unittest.TestCase):
+    @params(
+        (7, 3, [[0, 1, 2], [3, 4, 5], [6]]),
+        (6, 3, [[0, 1, 2], [3, 4, 5]]),
+        (2, 5, [[0, 1]]),
+        (0, 5, []),
+    )
+    def test_batched_by_count(self, count, size, expected):
+        self.assertEqual(expected, list(batched(range(count), size)))
+
+    def test_batched_by_bytes(self):
+        items = ["a" * 8, "b" * 8, "c" * 8, "d" * 30, "e"]
+        # each string is its length plus 2 quotes when serialized
+        self.assertEqual(
+            [["a" * 8, "b" * 8], ["c" * 8], ["d" * 30], ["e"]],
+            list(batched(items, 10, 20)),
+        )
+
+    def test_batched_by_count_and_bytes(self):
+        self.assertEqual([[1, 2], [3, 4], [5]], list(batched([1, 2, 3, 4, 5], 2, 100)))
+
+    def test_batched_custom_item_size(self):
+        items = [(0, "a"), (1, "b"), (2, "c")]
+        self.assertEqual(
+            [[(0, "a"), (1, "b")], [(2, "c")]],
+            list(batched(items, 10, 6, lambda item: json_size(item[1]))),
+        )
+
+    def test_batched_invalid_size(self):
+        with self.assertRaises(ValueError):
+            list(batched([1], 0))
+
+    def test_batched_consumes_generator_lazily(self):
+        consumed = []
+
+        def _items():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        batches = batched(_items(), 4)
+        self.assertEqual([0, 1, 2, 3], next(batches))
+        self.assertEqual([0, 1, 2, 3], consumed)
+
+    @params(None, 1000)
+    def test_batched_with_last(self, max_bytes):
+        self.assertEqual(
+            [([0, 1], False), ([2, 3], False), ([4], True)],
+            list(batched_with_last(range(5), 2, max_bytes)),
+        )
+
+    def test_batched_with_last_reads_one_item_ahead(self):
+        consumed = []
+
+        def _items():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        batches = batched_with_last(_items(), 4)
+        self.assertEqual(([0, 1, 2, 3], False), next(batches))
+        self.assertEqual([0, 1, 2, 3, 4], consumed)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -6,7 +6,6 @@
 
 """Test cases for osducli.util.file"""
 
-
 import os
 import tempfile
 from os import makedirs, path
@@ -14,7 +13,11 @@ from os import makedirs, path
 from knack.testsdk.base import IntegrationTestBase
 from nose2.tools import params
 
-from osducli.util.file import ensure_directory_exists, get_files_from_path
+from osducli.util.file import (
+    ensure_directory_exists,
+    get_files_from_path,
+    iter_files_from_path,
+)
 
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
@@ -88,6 +91,32 @@ class TestExceptions(IntegrationTestBase):
         self.assertEqual(1, len(files))
         self.assertTrue(file1 in files)
 
+    def test_get_files_from_path_extensions(self):
+        temp_dir = self.create_temp_dir()
+        sub_dir = tempfile.mkdtemp(dir=temp_dir)
+        _fd, file1 = tempfile.mkstemp(dir=temp_dir, suffix=".json")
+        os.close(_fd)
+        _fd, file2 = tempfile.mkstemp(dir=sub_dir, suffix=".jsonl")
+        os.close(_fd)
+        _fd, _ = tempfile.mkstemp(dir=sub_dir, suffix=".txt")
+        os.close(_fd)
+
+        files = get_files_from_path(temp_dir, (".json", ".jsonl"))
+
+        self.assertEqual(sorted([file1, file2]), sorted(files))
+
+    def test_iter_files_from_path_is_lazy(self):
+        temp_dir = self.create_temp_dir()
+        _fd, file1 = tempfile.mkstemp(dir=temp_dir)
+        os.close(_fd)
+
+        files = iter_files_from_path(temp_dir)
+        # files created before the walk reaches the directory are still found
+        _fd, file2 = tempfile.mkstemp(dir=temp_dir)
+        os.close(_fd)
+
+        self.assertEqual(sorted([file1, file2]), sorted(files))
+
     # endregion
 
 
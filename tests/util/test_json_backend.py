@@ -0,0 +1,59 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.util.json_backend"""
+
+import io
+import json
+import unittest
+
+from nose2.tools import params
+
+from osducli.util import json_backend
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+RECORD = {
+    "id": "opendes:master-data--Well:1",
+    "kind": "osdu:wks:master-data--Well:1.0.0",
+    "acl": {"owners": ["owners@opendes"], "viewers": ["viewers@opendes"]},
+    "data": {"FacilityName": "Wéll 1", "Depth": 1234.5, "Spud": None, "Active": True},
+}
+
+
+class TestJsonBackend(unittest.TestCase):
+    @params(None, 2)
+    def test_dumps_round_trips(self, indent):
+        self.assertEqual(RECORD, json.loads(json_backend.dumps(RECORD, indent)))
+
+    def test_dumps_indent_matches_standard_library(self):
+        self.assertEqual(
+            json.dumps(RECORD, indent=2, ensure_ascii=False), json_backend.dumps(RECORD, indent=2)
+        )
+
+    def test_dumps_ensure_ascii_matches_standard_library(self):
+        value = dict(RECORD, name="Brønn \u2013 \U0001f6e2")
+        self.assertEqual(
+            json.dumps(value, indent=2), json_backend.dumps(value, indent=2, ensure_ascii=True)
+        )
+
+    def test_dumps_falls_back_for_values_only_the_standard_library_supports(self):
+        self.assertEqual('{"big":36893488147419103232}', json_backend.dumps({"big": 2**65}))
+
+    def test_load_text_and_binary_files(self):
+        text = json.dumps(RECORD)
+        self.assertEqual(RECORD, json_backend.load(io.StringIO(text)))
+        self.assertEqual(RECORD, json_backend.load(io.BytesIO(text.encode("utf-8"))))
+
+    def test_loads_falls_back_for_values_only_the_standard_library_supports(self):
+        self.assertEqual(float("inf"), json_backend.loads('{"a": Infinity}')["a"])
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
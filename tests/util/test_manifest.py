@@ -0,0 +1,154 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Test cases for osducli.util.manifest"""
+
+import io
+import json
+import os
+import unittest
+
+from nose2.tools import params
+
+from osducli.util.manifest import JsonSequenceReader, ManifestReader, NdjsonReader
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+
+def _records(count):
+    return [
+        {"id": f"opendes:reference-data--Test:{i}", "data": {"Name": "x" * i, "Value": i * 1.5}}
+        for i in range(count)
+    ]
+
+
+class TestManifest(unittest.TestCase):
+    @params(1, 7, 64 * 1024)
+    def test_manifest_reader_yields_records(self, chunk_size):
+        manifest = {"kind": "osdu:wks:Manifest:1.0.0", "ReferenceData": _records(50)}
+        handle = io.StringIO(json.dumps(manifest, indent=2))
+
+        items = list(ManifestReader(handle, chunk_size=chunk_size))
+
+        self.assertEqual(("kind", "osdu:wks:Manifest:1.0.0"), items[0])
+        self.assertEqual([("ReferenceData", r) for r in manifest["ReferenceData"]], items[1:])
+
+    def test_manifest_reader_other_members_not_streamed(self):
+        manifest = {"Data": {"WorkProduct": {}, "Datasets": [1, 2]}, "MasterData": [], "n": 10}
+        items = list(ManifestReader(io.StringIO(json.dumps(manifest)), chunk_size=3))
+        self.assertEqual([("Data", manifest["Data"]), ("n", 10)], items)
+
+    @params("", "  ", "{}")
+    def test_manifest_reader_empty(self, text):
+        self.assertEqual([], list(ManifestReader(io.StringIO(text))))
+
+    @params('{"ReferenceData": [{"id": 1}', '["ReferenceData"]', '{"kind" "x"}')
+    def test_manifest_reader_invalid(self, text):
+        with self.assertRaises(ValueError):
+            list(ManifestReader(io.StringIO(text), chunk_size=4))
+
+    @params(1, 7, 64 * 1024)
+    def test_manifest_reader_offset_after_each_record(self, chunk_size):
+        records = [
+            dict(r, data={"Name": "\u00e6\u00f8\u00e5 \u2603 " * i})
+            for i, r in enumerate(_records(20))
+        ]
+        data = json.dumps({"ReferenceData": records}, ensure_ascii=False).encode("utf-8")
+        reader = ManifestReader(io.BytesIO(data), chunk_size=chunk_size)
+
+        for index, (_, record) in enumerate(reader):
+            self.assertEqual(records[index], record)
+            # the offset is just after the record, so reading resumes with the next one
+            resumed = ManifestReader(io.BytesIO(data), resume_at=("ReferenceData", reader.offset))
+            self.assertEqual(records[index + 1 :], [r for _, r in resumed])
+
+
+class TestNdjsonReader(unittest.TestCase):
+    def setUp(self):
+        self.records = _records(3) + [{"id": "opendes:master-data--Well:1", "kind": "x"}]
+        self.records[0]["kind"] = "osdu:wks:reference-data--Test:1.0.0"
+        lines = [json.dumps(record) for record in self.records]
+        self.data = ("\n".join(lines[:2]) + "\n\n" + "\n".join(lines[2:])).encode("utf-8")
+
+    def test_ndjson_reader_infers_data_type(self):
+        items = list(NdjsonReader(io.BytesIO(self.data)))
+        self.assertEqual(
+            ["ReferenceData", "MasterData", "MasterData", "MasterData"], [k for k, _ in items]
+        )
+        self.assertEqual(self.records, [record for _, record in items])
+
+    def test_ndjson_reader_given_data_type(self):
+        items = list(NdjsonReader(io.StringIO(self.data.decode("utf-8")), "ReferenceData"))
+        self.assertEqual(["ReferenceData"] * 4, [k for k, _ in items])
+
+    def test_ndjson_reader_resume_at_offset(self):
+        reader = NdjsonReader(io.BytesIO(self.data))
+        iterator = iter(reader)
+        next(iterator)
+        next(iterator)
+
+        resumed = NdjsonReader(io.BytesIO(self.data), resume_at=("MasterData", reader.offset))
+        self.assertEqual(self.records[2:], [record for _, record in resumed])
+
+    def test_ndjson_reader_invalid_line(self):
+        with self.assertRaises(ValueError):
+            list(NdjsonReader(io.BytesIO(b'{"id": 1}\n{"id": \n')))
+
+
+class TestJsonSequenceReader(unittest.TestCase):
+    @params(1, 7, 64 * 1024)
+    def test_reads_records_and_manifests(self, chunk_size):
+        records = _records(4)
+        record = dict(records[3], kind="osdu:wks:master-data--Well:1.0.0")
+        text = "\n".join(
+            [
+                json.dumps(dict(records[0], kind="osdu:wks:reference-data--Test:1.0.0")),
+                json.dumps({"kind": "osdu:wks:Manifest:1.0.0", "ReferenceData": records[1:3]}),
+                json.dumps({"kind": "osdu:wks:Manifest:1.0.0", "MasterData": []}),
+                json.dumps(record, indent=2),
+                json.dumps({"kind": "osdu:wks:Manifest:1.0.0", "Data": {"WorkProduct": {}}}),
+            ]
+        )
+        items = list(JsonSequenceReader(io.BytesIO(text.encode()), chunk_size=chunk_size))
+        self.assertEqual(
+            [
+                ("ReferenceData", dict(records[0], kind="osdu:wks:reference-data--Test:1.0.0")),
+                ("ReferenceData", records[1]),
+                ("ReferenceData", records[2]),
+                ("kind", "osdu:wks:Manifest:1.0.0"),
+                ("kind", "osdu:wks:Manifest:1.0.0"),
+                ("MasterData", record),
+                ("kind", "osdu:wks:Manifest:1.0.0"),
+                ("Data", {"WorkProduct": {}}),
+            ],
+            items,
+        )
+
+    def test_given_record_type(self):
+        text = "\n".join(json.dumps(record) for record in _records(2))
+        items = list(JsonSequenceReader(io.StringIO(text), record_type="MasterData"))
+        self.assertEqual(["MasterData"] * 2, [k for k, _ in items])
+
+    def test_yields_records_as_they_arrive(self):
+        read_fd, write_fd = os.pipe()
+        records = _records(2)
+        with os.fdopen(read_fd, "rb") as reader, os.fdopen(write_fd, "wb") as writer:
+            writer.write(json.dumps(records[0]).encode() + b"\n")
+            writer.flush()
+            items = iter(JsonSequenceReader(reader))
+            # the first record is produced without waiting for the pipe to fill or close
+            self.assertEqual(("MasterData", records[0]), next(items))
+
+            writer.write(json.dumps(records[1]).encode() + b"\n")
+            writer.close()
+            self.assertEqual([("MasterData", records[1])], list(items))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()